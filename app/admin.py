@@ -0,0 +1,115 @@
+"""Operator endpoints for the Speaking Meeting Bot API."""
+
+import hmac
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from app.models import DrainRequest, MigrateRequest, WorkerRequest
+from app.routes import admission_rejected_response
+from core.capacity import AdmissionRejected, admission
+from core.connection import PIPECAT_PROCESSES
+from core.drain import DRAIN_TIMEOUT_S, drain
+from core.migration import MigrationError, migrator
+from core.process import start_pipecat_process
+from core.supervisor import supervisor
+
+# Shared secret for /admin endpoints; without it only loopback clients are allowed
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+_LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+async def require_admin(request: Request):
+    """Allow a request with the admin token, or from loopback if none is set."""
+    if ADMIN_TOKEN:
+        token = request.headers.get("x-admin-token", "")
+        if hmac.compare_digest(token, ADMIN_TOKEN):
+            return
+    elif request.client and request.client.host in _LOOPBACK_HOSTS:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Admin token required in x-admin-token header",
+    )
+
+
+admin_router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@admin_router.post("/drain", response_model=Dict[str, Any])
+async def start_drain(request: Optional[DrainRequest] = None):
+    """
+    Stop admitting bots and shut down once the live ones are gone.
+
+    Calling it again moves the deadline. The same drain can be started by
+    sending SIGUSR1 to the server process.
+    """
+    timeout = DRAIN_TIMEOUT_S
+    if request is not None and request.timeout_s is not None:
+        timeout = request.timeout_s
+    return drain.start(timeout)
+
+
+@admin_router.get("/drain", response_model=Dict[str, Any])
+async def drain_status():
+    """Report drain progress."""
+    return drain.status()
+
+
+@admin_router.delete("/drain", response_model=Dict[str, Any])
+async def cancel_drain():
+    """Cancel a drain that has not finished yet."""
+    return drain.cancel()
+
+
+@admin_router.post("/bots/{client_id}/migrate", response_model=Dict[str, Any])
+async def migrate_bot(client_id: str, request: Optional[MigrateRequest] = None):
+    """
+    Move a live session to a new worker without dropping the meeting.
+
+    The new worker runs on this node's least loaded cores, or on
+    ``target_node``, in which case the relay stays here.
+    """
+    target_node = request.target_node if request is not None else None
+    try:
+        return await migrator.migrate(client_id, target_node=target_node)
+    except MigrationError as e:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"message": str(e), "status": "error"},
+        )
+
+
+@admin_router.post(
+    "/workers", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED
+)
+async def start_worker(request: WorkerRequest):
+    """Start a worker for a session that a peer node is migrating here."""
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+
+    try:
+        spawn_kwargs = request.model_dump()
+        process = start_pipecat_process(**spawn_kwargs)
+        PIPECAT_PROCESSES[request.client_id] = process
+        spawn_kwargs.pop("messages", None)
+        supervisor.register(request.client_id, spawn_kwargs)
+        return {"client_id": request.client_id, "pid": process.pid}
+    finally:
+        admission.release()
+
+
+@admin_router.delete("/workers/{client_id}", response_model=Dict[str, Any])
+async def stop_worker(client_id: str):
+    """Stop a worker started for a peer node's session."""
+    if client_id not in PIPECAT_PROCESSES:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    await supervisor.remove(client_id, leave_meeting=False)
+    return {"client_id": client_id, "status": "stopped"}
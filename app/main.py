@@ -4,6 +4,7 @@ import argparse
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, Request, HTTPException, status
@@ -11,9 +12,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 
+from app.admin import admin_router
 from app.routes import router as app_router
+from app.services.image_service import image_service
 from app.websockets import websocket_router
+from config.voice_catalog import voice_catalog
+from config.voice_index import voice_index
+from core.breakers import breakers
+from core.capacity import admission
+from core.degradation import degradation
+from core.drain import drain
+from core.executors import executors_status, shutdown_executors
+from core.jobs import job_queue
+from core.metrics import metrics
+from core.migration import migrator
+from core.placement import placer
+from core.profiler import profiler
+from core.singleflight import singleflight_status
+from core.supervisor import supervisor
 from meetingbaas_pipecat.utils.logger import configure_logger
+from scripts.meetingbaas_api import meetingbaas_client
 from utils.ngrok import LOCAL_DEV_MODE, NGROK_URL_INDEX, NGROK_URLS, load_ngrok_urls
 
 # Configure logging with the prettier logger
@@ -27,8 +45,18 @@ pipecat_ws_logger.setLevel(logging.WARNING)
 
 async def api_key_middleware(request: Request, call_next):
     """Middleware to check for MeetingBaas API key in headers."""
-    # Skip API key check for docs and openapi endpoints
-    if request.url.path in ["/docs", "/openapi.json", "/redoc"]:
+    # Skip API key check for docs, openapi and load balancer health endpoints
+    if request.url.path in [
+        "/docs",
+        "/openapi.json",
+        "/redoc",
+        "/health",
+        "/ready",
+    ]:
+        return await call_next(request)
+
+    # Admin endpoints are guarded by their own token
+    if request.url.path.startswith("/admin/"):
         return await call_next(request)
 
     api_key = request.headers.get("x-meeting-baas-api-key")
@@ -43,6 +71,31 @@ async def api_key_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services alongside the application."""
+    placer.pin_relay()
+    await meetingbaas_client.start()
+    await voice_catalog.start()
+    await voice_index.start()
+    # Take over bots that kept running while the server restarted
+    await supervisor.adopt_sessions()
+    await supervisor.start()
+    await degradation.start()
+    await job_queue.start()
+    drain.install_signal_handler()
+    try:
+        yield
+    finally:
+        await job_queue.stop()
+        await degradation.stop()
+        await supervisor.stop()
+        await voice_catalog.stop()
+        await image_service.close()
+        await meetingbaas_client.close()
+        shutdown_executors()
+
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -61,6 +114,7 @@ def create_app() -> FastAPI:
         openapi_url="/openapi.json",  # Explicitly set the OpenAPI schema URL
         docs_url="/docs",  # Swagger UI path
         # redoc_url="/redoc",  # Explicitly set the ReDoc URL
+        lifespan=lifespan,
     )
 
     # Add API key middleware
@@ -182,21 +236,45 @@ def create_app() -> FastAPI:
     # Include the routers
     app.include_router(app_router)
     app.include_router(websocket_router)
+    app.include_router(admin_router)
 
     # Add a health endpoint
     @app.get("/health", tags=["system"])
     async def health():
-        """Health check endpoint"""
+        """Health check endpoint, with free bot slots for load balancers"""
         return {
             "status": "ok",
             "service": "speaking-meeting-bot",
             "version": "1.0.0",
+            "capacity": admission.status(),
+            "drain": drain.status(),
+            "degradation": degradation.status(),
+            "voice_catalog": voice_catalog.status(),
+            "executors": executors_status(),
+            "jobs": job_queue.status(),
+            "breakers": breakers.status(),
+            "singleflight": singleflight_status(),
             "endpoints": [
                 {
                     "path": "/bots",
                     "method": "POST",
                     "description": "Create a bot that joins a meeting",
                 },
+                {
+                    "path": "/bots/batch",
+                    "method": "POST",
+                    "description": "Create bots in many meetings at once",
+                },
+                {
+                    "path": "/bots/jobs/{job_id}",
+                    "method": "GET",
+                    "description": "State of a join queued with Prefer: respond-async",
+                },
+                {
+                    "path": "/bots/jobs/{job_id}/events",
+                    "method": "GET",
+                    "description": "Server-sent events stream of a join job",
+                },
                 {
                     "path": "/bots/{bot_id}",
                     "method": "DELETE",
@@ -213,6 +291,36 @@ def create_app() -> FastAPI:
                     "method": "GET",
                     "description": "Health check endpoint",
                 },
+                {
+                    "path": "/ready",
+                    "method": "GET",
+                    "description": "Readiness for new bots, 503 while draining",
+                },
+                {
+                    "path": "/admin/drain",
+                    "method": "POST",
+                    "description": "Drain the node before a deploy",
+                },
+                {
+                    "path": "/admin/bots/{client_id}/migrate",
+                    "method": "POST",
+                    "description": "Move a live session to a new worker",
+                },
+                {
+                    "path": "/metrics",
+                    "method": "GET",
+                    "description": "Process supervision counters and latencies",
+                },
+                {
+                    "path": "/processes",
+                    "method": "GET",
+                    "description": "Liveness and resource usage of bot processes",
+                },
+                {
+                    "path": "/profiling/startup",
+                    "method": "GET",
+                    "description": "Bot startup phase percentiles per deployment",
+                },
                 {
                     "path": "/ws/{client_id}",
                     "method": "WebSocket",
@@ -223,9 +331,39 @@ def create_app() -> FastAPI:
                     "method": "WebSocket",
                     "description": "WebSocket endpoint for Pipecat connections",
                 },
+                {
+                    "path": "/control/{client_id}",
+                    "method": "WebSocket",
+                    "description": "Control channel for bot processes",
+                },
             ],
         }
 
+    @app.get("/ready", tags=["system"])
+    async def ready():
+        """Readiness probe: 503 while the node drains so it gets no new bots"""
+        if drain.draining:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"status": "draining", **drain.status()},
+            )
+        return {"status": "ready", "free_slots": admission.free_slots()}
+
+    @app.get("/metrics", tags=["system"])
+    async def get_metrics():
+        """Counters, gauges and latency summaries for this node"""
+        return metrics.snapshot()
+
+    @app.get("/processes", tags=["system"])
+    async def get_processes():
+        """Liveness, restarts and resource usage of supervised bot processes"""
+        return {**supervisor.status(), "migrations": migrator.status()}
+
+    @app.get("/profiling/startup", tags=["system"])
+    async def get_startup_profile():
+        """p50/p90/p99 of each bot startup phase, per deployment"""
+        return profiler.report()
+
     return app
 
 
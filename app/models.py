@@ -51,6 +51,33 @@ class JoinResponse(BaseModel):
     )
 
 
+class BotBatchRequest(BaseModel):
+    """Request model for creating bots in many meetings at once."""
+
+    bots: List[BotRequest] = Field(
+        ...,
+        min_length=1,
+        description="One entry per bot, each like a POST /bots body",
+    )
+
+
+class BatchJoinResult(BaseModel):
+    """Outcome of one bot of a batch."""
+
+    meeting_url: str
+    status_code: int = Field(
+        ..., description="Status the bot's own POST /bots would have answered with"
+    )
+    bot_id: Optional[str] = Field(None, description="MeetingBaas bot ID on success")
+    error: Optional[str] = None
+
+
+class BatchJoinResponse(BaseModel):
+    """Response model for a batch of bots, in request order"""
+
+    results: List[BatchJoinResult]
+
+
 class LeaveResponse(BaseModel):
     """Response model for a bot leaving a meeting"""
 
@@ -83,3 +110,40 @@ class PersonaImageResponse(BaseModel):
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+
+
+class DrainRequest(BaseModel):
+    """Request model for draining the node before a deploy."""
+
+    timeout_s: Optional[float] = Field(
+        None,
+        ge=0,
+        description="Seconds live sessions may keep running (defaults to DRAIN_TIMEOUT_S)",
+    )
+
+
+class MigrateRequest(BaseModel):
+    """Request model for moving a live session to a new worker."""
+
+    target_node: Optional[str] = Field(
+        None,
+        description="Base URL of the peer node to run the new worker on; "
+        "omit to start it on this node",
+    )
+
+
+class WorkerRequest(BaseModel):
+    """Request model for a worker started on behalf of a peer node's session."""
+
+    client_id: str
+    websocket_url: str = Field(..., description="Relay URL on the peer node")
+    meeting_url: str
+    persona_data: Dict[str, Any]
+    streaming_audio_frequency: str = "16khz"
+    enable_tools: bool = True
+    api_key: str = ""
+    meetingbaas_bot_id: str = ""
+    prompt: Optional[str] = None
+    messages: Optional[List[Dict[str, Any]]] = Field(
+        None, description="LLM context checkpointed from the current worker"
+    )
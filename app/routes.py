@@ -1,27 +1,56 @@
 """API routes for the Speaking Meeting Bot application."""
 
 import asyncio
+import contextlib
+import json
+import os
+import time
 import uuid
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict, List, Optional, Tuple
-import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.models import (
+    BatchJoinResponse,
+    BatchJoinResult,
+    BotBatchRequest,
     BotRequest,
     JoinResponse,
     LeaveBotRequest,
     PersonaImageRequest,
     PersonaImageResponse,
 )
+from app.services.bot_resolution import (
+    JoinBatch,
+    JOIN_IMAGE_DEADLINE_S,
+    JOIN_PERSONA_DEADLINE_S,
+    JOIN_VOICE_DEADLINE_S,
+    default_bot_image,
+    default_persona,
+    entry_message,
+    persona_key,
+    resolve_image,
+    resolve_persona,
+    resolve_voice,
+)
+from app.services.idempotency import (
+    BOT_MEETING_DEDUP,
+    idempotency_cache,
+    meeting_dedup,
+)
 from app.services.image_service import image_service
-from config.persona_utils import persona_manager
+from core.capacity import AdmissionRejected, admission
 from core.connection import MEETING_DETAILS, PIPECAT_PROCESSES, registry
+from core.dag import Step, StepGraph
+from core.jobs import Job, JobFailed, JobQueueFull, job_queue, owner_of
+from core.migration import migrator
 from core.process import start_pipecat_process, terminate_process_gracefully
+from core.profiler import profiler
 from core.router import router as message_router
+from core.supervisor import supervisor
 
 # Import from the app module (will be defined in __init__.py)
 from meetingbaas_pipecat.utils.logger import logger
@@ -33,13 +62,16 @@ from utils.ngrok import (
     release_ngrok_url,
     update_ngrok_client_id,
 )
-from config.prompts import PERSONA_INTERACTION_INSTRUCTIONS
-
-# Import the new persona detail extraction service
-from app.services.persona_detail_extraction import extract_persona_details_from_prompt
 
 router = APIRouter()
 
+# Seconds between keep-alive comments on an idle job event stream
+JOB_EVENTS_HEARTBEAT_S = 15.0
+# Largest batch accepted by POST /bots/batch
+BATCH_MAX_BOTS = int(os.getenv("BATCH_MAX_BOTS", "50"))
+# MeetingBaas calls in flight at once for one batch
+BATCH_MEETINGBAAS_CONCURRENCY = int(os.getenv("BATCH_MEETINGBAAS_CONCURRENCY", "8"))
+
 
 @router.post(
     "/bots",
@@ -47,20 +79,223 @@ router = APIRouter()
     response_model=JoinResponse,
     status_code=status.HTTP_201_CREATED,
     responses={
+        200: {
+            "description": "Reused the live bot already sent to the meeting with "
+            "this persona (BOT_MEETING_DEDUP)"
+        },
         201: {"description": "Bot successfully created and joined the meeting"},
+        202: {
+            "description": "Join queued (Prefer: respond-async) - Follow it at "
+            "the Location URL"
+        },
         400: {"description": "Bad request - Missing required fields or invalid data"},
+        422: {"description": "Idempotency-Key already used with another body"},
+        307: {"description": "Node at capacity - Retry the request on another node"},
         500: {
             "description": "Server error - Failed to create bot through MeetingBaas API"
         },
+        503: {"description": "Node at capacity - Retry after the Retry-After delay"},
     },
 )
-async def join_meeting(request: BotRequest, client_request: Request):
+async def join_meeting(
+    request: BotRequest,
+    client_request: Request,
+    prefer: Optional[str] = Header(
+        None,
+        description="Send `respond-async` to get a 202 and a job to follow "
+        "instead of waiting for the bot to join",
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        description="Retries carrying the same key get the first request's "
+        "response instead of sending another bot",
+    ),
+):
     """
     Create and deploy a speaking bot in a meeting.
 
     Launches an AI-powered bot that joins a video meeting through MeetingBaas
     and processes audio using Pipecat's voice AI framework.
     """
+    # Start of the bot's startup profile (see core/profiler.py)
+    client_request.state.received_at = time.monotonic()
+    respond_async = bool(prefer and "respond-async" in prefer.lower())
+
+    async def respond():
+        if respond_async:
+            return submit_join_job(request, client_request)
+        return await _admitted_join(request, client_request)
+
+    if idempotency_key:
+        return await idempotency_cache.run(
+            owner_of(client_request.state.api_key),
+            idempotency_key,
+            {"body": request.model_dump(), "respond_async": respond_async},
+            respond,
+        )
+    return await respond()
+
+
+async def _admitted_join(
+    request: BotRequest,
+    client_request: Request,
+    progress: Optional[Callable[..., None]] = None,
+    batch: Optional[JoinBatch] = None,
+):
+    """Admit a join and run it, or reuse a live bot of the same meeting."""
+
+    async def admit_and_join():
+        # Reserve a bot slot before paying for persona, image and voice
+        # resolution
+        try:
+            await admission.acquire()
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
+        try:
+            return await _join_meeting(request, client_request, progress, batch)
+        finally:
+            admission.release()
+
+    if not BOT_MEETING_DEDUP:
+        return await admit_and_join()
+    return await meeting_dedup.join(
+        request.meeting_url,
+        persona_key(request) or ("any", request.bot_name),
+        admit_and_join,
+    )
+
+
+def _join_outcome(response) -> Tuple[int, Optional[str], Optional[str]]:
+    """Return the status code, bot ID and error message of a join's response."""
+    if isinstance(response, JoinResponse):
+        return status.HTTP_201_CREATED, response.bot_id, None
+    body = json.loads(response.body)
+    if response.status_code >= 300:
+        return response.status_code, None, body.get("message")
+    return response.status_code, body.get("bot_id"), None
+
+
+def admission_rejected_response(error: AdmissionRejected) -> JSONResponse:
+    """Build the 503 (or 307 to a peer node) response for a rejected join."""
+    headers = {"Retry-After": str(error.retry_after)}
+    if error.redirect_to:
+        headers["Location"] = error.redirect_to
+        status_code = status.HTTP_307_TEMPORARY_REDIRECT
+    else:
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(
+        content={"message": str(error), "status": "error"},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def submit_join_job(request: BotRequest, client_request: Request) -> JSONResponse:
+    """Queue a join and answer 202 with the job to follow."""
+
+    async def run(job: Job) -> Dict[str, Any]:
+        response = await _admitted_join(request, client_request, job.emit)
+        status_code, bot_id, error = _join_outcome(response)
+        if not bot_id:
+            details = {}
+            if "retry-after" in response.headers:
+                details["retry_after"] = int(response.headers["retry-after"])
+            if "location" in response.headers:
+                details["redirect_to"] = response.headers["location"]
+            raise JobFailed(error or "Join failed", status_code, **details)
+        return {"bot_id": bot_id, "reused": status_code == status.HTTP_200_OK}
+
+    try:
+        job = job_queue.submit("join", owner_of(client_request.state.api_key), run)
+    except JobQueueFull as e:
+        return JSONResponse(
+            content={"message": f"Join queue is full: {e}", "status": "error"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    status_url = f"/bots/jobs/{job.id}"
+    return JSONResponse(
+        content={
+            "job_id": job.id,
+            "state": job.state,
+            "status_url": status_url,
+            "events_url": f"{status_url}/events",
+        },
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+
+@router.post(
+    "/bots/batch",
+    tags=["bots"],
+    response_model=BatchJoinResponse,
+    responses={
+        200: {"description": "Per-bot results, in request order"},
+        400: {"description": "Bad request - Too many bots in the batch"},
+    },
+)
+async def join_meetings(batch_request: BotBatchRequest, client_request: Request):
+    """
+    Create and deploy speaking bots in many meetings at once.
+
+    Bots that ask for the same persona share its resolution (persona
+    extraction, image generation and voice matching), MeetingBaas is called
+    with bounded concurrency, and each bot is admitted on its own. Every
+    bot gets a result with the status its own `POST /bots` would have
+    answered with, so one failed meeting does not fail the batch.
+    """
+    client_request.state.received_at = time.monotonic()
+    if len(batch_request.bots) > BATCH_MAX_BOTS:
+        return JSONResponse(
+            content={
+                "message": f"At most {BATCH_MAX_BOTS} bots per batch",
+                "status": "error",
+            },
+            status_code=400,
+        )
+
+    batch = JoinBatch(BATCH_MEETINGBAAS_CONCURRENCY)
+
+    async def join_one(request: BotRequest) -> BatchJoinResult:
+        try:
+            response = await _admitted_join(request, client_request, batch=batch)
+        except Exception as e:
+            logger.exception(f"Batch join for {request.meeting_url} failed: {e}")
+            return BatchJoinResult(
+                meeting_url=request.meeting_url, status_code=500, error=str(e)
+            )
+        status_code, bot_id, error = _join_outcome(response)
+        return BatchJoinResult(
+            meeting_url=request.meeting_url,
+            status_code=status_code,
+            bot_id=bot_id,
+            error=error,
+        )
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(join_one(bot) for bot in batch_request.bots))
+    joined = sum(1 for result in results if result.bot_id)
+    logger.info(
+        f"Batch of {len(results)} bots: {joined} joined in "
+        f"{time.monotonic() - started:.2f}s"
+    )
+    return BatchJoinResponse(results=results)
+
+
+async def _join_meeting(
+    request: BotRequest,
+    client_request: Request,
+    progress: Optional[Callable[..., None]] = None,
+    batch: Optional[JoinBatch] = None,
+):
+    """
+    Resolve the persona, create the MeetingBaas bot and spawn its process.
+
+    ``progress`` is called with an event name and details as the join
+    advances, for joins run as jobs. Joins of one ``batch`` share their
+    resolution work.
+    """
     # Validate required parameters
     if not request.meeting_url:
         return JSONResponse(
@@ -100,203 +335,115 @@ async def join_meeting(request: BotRequest, client_request: Request):
 
     # Generate a unique client ID for this bot
     bot_client_id = str(uuid.uuid4())
+    profiler.mark(
+        bot_client_id,
+        "request_received",
+        timestamp=getattr(client_request.state, "received_at", None),
+    )
 
     # If we're in local dev mode and we have a temp client ID, update the mapping
     if LOCAL_DEV_MODE and temp_client_id:
         update_ngrok_client_id(temp_client_id, bot_client_id)
         log_ngrok_status()
 
-    # --- Streamlined Persona and Prompt Resolution Logic ---
-    final_prompt: str = ""
-    resolved_persona_data: Dict[str, Any] = {}
-    persona_name_for_logging: str = "Unknown"
-
-    if request.prompt: # Case 1: Custom prompt provided (dynamic persona)
-        logger.info(f"Processing custom prompt for bot {bot_client_id}")
-        prompt_derived_details = await extract_persona_details_from_prompt(request.prompt)
-
-        if prompt_derived_details and isinstance(prompt_derived_details, dict): # Ensure it's a dict
-            # Construct resolved_persona_data from derived details
-            resolved_persona_data = {
-                "name": prompt_derived_details.get("name", "Bot"),
-                "prompt": request.prompt, # Store original request prompt as the base prompt for dynamic persona
-                "description": prompt_derived_details.get("description", request.prompt), # Use derived description or fallback to full prompt
-                "gender": prompt_derived_details.get("gender", "male"),
-                "characteristics": prompt_derived_details.get("characteristics", []), # Ensure it's a list
-                "image": None, # Will be generated/resolved later
-                "cartesia_voice_id": None, # Will be matched later
-                "relevant_links": [],
-                "additional_content": None,
-                "is_temporary": True # Mark as temporary persona
-            }
-            persona_name_for_logging = resolved_persona_data["name"]
-            final_prompt = request.prompt + PERSONA_INTERACTION_INSTRUCTIONS
-            logger.info(f"Dynamically created persona '{persona_name_for_logging}' from prompt.")
-        else:
-            # Fallback if prompt details extraction fails or returns unexpected type
-            logger.warning("Failed to extract persona details from custom prompt or received unexpected type. Falling back to default bot persona.")
-            resolved_persona_data = persona_manager.get_persona("baas_onboarder")
-            resolved_persona_data["is_temporary"] = False # Ensure fallback is not marked temporary
-            persona_name_for_logging = resolved_persona_data.get("name", "baas_onboarder")
-            final_prompt = resolved_persona_data["prompt"] + PERSONA_INTERACTION_INSTRUCTIONS
-
-    else: # Case 2: No custom prompt, use pre-defined persona
-        resolved_persona_name: str
-
-        # Priority: request.personas > request.bot_name > random > baas_onboarder
-        if request.personas and len(request.personas) > 0:
-            resolved_persona_name = request.personas[0]
-            logger.info(f"Using specified persona '{resolved_persona_name}' for bot.")
-        elif request.bot_name and request.bot_name in persona_manager.personas:
-            resolved_persona_name = request.bot_name
-            logger.info(f"Using bot_name as persona '{resolved_persona_name}' for bot.")
-        else:
-            available_personas = list(persona_manager.personas.keys())
-            if available_personas:
-                resolved_persona_name = random.choice(available_personas)
-                logger.info(f"No persona specified, using random persona '{resolved_persona_name}' for bot.")
-            else:
-                resolved_persona_name = "baas_onboarder"
-                logger.warning("No personas found, using fallback persona: baas_onboarder.")
+    def on_step(step: Step):
+        if progress is not None:
+            progress(
+                "step",
+                step=step.name,
+                outcome=step.outcome,
+                duration_s=round(step.duration_s, 3),
+            )
 
-        try:
-            resolved_persona_data = persona_manager.get_persona(resolved_persona_name)
-            resolved_persona_data["is_temporary"] = False # Mark as not temporary
-            persona_name_for_logging = resolved_persona_data.get("name", resolved_persona_name)
-            final_prompt = resolved_persona_data["prompt"] + PERSONA_INTERACTION_INSTRUCTIONS
-            logger.info(f"Using pre-defined persona '{persona_name_for_logging}'.")
-        except KeyError as e:
-            logger.error(f"Resolved persona '{resolved_persona_name}' not found: {e}. Falling back to baas_onboarder.")
-            resolved_persona_data = persona_manager.get_persona("baas_onboarder")
-            resolved_persona_data["is_temporary"] = False # Ensure fallback is not marked temporary
-            persona_name_for_logging = resolved_persona_data.get("name", "baas_onboarder")
-            final_prompt = resolved_persona_data["prompt"] + PERSONA_INTERACTION_INSTRUCTIONS
-            logger.info(f"Using fallback persona '{persona_name_for_logging}'.")
-
-    # Populate image if not present
-    if not resolved_persona_data.get("image"):
-        image_prompt_desc = resolved_persona_data.get("description") or resolved_persona_data.get("prompt")
-        if image_prompt_desc:
-            logger.info(f"Attempting to generate image for '{persona_name_for_logging}' with prompt: {image_prompt_desc}")
-            try:
-                generated_image = await image_service.generate_persona_image(
-                    name=resolved_persona_data.get("name", "Bot"), # Use persona's resolved name
-                    prompt=image_prompt_desc,
-                    style="cinematic, detailed, photorealistic, professional headshot",
-                    size=(512, 512)
-                )
-
-                if generated_image:
-                    resolved_persona_data["image"] = generated_image
-                    logger.info(f"Generated image URL for '{persona_name_for_logging}': {generated_image}")
-                else:
-                    logger.warning(f"Image generation returned no URL.")
-                    resolved_persona_data["image"] = None # Ensure no invalid image data is stored
-            except Exception as e:
-                logger.error(f"Failed to generate image for '{persona_name_for_logging}': {e}")
+    # Resolve the persona first, then the image and the voice side by side;
+    # MeetingBaas only needs the persona and image, so it overlaps voice matching.
+    # Joins of a batch share these steps when they resolve the same persona;
+    # image and voice are keyed on the persona object, so a join that fell
+    # back to the default persona does not pick up another join's results.
+    def share(key, resolve):
+        # A single join has nobody to share with, so its deadlines cancel
+        # the resolution itself
+        if batch is None:
+            return resolve()
+        return batch.share(key, resolve)
+
+    key = persona_key(request)
+    graph = StepGraph("join", on_step=on_step)
+    graph.add(
+        "persona",
+        lambda results: share(
+            key and ("persona", key), lambda: resolve_persona(request)
+        ),
+        deadline_s=JOIN_PERSONA_DEADLINE_S,
+        fallback=default_persona,
+    )
+    graph.add(
+        "image",
+        lambda results: share(
+            ("image", id(results["persona"][0]), request.bot_image),
+            lambda: resolve_image(request, results["persona"][0]),
+        ),
+        after=("persona",),
+        deadline_s=JOIN_IMAGE_DEADLINE_S,
+        fallback=(
+            lambda: str(request.bot_image) if request.bot_image else default_bot_image()
+        ),
+    )
+    graph.add(
+        "voice",
+        lambda results: share(
+            ("voice", id(results["persona"][0])),
+            lambda: resolve_voice(results["persona"][0]),
+        ),
+        after=("persona",),
+        deadline_s=JOIN_VOICE_DEADLINE_S,
+    )
 
-    # Populate voice ID if not present
-    if not resolved_persona_data.get("cartesia_voice_id"):
-        from config.voice_utils import VoiceUtils # Import here to avoid circular dependency issues
-        voice_utils = VoiceUtils()
-        cartesia_voice_id = await voice_utils.match_voice_to_persona(persona_details=resolved_persona_data) # Pass the whole dict
-        resolved_persona_data["cartesia_voice_id"] = cartesia_voice_id
-        logger.info(f"Resolved Cartesia voice ID for '{persona_name_for_logging}': {cartesia_voice_id}")
+    async def create_bot(results: Dict[str, Any]) -> Optional[str]:
+        persona = results["persona"][0]
+        bot_image = results["image"]
+        logger.info(f"Final bot image URL: {bot_image or 'none'}")
+
+        # Store all relevant details in MEETING_DETAILS dictionary
+        MEETING_DETAILS[bot_client_id] = (
+            request.meeting_url,
+            persona.get("name", "Bot"),
+            None,  # meetingbaas_bot_id, will be set after creation
+            request.enable_tools,
+            streaming_audio_frequency,
+        )
 
-    logger.info(f"Final resolved persona data for Pipecat process:")
-    logger.info(f"  Name: {resolved_persona_data.get('name')}")
-    logger.info(f"  Image: {resolved_persona_data.get('image')}")
-    logger.info(f"  Voice ID: {resolved_persona_data.get('cartesia_voice_id')}")
-    logger.info(f"  Is Temporary: {resolved_persona_data.get('is_temporary')}")
+        # Create bot directly through MeetingBaas API
+        slots = batch.meetingbaas_slots if batch else contextlib.nullcontext()
+        async with slots:
+            return await create_meeting_bot(
+                meeting_url=request.meeting_url,
+                websocket_url=websocket_url,
+                bot_id=bot_client_id,
+                persona_name=persona.get("name", "Bot"),  # Use resolved display name
+                api_key=api_key,
+                bot_image=bot_image,
+                entry_message=entry_message(request, persona),
+                extra=request.extra,
+                streaming_audio_frequency=streaming_audio_frequency,
+            )
 
-    # Store all relevant details in MEETING_DETAILS dictionary
-    MEETING_DETAILS[bot_client_id] = (
-        request.meeting_url,
-        resolved_persona_data.get("name", persona_name_for_logging),  # Use display name from resolved data
-        None,  # meetingbaas_bot_id, will be set after creation
-        request.enable_tools,
-        streaming_audio_frequency
-    )
+    graph.add("meetingbaas", create_bot, after=("persona", "image"))
 
-    # Get image URL: Prioritize request.bot_image > persona_data.image > generate_image (if custom prompt and details derived)
-    bot_image = request.bot_image
-    if not bot_image:
-        # Check persona data first (whether existing or temporary)
-        if resolved_persona_data.get("image"):
-             # Ensure the image is a string
-            try:
-                bot_image = str(resolved_persona_data.get("image"))
-                logger.info(f"Using persona image from resolved persona data: {bot_image}")
-            except Exception as e:
-                logger.error(f"Error converting persona image from resolved persona data to string: {e}")
-                bot_image = None
-        # Only attempt to generate image if custom prompt was originally used AND details were derived
-        elif request.prompt and prompt_derived_details:
-            logger.info("Attempting to generate image based on custom LLM prompt derived details...")
-            # Use details from prompt_derived_details to create a PersonaImageRequest
-            try:
-                # Use derived details, falling back to defaults or original prompt where needed
-                image_request_data = PersonaImageRequest(
-                    name=prompt_derived_details.get("name", "Bot"), 
-                    description=prompt_derived_details.get("description", request.prompt), 
-                    gender=prompt_derived_details.get("gender", "male"), 
-                    characteristics=prompt_derived_details.get("characteristics", [])
-                )
-                # Construct a more detailed prompt for the image service if possible
-                image_prompt_desc = image_request_data.description
-                if image_request_data.gender:
-                   image_prompt_desc = f"{image_request_data.gender.capitalize()}. {image_prompt_desc}"
-                if image_request_data.characteristics:
-                   traits = ", ".join(image_request_data.characteristics)
-                   image_prompt_desc = f"{image_prompt_desc}. With features like {traits}"
-
-                # Add standard quality guidelines
-                image_prompt_desc += ". High quality, single person, only face and shoulders, centered, neutral background, avoid borders."
-
-                generated_image_url = await image_service.generate_persona_image(
-                    name=image_request_data.name,
-                    prompt=image_prompt_desc, 
-                    style="realistic", 
-                    size=(512, 512) 
-                )
-                if generated_image_url:
-                    bot_image = generated_image_url
-                    logger.info(f"Generated image: {bot_image}")
-                else:
-                    logger.error(f"Failed to generate image from prompt derived details: No URL returned.")
-                    bot_image = None
-            except Exception as e:
-                logger.error(f"Failed to generate image from prompt derived details: {e}")
-                bot_image = None
+    results = await graph.run()
+    logger.info(f"Join {bot_client_id} critical path: {graph.describe_critical_path()}")
 
-    # Ensure the bot_image is definitely a string or None before passing to 'create_meeting_bot
-    bot_image_str = str(bot_image) if bot_image is not None else None
-    if bot_image_str is not None:
-         logger.info(f"Final bot image URL: {bot_image_str}")
-    else:
-         logger.info("No bot image URL resolved.")
-
-    # Determine the final entry message
-    final_entry_message: Optional[str] = request.entry_message
-    if not final_entry_message and resolved_persona_data.get("entry_message"):
-        final_entry_message = resolved_persona_data.get("entry_message")
-    elif not final_entry_message and resolved_persona_data.get("is_temporary", False):
-        # For temporary personas without a specified entry_message, provide a dynamic default
-        final_entry_message = f"Hello, I'm {persona_name_for_logging}, ready to assist you throughout this session."
-
-    # Create bot directly through MeetingBaas API
-    # Use persona display name from resolved_persona_data for MeetingBaas API call
-    meetingbaas_bot_id = create_meeting_bot(
-        meeting_url=request.meeting_url,
-        websocket_url=websocket_url,
-        bot_id=bot_client_id,
-        persona_name=resolved_persona_data.get("name", persona_name_for_logging),  # Use resolved display name
-        api_key=api_key,
-        bot_image=bot_image_str,  # Use the pre-stringified value
-        entry_message=final_entry_message,
-        extra=request.extra,
-        streaming_audio_frequency=streaming_audio_frequency,
-    )
+    resolved_persona_data, final_prompt = results["persona"]
+    # Copied, as joins of a batch may share the resolved persona
+    resolved_persona_data = dict(resolved_persona_data)
+    resolved_persona_data["cartesia_voice_id"] = results["voice"]
+    meetingbaas_bot_id = results["meetingbaas"]
+
+    logger.info("Final resolved persona data for Pipecat process:")
+    logger.info(f"  Name: {resolved_persona_data.get('name')}")
+    logger.info(f"  Image: {results['image']}")
+    logger.info(f"  Voice ID: {resolved_persona_data.get('cartesia_voice_id')}")
+    logger.info(f"  Is Temporary: {resolved_persona_data.get('is_temporary')}")
 
     if meetingbaas_bot_id:
         # Update the meetingbaas_bot_id in MEETING_DETAILS
@@ -312,7 +459,7 @@ async def join_meeting(request: BotRequest, client_request: Request):
         # Start the Pipecat process as a subprocess
         # The Pipecat process should connect to our LOCAL WebSocket server, not the external one
         pipecat_websocket_url = f"ws://localhost:7014/pipecat/{bot_client_id}"
-        process = start_pipecat_process(
+        spawn_kwargs = dict(
             client_id=bot_client_id,
             websocket_url=pipecat_websocket_url,  # Use internal URL, not external
             meeting_url=request.meeting_url,
@@ -321,17 +468,24 @@ async def join_meeting(request: BotRequest, client_request: Request):
             enable_tools=request.enable_tools,
             api_key=api_key,
             meetingbaas_bot_id=meetingbaas_bot_id,
+            prompt=final_prompt,
         )
+        process = start_pipecat_process(**spawn_kwargs)
+        profiler.mark(bot_client_id, "spawned")
+        if progress is not None:
+            progress("spawned", bot_id=meetingbaas_bot_id)
 
-        # Store the process for later termination
+        # Store the process for later termination, and let the supervisor
+        # restart it into the same session if it crashes
         PIPECAT_PROCESSES[bot_client_id] = process
+        supervisor.register(bot_client_id, spawn_kwargs)
 
         # Return only the bot_id in the response
         return JoinResponse(bot_id=meetingbaas_bot_id)
     else:
         # Clean up MEETING_DETAILS if bot creation failed
         if bot_client_id in MEETING_DETAILS:
-             MEETING_DETAILS.pop(bot_client_id)
+            MEETING_DETAILS.pop(bot_client_id)
 
         return JSONResponse(
             content={
@@ -342,6 +496,64 @@ async def join_meeting(request: BotRequest, client_request: Request):
         )
 
 
+def _get_job(job_id: str, client_request: Request) -> Job:
+    # Jobs are only visible to the API key that queued them
+    job = job_queue.get(job_id, owner_of(client_request.state.api_key))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.get(
+    "/bots/jobs/{job_id}",
+    tags=["bots"],
+    responses={
+        200: {"description": "State, timings and progress of the join job"},
+        404: {"description": "Unknown or expired job"},
+    },
+)
+async def get_join_job(job_id: str, client_request: Request):
+    """
+    Get the state of a join queued with `Prefer: respond-async`.
+
+    Once the job has succeeded, `result.bot_id` is the MeetingBaas bot ID;
+    a failed job carries the error and the status code the join would have
+    answered with.
+    """
+    return _get_job(job_id, client_request).snapshot()
+
+
+@router.get(
+    "/bots/jobs/{job_id}/events",
+    tags=["bots"],
+    responses={
+        200: {"description": "Server-sent events stream of the job's progress"},
+        404: {"description": "Unknown or expired job"},
+    },
+)
+async def stream_join_job(job_id: str, client_request: Request):
+    """
+    Stream the progress of a join job as server-sent events.
+
+    Past events are replayed first; the stream ends after the `succeeded` or
+    `failed` event.
+    """
+    job = _get_job(job_id, client_request)
+
+    async def events():
+        async for event in job.follow(JOB_EVENTS_HEARTBEAT_S):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete(
     "/bots/{bot_id}",
     tags=["bots"],
@@ -389,7 +601,7 @@ async def leave_bot(
     # Look through MEETING_DETAILS to find the client ID for this bot ID
     for cid, details in MEETING_DETAILS.items():
         # Check if the stored meetingbaas_bot_id matches
-        if details[2] == meetingbaas_bot_id: # Accessing tuple element by index
+        if details[2] == meetingbaas_bot_id:  # Accessing tuple element by index
             client_id = cid
             logger.info(f"Found client ID {client_id} for bot ID {meetingbaas_bot_id}")
             break
@@ -402,7 +614,7 @@ async def leave_bot(
     # 1. Call MeetingBaas API to make the bot leave
     if meetingbaas_bot_id:
         logger.info(f"Removing bot with ID: {meetingbaas_bot_id} from MeetingBaas API")
-        result = leave_meeting_bot(
+        result = await leave_meeting_bot(
             bot_id=meetingbaas_bot_id,
             api_key=api_key,
         )
@@ -441,6 +653,13 @@ async def leave_bot(
         await asyncio.sleep(0.5)
 
     # 3. Terminate the Pipecat process after WebSockets are closed
+    stopped_remote = False
+    if client_id:
+        supervisor.unregister(client_id)
+        # Sessions migrated to a peer node have their worker there
+        stopped_remote = await migrator.stop_remote(client_id)
+        if stopped_remote:
+            MEETING_DETAILS.pop(client_id, None)
     if client_id and client_id in PIPECAT_PROCESSES:
         process = PIPECAT_PROCESSES[client_id]
         if process and process.poll() is None:  # If process is still running
@@ -468,7 +687,7 @@ async def leave_bot(
         if LOCAL_DEV_MODE and client_id:
             release_ngrok_url(client_id)
             log_ngrok_status()
-    else:
+    elif not stopped_remote:
         logger.warning(f"No Pipecat process found for client {client_id}")
 
     return {
@@ -515,13 +734,13 @@ async def generate_persona_image(request: PersonaImageRequest) -> PersonaImageRe
             name=name, prompt=prompt, style="realistic", size=(512, 512)
         )
 
-        if not image_generation_result: # Check if the string is empty/None
+        if not image_generation_result:  # Check if the string is empty/None
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to generate image: No URL returned."
+                detail="Failed to generate image: No URL returned.",
             )
 
-        image_url = image_generation_result # Use the string directly
+        image_url = image_generation_result  # Use the string directly
 
         return PersonaImageResponse(
             name=name,
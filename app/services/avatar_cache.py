@@ -0,0 +1,86 @@
+"""Content-addressed cache of generated persona avatars.
+
+Maps a hash of everything that determines a generated image (model version
+and generation inputs) to the URL the image was uploaded to, so an avatar
+is only generated and paid for once.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from core.executors import ExecutorSaturatedError, io_executor
+from core.metrics import metrics
+
+AVATAR_CACHE_PATH = os.getenv(
+    "AVATAR_CACHE_PATH",
+    os.path.join(
+        os.getenv(
+            "BOT_STATE_DIR",
+            os.path.join(tempfile.gettempdir(), "speaking-meeting-bot"),
+        ),
+        "avatar_cache.json",
+    ),
+)
+
+
+def avatar_key(model: str, inputs: Dict[str, Any]) -> str:
+    """Hash a model version and its generation inputs."""
+    canonical = json.dumps({"model": model, "inputs": inputs}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class AvatarCache:
+    """Avatar URLs by content hash, persisted to a local JSON file."""
+
+    def __init__(self, path: str = AVATAR_CACHE_PATH):
+        self.path = path
+        self._urls: Optional[Dict[str, str]] = None
+        self._save_lock = asyncio.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        if self._urls is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._urls = json.load(f)
+            except FileNotFoundError:
+                self._urls = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable avatar cache {self.path}: {e}")
+                self._urls = {}
+        return self._urls
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the uploaded URL for an avatar, or None if it was never made."""
+        url = self._load().get(key)
+        metrics.increment("avatar_cache_lookups_total", result="hit" if url else "miss")
+        return url
+
+    async def put(self, key: str, url: str):
+        """Record the uploaded URL of a generated avatar."""
+        self._load()[key] = url
+        async with self._save_lock:
+            try:
+                await io_executor.run(self._save, dict(self._urls))
+            except ExecutorSaturatedError as e:
+                # Still cached in memory; written out with the next avatar
+                logger.warning(f"Avatar cache not saved: {e}")
+
+    def _save(self, urls: Dict[str, str]):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(urls, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write avatar cache {self.path}: {e}")
+
+
+# Create a singleton instance
+avatar_cache = AvatarCache()
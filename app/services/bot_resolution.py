@@ -0,0 +1,254 @@
+"""Resolution steps run concurrently by POST /bots before a bot can join.
+
+Each function is one step of the join graph built in ``app/routes.py``: the
+persona comes first, then image and voice resolution run side by side.
+"""
+
+import asyncio
+import os
+import random
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.services.image_service import image_service
+from app.services.persona_detail_extraction import extract_persona_details_from_prompt
+from config.persona_utils import persona_manager
+from config.prompts import PERSONA_INTERACTION_INSTRUCTIONS
+from core.singleflight import SingleFlight
+from meetingbaas_pipecat.utils.logger import logger
+
+# Per-step budgets of the join; a step past its budget falls back
+JOIN_PERSONA_DEADLINE_S = float(os.getenv("JOIN_PERSONA_DEADLINE_S", "15"))
+JOIN_IMAGE_DEADLINE_S = float(os.getenv("JOIN_IMAGE_DEADLINE_S", "8"))
+JOIN_VOICE_DEADLINE_S = float(os.getenv("JOIN_VOICE_DEADLINE_S", "10"))
+# Keep generating an avatar after its join gave up on it, so the next join
+# of the persona finds it cached; false cancels the Replicate prediction
+JOIN_IMAGE_FINISH_LATE = os.getenv("JOIN_IMAGE_FINISH_LATE", "true").lower() == "true"
+# Avatar used when no image is given and generation misses its deadline;
+# defaults to the fallback persona's image
+DEFAULT_BOT_IMAGE = os.getenv("DEFAULT_BOT_IMAGE") or None
+
+FALLBACK_PERSONA = "baas_onboarder"
+PERSONA_IMAGE_STYLE = "cinematic, detailed, photorealistic, professional headshot"
+PERSONA_IMAGE_SIZE = (512, 512)
+
+# Image generations still running, possibly after their join moved on
+_generations: Set[asyncio.Task] = set()
+
+
+def _forget_generation(task: asyncio.Task):
+    _generations.discard(task)
+    if not task.cancelled():
+        # Consume errors of generations nobody awaits any more; the image
+        # service has already logged them
+        task.exception()
+
+
+class JoinBatch:
+    """
+    Resolution work shared by the joins of a batch.
+
+    Joins asking for the same persona share one persona resolution, and then
+    one image and one voice resolution; MeetingBaas calls are bounded by
+    ``meetingbaas_concurrency``. A single join has no batch and shares
+    nothing.
+    """
+
+    def __init__(self, meetingbaas_concurrency: int = 1):
+        self.meetingbaas_slots = asyncio.Semaphore(meetingbaas_concurrency)
+        # One group per step, so shared persona, image and voice resolutions
+        # are counted apart
+        self._flights: Dict[str, SingleFlight] = {}
+
+    async def share(
+        self, key: Optional[Hashable], resolve: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run ``resolve`` once per key and give every caller its result.
+
+        A None key is never shared; other keys start with the step's name. A
+        join that gives up on a shared step (its deadline passed) stops
+        waiting without cancelling the step for the others; once no join
+        waits for it, the step is cancelled.
+        """
+        if key is None:
+            return await resolve()
+        flight = self._flights.get(key[0])
+        if flight is None:
+            flight = self._flights[key[0]] = SingleFlight(
+                f"batch_{key[0]}", listed=False
+            )
+        return await flight.do(key, resolve)
+
+
+def persona_key(request) -> Optional[Tuple[str, str]]:
+    """Key of the persona a request resolves to, None if picked at random."""
+    if request.prompt:
+        return ("prompt", request.prompt)
+    if request.personas:
+        return ("persona", request.personas[0])
+    if request.bot_name and request.bot_name in persona_manager.personas:
+        return ("persona", request.bot_name)
+    return None
+
+
+def default_bot_image() -> Optional[str]:
+    """Return the avatar of bots whose image could not be resolved in time."""
+    if DEFAULT_BOT_IMAGE:
+        return DEFAULT_BOT_IMAGE
+    return persona_manager.personas.get(FALLBACK_PERSONA, {}).get("image") or None
+
+
+def default_persona() -> Tuple[Dict[str, Any], str]:
+    """Return the fallback persona and its prompt."""
+    persona = persona_manager.get_persona(FALLBACK_PERSONA)
+    persona["is_temporary"] = False  # Ensure fallback is not marked temporary
+    # get_persona() already appends the interaction instructions
+    return persona, persona["prompt"]
+
+
+async def resolve_persona(request) -> Tuple[Dict[str, Any], str]:
+    """
+    Resolve the persona data and system prompt for a join request.
+
+    Args:
+        request: The BotRequest
+
+    Returns:
+        tuple: (resolved persona data, final system prompt)
+    """
+    if request.prompt:  # Case 1: Custom prompt provided (dynamic persona)
+        details = await extract_persona_details_from_prompt(request.prompt)
+        if not details or not isinstance(details, dict):
+            logger.warning(
+                "Failed to extract persona details from custom prompt or received "
+                "unexpected type. Falling back to default bot persona."
+            )
+            return default_persona()
+
+        persona = {
+            "name": details.get("name", "Bot"),
+            # Store original request prompt as the base prompt for dynamic persona
+            "prompt": request.prompt,
+            "description": details.get("description", request.prompt),
+            "gender": details.get("gender", "male"),
+            "characteristics": details.get("characteristics", []),
+            "image": None,  # Will be generated/resolved later
+            "cartesia_voice_id": None,  # Will be matched later
+            "relevant_links": [],
+            "additional_content": None,
+            "is_temporary": True,  # Mark as temporary persona
+        }
+        logger.info(f"Dynamically created persona '{persona['name']}' from prompt.")
+        return persona, request.prompt + PERSONA_INTERACTION_INSTRUCTIONS
+
+    # Case 2: No custom prompt, use pre-defined persona
+    # Priority: request.personas > request.bot_name > random > baas_onboarder
+    if request.personas:
+        persona_name = request.personas[0]
+        logger.info(f"Using specified persona '{persona_name}' for bot.")
+    elif request.bot_name and request.bot_name in persona_manager.personas:
+        persona_name = request.bot_name
+        logger.info(f"Using bot_name as persona '{persona_name}' for bot.")
+    elif persona_manager.personas:
+        persona_name = random.choice(list(persona_manager.personas))
+        logger.info(f"No persona specified, using random persona '{persona_name}'.")
+    else:
+        logger.warning("No personas found, using fallback persona: baas_onboarder.")
+        return default_persona()
+
+    try:
+        persona = persona_manager.get_persona(persona_name)
+    except KeyError as e:
+        logger.error(
+            f"Resolved persona '{persona_name}' not found: {e}. "
+            f"Falling back to baas_onboarder."
+        )
+        return default_persona()
+    persona["is_temporary"] = False
+    logger.info(f"Using pre-defined persona '{persona.get('name', persona_name)}'.")
+    # get_persona() already appends the interaction instructions
+    return persona, persona["prompt"]
+
+
+def image_prompt(persona: Dict[str, Any]) -> Optional[str]:
+    """Build the image generation prompt for a persona, None if it has no text."""
+    description = persona.get("description") or persona.get("prompt")
+    if not description:
+        return None
+    if persona.get("is_temporary"):
+        # Dynamic personas: add the derived gender, traits and framing
+        if persona.get("gender"):
+            description = f"{persona['gender'].capitalize()}. {description}"
+        if persona.get("characteristics"):
+            traits = ", ".join(persona["characteristics"])
+            description = f"{description}. With features like {traits}"
+        description += (
+            ". High quality, single person, only face and shoulders, centered, "
+            "neutral background, avoid borders."
+        )
+    return description
+
+
+async def resolve_image(request, persona: Dict[str, Any]) -> Optional[str]:
+    """
+    Resolve the bot's avatar URL.
+
+    Priority: request.bot_image > persona image > generated image.
+    """
+    if request.bot_image:
+        return str(request.bot_image)
+    if persona.get("image"):
+        return str(persona["image"])
+
+    prompt = image_prompt(persona)
+    if not prompt:
+        return default_bot_image()
+    logger.info(f"Generating image for '{persona.get('name')}' with prompt: {prompt}")
+    task = asyncio.create_task(
+        image_service.generate_persona_image(
+            name=persona.get("name", "Bot"),
+            prompt=prompt,
+            style=PERSONA_IMAGE_STYLE,
+            size=PERSONA_IMAGE_SIZE,
+        )
+    )
+    _generations.add(task)
+    task.add_done_callback(_forget_generation)
+    if JOIN_IMAGE_FINISH_LATE:
+        # Shielded so a generation that misses the join's deadline still
+        # finishes and lands in the avatar cache for the next join
+        image_url = await asyncio.shield(task)
+    else:
+        image_url = await task
+    if not image_url:
+        logger.warning("Image generation returned no URL.")
+        return default_bot_image()
+    persona["image"] = image_url
+    return image_url
+
+
+async def resolve_voice(persona: Dict[str, Any]) -> Optional[str]:
+    """Resolve the persona's Cartesia voice ID, matching one if it has none."""
+    if persona.get("cartesia_voice_id"):
+        return persona["cartesia_voice_id"]
+    # Import here to avoid circular dependency issues
+    from config.voice_utils import VoiceUtils
+
+    voice_id = await VoiceUtils().match_voice_to_persona(persona_details=persona)
+    logger.info(f"Resolved Cartesia voice ID for '{persona.get('name')}': {voice_id}")
+    return voice_id
+
+
+def entry_message(request, persona: Dict[str, Any]) -> Optional[str]:
+    """Return the message the bot says when it joins."""
+    if request.entry_message:
+        return request.entry_message
+    if persona.get("entry_message"):
+        return persona["entry_message"]
+    if persona.get("is_temporary", False):
+        # For temporary personas without a specified entry_message
+        return (
+            f"Hello, I'm {persona.get('name', 'Bot')}, ready to assist you "
+            f"throughout this session."
+        )
+    return None
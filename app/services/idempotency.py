@@ -0,0 +1,249 @@
+"""Replay protection for bot joins.
+
+Two layers keep client retries from launching duplicate bots:
+
+- ``IdempotencyCache`` answers a repeated ``Idempotency-Key`` with the
+  response of the first request, waiting for it if it is still running.
+- ``MeetingDedup`` optionally reuses the live bot already sent to the same
+  meeting with the same persona.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi.responses import JSONResponse, Response
+from loguru import logger
+from pydantic import BaseModel
+
+from core.connection import MEETING_DETAILS
+from core.metrics import metrics
+
+# How long a response is replayed for its Idempotency-Key
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+# Idempotency keys remembered at once; the oldest are forgotten first
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+# Reuse a live bot of the same meeting and persona instead of sending another
+BOT_MEETING_DEDUP = os.getenv("BOT_MEETING_DEDUP", "false").lower() == "true"
+
+# Headers kept with a stored response
+_REPLAYED_HEADERS = ("location", "retry-after")
+
+_Entry = Tuple[str, "asyncio.Task[_StoredResponse]", float]
+
+
+def _fingerprint(payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class _StoredResponse:
+    """A finished response, detached from the request that produced it."""
+
+    def __init__(self, response: Any, status_code: int):
+        if isinstance(response, Response):
+            self.status_code = response.status_code
+            self.body = bytes(response.body)
+            self.media_type = response.media_type
+            self.headers = {
+                name: response.headers[name]
+                for name in _REPLAYED_HEADERS
+                if name in response.headers
+            }
+        else:
+            self.status_code = status_code
+            if isinstance(response, BaseModel):
+                response = response.model_dump()
+            self.body = json.dumps(response).encode()
+            self.media_type = "application/json"
+            self.headers = {}
+
+    def replay(self, replayed: bool) -> Response:
+        headers = dict(self.headers)
+        if replayed:
+            headers["Idempotent-Replayed"] = "true"
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+class IdempotencyCache:
+    """Responses by (API key owner, Idempotency-Key), kept for a TTL."""
+
+    def __init__(
+        self, ttl: float = IDEMPOTENCY_TTL_S, max_keys: int = IDEMPOTENCY_MAX_KEYS
+    ):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        # (owner, key) -> (request fingerprint, task producing the response,
+        # expiry)
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+
+    def _prune(self):
+        now = time.monotonic()
+        while self._entries:
+            key, (_, task, expires_at) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_keys and expires_at > now:
+                break
+            if not task.done():
+                # Never drop a key while its request is still running
+                self._entries.move_to_end(key)
+                break
+            del self._entries[key]
+
+    async def run(
+        self,
+        owner: str,
+        key: str,
+        payload: Dict[str, Any],
+        respond: Callable[[], Awaitable[Any]],
+        status_code: int = 201,
+    ) -> Response:
+        """
+        Respond to a request carrying an Idempotency-Key.
+
+        The first request with a key runs ``respond``; repeats get the same
+        response, waiting for it if needed. Shielded, so the first request's
+        client going away does not cancel the work its retry waits for.
+        Errors and responses worth retrying (3xx, 5xx) are forgotten once
+        produced, even if the first client has gone away.
+
+        Args:
+            owner: Who the key belongs to, so clients cannot read each other's
+            key: The Idempotency-Key header
+            payload: Request body, which repeats must match
+            respond: Coroutine function producing the response
+            status_code: Status of responses returned as models
+
+        Returns:
+            The response, or 422 if the key was used with another body
+        """
+        self._prune()
+        fingerprint = _fingerprint(payload)
+        entry = self._entries.get((owner, key))
+        if entry is not None:
+            if entry[0] != fingerprint:
+                metrics.increment("idempotency_lookups_total", result="mismatch")
+                return JSONResponse(
+                    content={
+                        "message": "Idempotency-Key was already used with another "
+                        "request body",
+                        "status": "error",
+                    },
+                    status_code=422,
+                )
+            metrics.increment(
+                "idempotency_lookups_total",
+                result="replayed" if entry[1].done() else "joined",
+            )
+            stored = await asyncio.shield(entry[1])
+            return stored.replay(replayed=True)
+
+        metrics.increment("idempotency_lookups_total", result="miss")
+
+        async def produce() -> _StoredResponse:
+            return _StoredResponse(await respond(), status_code)
+
+        task = asyncio.create_task(produce())
+        self._entries[(owner, key)] = (
+            fingerprint,
+            task,
+            time.monotonic() + self.ttl,
+        )
+        # Forgotten when the task ends, whether or not its first client is
+        # still there to see it
+        task.add_done_callback(lambda done: self._settle((owner, key), done))
+        stored = await asyncio.shield(task)
+        return stored.replay(replayed=False)
+
+    def _settle(self, key: Tuple[str, str], task: "asyncio.Task[_StoredResponse]"):
+        if task.cancelled() or task.exception() is not None:
+            retry = True
+        else:
+            status_code = task.result().status_code
+            retry = status_code >= 500 or 300 <= status_code < 400
+        entry = self._entries.get(key)
+        if retry and entry is not None and entry[1] is task:
+            del self._entries[key]
+
+
+class MeetingDedup:
+    """Live and in-flight joins by meeting and requested persona."""
+
+    def __init__(self):
+        self._live: Dict[Hashable, str] = {}
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(meeting_url: str, persona: Hashable) -> Hashable:
+        return (meeting_url.strip().rstrip("/").lower(), persona)
+
+    @staticmethod
+    def _alive(bot_id: str) -> bool:
+        # Sessions leave MEETING_DETAILS when their bot leaves or ends
+        return any(details[2] == bot_id for details in MEETING_DETAILS.values())
+
+    async def join(
+        self,
+        meeting_url: str,
+        persona: Hashable,
+        start: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Reuse the bot already in a meeting with a persona, or start one.
+
+        Args:
+            meeting_url: Meeting the bot joins
+            persona: Key of the requested persona
+            start: Coroutine function joining a new bot; a ``bot_id``
+                attribute on its result marks a successful join
+
+        Returns:
+            The result of ``start``, or a 200 naming the reused bot
+        """
+        key = self._key(meeting_url, persona)
+        bot_id = self._live.get(key)
+        if bot_id and self._alive(bot_id):
+            return self._reused(bot_id, meeting_url)
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            if getattr(result, "bot_id", None):
+                return self._reused(result.bot_id, meeting_url)
+            # The join we waited for failed; try our own
+            return await start()
+
+        task = asyncio.create_task(start())
+        self._pending[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._pending.pop(key, None)
+        if getattr(result, "bot_id", None):
+            self._live[key] = result.bot_id
+        # Forget bots that have left
+        for live_key in [k for k, v in self._live.items() if not self._alive(v)]:
+            del self._live[live_key]
+        return result
+
+    def _reused(self, bot_id: str, meeting_url: str) -> JSONResponse:
+        metrics.increment("meeting_dedup_reused_total")
+        logger.info(f"Reusing bot {bot_id} already in {meeting_url}")
+        return JSONResponse(
+            content={"bot_id": bot_id},
+            status_code=200,
+            headers={"X-Bot-Reused": "true"},
+        )
+
+
+# Create the singleton instances
+idempotency_cache = IdempotencyCache()
+meeting_dedup = MeetingDedup()
@@ -1,22 +1,39 @@
 """Service for handling image generation using Replicate."""
 
+import re
+import time
 from typing import Optional
 from loguru import logger
 from PIL import Image
-import requests
+import aiohttp
 from io import BytesIO
 import os
-import replicate
-from pathlib import Path
 from dotenv import load_dotenv
 from config.image_uploader import UTFSUploader
 from config.prompts import IMAGE_NEGATIVE_PROMPT
-import asyncio
+from app.services.avatar_cache import avatar_cache, avatar_key
+from app.services.replicate_client import ReplicateClient
+from core.breakers import breakers
+from core.metrics import metrics
+from core.singleflight import SingleFlight
+
+# Budget for downloading a generated image or uploading it
+IMAGE_TRANSFER_TIMEOUT_S = float(os.getenv("IMAGE_TRANSFER_TIMEOUT_S", "30"))
+
+SDXL_MODEL = "stability-ai/sdxl:7762fd07cf82c948538e41f63f77d685e02b063e37e496e96eefd46c929f9bdc"
 
 
 # Load environment variables
 load_dotenv()
 
+# Avatar generations in flight, by avatar cache key
+_generations = SingleFlight("avatar_generation")
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "persona"
+
+
 class ImageService:
     """Service for handling image generation and processing."""
     
@@ -31,9 +48,41 @@ class ImageService:
         self.replicate_key = os.getenv("REPLICATE_KEY", "")
         if self.replicate_key.startswith("sk_live_"):
             self.replicate_key = self.replicate_key.replace("sk_live_", "")
-        os.environ["REPLICATE_API_TOKEN"] = self.replicate_key
+        self.replicate = ReplicateClient(self.replicate_key)
         logger.info("Initialized Replicate client and UTFSUploader for image generation")
+        self._session: Optional[aiohttp.ClientSession] = None
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        # One pooled session for downloads and uploads, opened on first use
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=IMAGE_TRANSFER_TIMEOUT_S)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _download(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> tuple[bytes, str]:
+        """Download an image into memory, returning its bytes and MIME type."""
+        started = time.monotonic()
+        buffer = BytesIO()
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Failed to download image. Status code: {response.status}"
+                )
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                buffer.write(chunk)
+            content_type = response.content_type or "image/png"
+        metrics.observe("image_download_seconds", time.monotonic() - started)
+        return buffer.getvalue(), content_type
+
     async def generate_persona_image(
         self,
         name: str,
@@ -42,27 +91,48 @@ class ImageService:
         size: tuple[int, int] = (512, 512)
         ) -> str:
 
-        try:
-            # Add style to prompt
-            full_prompt = f"{style} style, {prompt}"
+        # Add style to prompt
+        full_prompt = f"{style} style, {prompt}"
+        inputs = {
+            "prompt": full_prompt,
+            "width": size[0],
+            "height": size[1],
+            "refine": "expert_ensemble_refiner",
+            "apply_watermark": False,
+            "num_inference_steps": 25,
+            "negative_prompt": IMAGE_NEGATIVE_PROMPT,
+            "scheduler": "DPMSolverMultistep",
+            "guidance_scale": 7.5,
+        }
+
+        # Same model and inputs give the same avatar, so reuse the upload
+        cache_key = avatar_key(SDXL_MODEL, inputs)
+        cached_url = avatar_cache.get(cache_key)
+        if cached_url:
+            logger.info(f"Using cached avatar for {name}: {cached_url}")
+            return cached_url
+
+        # Joins generating the same avatar at once share one prediction
+        return await _generations.do(
+            cache_key,
+            lambda: self._generate(name, full_prompt, inputs, cache_key),
+        )
 
+    async def _generate(
+        self, name: str, full_prompt: str, inputs: dict, cache_key: str
+    ) -> str:
+        """Generate an avatar on Replicate, upload it and cache its URL."""
+        try:
             logger.info(f"Generating image with prompt: {full_prompt}")
 
-            # Generate image using Replicate's SDXL
-            output = await asyncio.to_thread(replicate.run,
-                "stability-ai/sdxl:7762fd07cf82c948538e41f63f77d685e02b063e37e496e96eefd46c929f9bdc",
-                input={
-                    "prompt": full_prompt,
-                    "width": size[0],
-                    "height": size[1],
-                    "refine": "expert_ensemble_refiner",
-                    "apply_watermark": False,
-                    "num_inference_steps": 25,
-                    "negative_prompt": IMAGE_NEGATIVE_PROMPT,
-                    "scheduler": "DPMSolverMultistep",
-                    "guidance_scale": 7.5,
-                },
-            )
+            # Generate image using Replicate's SDXL, polling without a thread;
+            # cancelling this coroutine cancels the prediction
+            session = self._get_session()
+            started = time.monotonic()
+            # Fails fast with CircuitOpenError while Replicate keeps failing
+            async with breakers.guard("replicate"):
+                output = await self.replicate.run(session, SDXL_MODEL, inputs)
+            metrics.observe("image_generation_seconds", time.monotonic() - started)
 
             if not output or len(output) == 0:
                 raise ValueError("No output received from Replicate")
@@ -73,28 +143,23 @@ class ImageService:
             else:
                 raise ValueError(f"Unexpected output format from Replicate: {output}")
 
-            # Download the image
-            response = requests.get(image_url)
-            if response.status_code != 200:
-                raise ValueError(f"Failed to download image. Status code: {response.status_code}")
-            
-            # Save to temporary file
-            temp_path = f"{name}.png"
-            with open(temp_path, "wb") as f:
-                f.write(response.content)
-
-            # Upload to UTFS
-            file_url = await asyncio.to_thread(self.uploader.upload_file, Path(temp_path))
-
-            # Clean up temporary file
-            try:
-                os.remove(temp_path)
-            except FileNotFoundError:
-                logger.warning(f"Temporary image file not found for cleanup: {temp_path}")
+            # Stream the image into memory and upload it from there
+            image_data, content_type = await self._download(session, image_url)
+
+            started = time.monotonic()
+            file_url = await self.uploader.upload_bytes(
+                session,
+                image_data,
+                # Content-addressed, so joins sharing a persona name never clash
+                file_name=f"{_slug(name)}-{cache_key[:16]}.png",
+                file_type=content_type,
+            )
+            metrics.observe("image_upload_seconds", time.monotonic() - started)
 
             if not file_url:
                 raise ValueError("Failed to upload image to UTFS")
 
+            await avatar_cache.put(cache_key, file_url)
             return file_url
         
         except Exception as e:       
@@ -0,0 +1,118 @@
+"""Persona details extracted from prompts, in an LRU with an optional SQLite tier."""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from core.executors import ExecutorSaturatedError, io_executor
+from core.metrics import metrics
+
+# Extractions kept in memory
+PERSONA_CACHE_SIZE = int(os.getenv("PERSONA_CACHE_SIZE", "1024"))
+# SQLite file that keeps extractions across restarts; empty keeps them in memory only
+PERSONA_CACHE_DB = os.getenv("PERSONA_CACHE_DB", "")
+
+
+def cache_key(prompt: str, model: str) -> str:
+    """Hash a prompt, ignoring whitespace differences, together with the model."""
+    normalized = re.sub(r"\s+", " ", prompt).strip()
+    return hashlib.sha256(f"{model}\0{normalized}".encode()).hexdigest()
+
+
+class PersonaDetailsCache:
+    """In-memory LRU of extraction results with an optional SQLite tier."""
+
+    def __init__(
+        self, max_size: int = PERSONA_CACHE_SIZE, db_path: str = PERSONA_CACHE_DB
+    ):
+        self.max_size = max_size
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # SQLite calls run in worker threads, one at a time
+        self._db_lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS persona_details "
+                "(key TEXT PRIMARY KEY, details TEXT NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT details FROM persona_details WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _db_put(self, key: str, details: Dict[str, Any]):
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO persona_details (key, details) VALUES (?, ?)",
+                (key, json.dumps(details)),
+            )
+            db.commit()
+
+    def _remember(self, key: str, details: Dict[str, Any]):
+        self._entries[key] = details
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, prompt: str, model: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached details for a prompt, or None on a miss."""
+        key = cache_key(prompt, model)
+        details = self._entries.get(key)
+        if details is not None:
+            self._entries.move_to_end(key)
+            metrics.increment("persona_cache_lookups_total", result="memory_hit")
+            return copy.deepcopy(details)
+        if self.db_path:
+            try:
+                details = await io_executor.run(self._db_get, key)
+            except (
+                sqlite3.Error, OSError, ValueError, ExecutorSaturatedError
+            ) as e:
+                logger.warning(f"Persona cache lookup failed: {e}")
+            if details is not None:
+                self._remember(key, details)
+                metrics.increment("persona_cache_lookups_total", result="sqlite_hit")
+                return copy.deepcopy(details)
+        metrics.increment("persona_cache_lookups_total", result="miss")
+        return None
+
+    async def put(self, prompt: str, model: str, details: Dict[str, Any]):
+        """Cache the details extracted from a prompt."""
+        key = cache_key(prompt, model)
+        details = copy.deepcopy(details)
+        self._remember(key, details)
+        if self.db_path:
+            try:
+                await io_executor.run(self._db_put, key, details)
+            except (sqlite3.Error, OSError, ExecutorSaturatedError) as e:
+                logger.warning(f"Persona cache write failed: {e}")
+
+
+# Create a singleton instance
+persona_cache = PersonaDetailsCache()
@@ -1,15 +1,36 @@
+import copy
 import openai
 import json
 import os
 from typing import Any, Dict, Optional
 from loguru import logger
 
+from app.services.persona_cache import persona_cache
+from config.openai_client import get_openai_client
+from core.breakers import breakers
+from core.ratelimit import rate_limits
+from core.singleflight import SingleFlight
+
+PERSONA_EXTRACTION_MODEL = "gpt-4o"
+
+# Joins extracting the same prompt at once share one LLM call
+_extractions = SingleFlight("persona_extraction")
+
+
 async def extract_persona_details_from_prompt(
     prompt_text: str,
 ) -> Dict[str, Any]:
     """
     Analyzes a prompt to extract persona details like name, gender, description, and characteristics.
     """
+    details = await _extractions.do(
+        prompt_text, lambda: _extract_persona_details(prompt_text)
+    )
+    # Each caller gets its own copy of the shared result
+    return copy.deepcopy(details)
+
+
+async def _extract_persona_details(prompt_text: str) -> Optional[Dict[str, Any]]:
     prompt = f'''Analyze the following text prompt and extract the persona's name, gender, a brief description for image generation, and a list of characteristics.
 If no explicit name is mentioned, generate a concise, descriptive name that clearly indicates the persona's role or key trait, based on the description and characteristics. This name should *not* be a personal name unless explicitly provided in the prompt. For example, if the description is about an interviewer, the name could be 'Interviewer Bot'.
 
@@ -30,17 +51,24 @@ JSON Output:'''
         logger.error("OPENAI_API_KEY environment variable not set.")
         return None
 
+    # Integrations send the same prompts over and over
+    cached = await persona_cache.get(prompt_text, PERSONA_EXTRACTION_MODEL)
+    if cached is not None:
+        logger.info(f"Using cached persona details for '{cached.get('name')}'")
+        return cached
+
     try:
-        # Use async client
-        client = openai.AsyncOpenAI(api_key=api_key)
+        # Use the shared async client
+        client = get_openai_client()
 
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": prompt},
-            ],
-        )
+        async with breakers.guard("openai"), rate_limits.permit("openai"):
+            response = await client.chat.completions.create(
+                model=PERSONA_EXTRACTION_MODEL,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": prompt},
+                ],
+            )
 
         content = response.choices[0].message.content
         if content:
@@ -55,7 +83,8 @@ JSON Output:'''
             # Ensure characteristics is a list, default to empty list if null or not list
             characteristics = extracted_data.get("characteristics")
             extracted_data["characteristics"] = characteristics if isinstance(characteristics, list) else []
-            
+
+            await persona_cache.put(prompt_text, PERSONA_EXTRACTION_MODEL, extracted_data)
             return extracted_data
         else:
             logger.warning("LLM returned empty content for persona details extraction.")
@@ -0,0 +1,151 @@
+"""Async client for Replicate predictions.
+
+A prediction is created through the HTTP API and polled on a shared aiohttp
+session, so a running generation holds no thread, and cancelling the
+awaiting task cancels the prediction on Replicate too.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import aiohttp
+from loguru import logger
+
+from core.metrics import metrics
+from core.ratelimit import rate_limits
+
+REPLICATE_API_URL = os.getenv("REPLICATE_API_URL", "https://api.replicate.com")
+# First and longest delay between two polls of a running prediction
+REPLICATE_POLL_INTERVAL_S = float(os.getenv("REPLICATE_POLL_INTERVAL_S", "0.5"))
+REPLICATE_MAX_POLL_INTERVAL_S = float(os.getenv("REPLICATE_MAX_POLL_INTERVAL_S", "2"))
+# Predictions still running after this long are cancelled
+REPLICATE_PREDICTION_TIMEOUT_S = float(
+    os.getenv("REPLICATE_PREDICTION_TIMEOUT_S", "120")
+)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+
+
+class ReplicateError(Exception):
+    """Raised when a prediction cannot be created or does not succeed."""
+
+
+class ReplicateClient:
+    """Creates Replicate predictions and awaits them by polling."""
+
+    def __init__(self, api_token: str, base_url: str = REPLICATE_API_URL):
+        self.api_token = api_token
+        self.base_url = base_url.rstrip("/")
+        self.in_flight = 0
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_token}"}
+
+    async def _call(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        limiter: str = "replicate_poll",
+    ) -> Dict[str, Any]:
+        async with (
+            rate_limits.permit(limiter),
+            session.request(
+                method, f"{self.base_url}{path}", json=payload, headers=self._headers
+            ) as response,
+        ):
+            if response.status >= 300:
+                raise ReplicateError(
+                    f"{method} {path} failed: {response.status} - "
+                    f"{(await response.text())[:200]}"
+                )
+            return await response.json()
+
+    async def run(
+        self,
+        session: aiohttp.ClientSession,
+        model: str,
+        inputs: Dict[str, Any],
+        timeout_s: float = REPLICATE_PREDICTION_TIMEOUT_S,
+    ) -> Any:
+        """
+        Run a model version and return its output.
+
+        Args:
+            session: Session to send the requests through
+            model: ``owner/name:version`` reference of the model version
+            inputs: Model inputs
+            timeout_s: Seconds before the prediction is cancelled
+
+        Returns:
+            The prediction's output, e.g. a list of image URLs for SDXL
+
+        Raises:
+            ReplicateError: If the prediction fails, is canceled or times out
+        """
+        version = model.rsplit(":", 1)[-1]
+        # Only creations take a token of the replicate bucket, so polls of
+        # running predictions never queue behind new generations
+        prediction = await self._call(
+            session,
+            "POST",
+            "/v1/predictions",
+            {"version": version, "input": inputs},
+            limiter="replicate",
+        )
+        prediction_id = prediction["id"]
+        self.in_flight += 1
+        metrics.set_gauge("replicate_predictions_in_flight", self.in_flight)
+        outcome = "error"
+        try:
+            prediction = await asyncio.wait_for(
+                self._wait(session, prediction), timeout_s
+            )
+            outcome = prediction["status"]
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            await self._cancel(session, prediction_id)
+            raise ReplicateError(
+                f"Prediction {prediction_id} still running after {timeout_s:g}s"
+            ) from None
+        except asyncio.CancelledError:
+            outcome = "abandoned"
+            # Stop paying for a result nobody is waiting for
+            await asyncio.shield(self._cancel(session, prediction_id))
+            raise
+        finally:
+            self.in_flight -= 1
+            metrics.set_gauge("replicate_predictions_in_flight", self.in_flight)
+            metrics.increment("replicate_predictions_total", outcome=outcome)
+
+        if prediction["status"] != "succeeded":
+            raise ReplicateError(
+                f"Prediction {prediction_id} {prediction['status']}: "
+                f"{prediction.get('error')}"
+            )
+        return prediction.get("output")
+
+    async def _wait(
+        self, session: aiohttp.ClientSession, prediction: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        interval = REPLICATE_POLL_INTERVAL_S
+        path = f"/v1/predictions/{prediction['id']}"
+        while prediction.get("status") not in TERMINAL_STATUSES:
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, REPLICATE_MAX_POLL_INTERVAL_S)
+            try:
+                prediction = await self._call(session, "GET", path)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ReplicateError) as e:
+                # The prediction keeps running; a later poll will see it
+                logger.warning(f"Polling prediction {prediction['id']} failed: {e}")
+        return prediction
+
+    async def _cancel(self, session: aiohttp.ClientSession, prediction_id: str):
+        try:
+            await self._call(session, "POST", f"/v1/predictions/{prediction_id}/cancel")
+            logger.info(f"Cancelled prediction {prediction_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ReplicateError) as e:
+            logger.warning(f"Could not cancel prediction {prediction_id}: {e}")
@@ -5,19 +5,27 @@ import asyncio
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from core.connection import MEETING_DETAILS, PIPECAT_PROCESSES, registry
+from core.control import control_hub
+from core.migration import migrator
 from core.process import start_pipecat_process, terminate_process_gracefully
 from core.router import router as message_router
+from core.sessions import BOT_ADOPTION
+from core.supervisor import supervisor
 from meetingbaas_pipecat.utils.logger import logger
 from utils.ngrok import LOCAL_DEV_MODE, log_ngrok_status, release_ngrok_url
 
 websocket_router = APIRouter()
 
+# Close code uvicorn uses for connections it drops while shutting down
+SERVICE_RESTART = 1012
+
 
 @websocket_router.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """Handle WebSocket connections from clients."""
     await registry.connect(websocket, client_id)
     logger.info(f"Client {client_id} connected")
+    close_code = None
 
     try:
         # Get meeting details from our in-memory storage
@@ -48,10 +56,12 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             and PIPECAT_PROCESSES[client_id].poll() is None
         ):
             logger.info(f"Pipecat process already running for client {client_id}")
+        elif client_id in migrator.remote_workers:
+            logger.info(f"Pipecat process for client {client_id} runs on a peer node")
         else:
             # Start Pipecat process if not already running
             pipecat_websocket_url = f"ws://localhost:7014/pipecat/{client_id}"
-            process = start_pipecat_process(
+            spawn_kwargs = dict(
                 client_id=client_id,
                 websocket_url=pipecat_websocket_url,
                 meeting_url=meeting_url,
@@ -61,14 +71,22 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 api_key="",
                 meetingbaas_bot_id=meetingbaas_bot_id or "",
             )
+            process = start_pipecat_process(**spawn_kwargs)
 
             # Store the process for cleanup
             PIPECAT_PROCESSES[client_id] = process
+            supervisor.register(client_id, spawn_kwargs)
 
         # Process messages
         while True:
             try:
                 message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    close_code = message.get("code")
+                    logger.info(
+                        f"WebSocket for client {client_id} closed ({close_code})"
+                    )
+                    break
             except RuntimeError as e:
                 if "Cannot call \"receive\" once a disconnect message has been received" in str(e):
                     logger.info(f"WebSocket for client {client_id} closed by client.")
@@ -92,7 +110,15 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     except Exception as e:
         logger.error(f"Error in WebSocket connection: {e} (repr: {repr(e)})")
     finally:
+        if close_code == SERVICE_RESTART and BOT_ADOPTION:
+            # The server is restarting: leave the bot running so the next
+            # server re-adopts it from the session store
+            logger.info(f"Leaving bot for client {client_id} running across restart")
+            return
+
         # Clean up
+        supervisor.unregister(client_id)
+        await migrator.stop_remote(client_id)
         if client_id in PIPECAT_PROCESSES:
             process = PIPECAT_PROCESSES[client_id]
             if process and process.poll() is None:  # If process is still running
@@ -133,10 +159,24 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 @websocket_router.websocket("/pipecat/{client_id}")
 async def pipecat_websocket(websocket: WebSocket, client_id: str):
     """Handle WebSocket connections from Pipecat."""
-    await registry.connect(websocket, client_id, is_pipecat=True)
+    # A migration's replacement worker waits on the side until it is promoted;
+    # if the session has no worker any more it takes over right away
+    standby = (
+        websocket.query_params.get("standby") == "1"
+        and registry.get_pipecat(client_id) is not None
+    )
+    await registry.connect(websocket, client_id, is_pipecat=True, standby=standby)
+    if not standby:
+        # A restarted bot reconnects under the same client ID
+        message_router.clear_closing(client_id)
     try:
         while True:
             message = await websocket.receive()
+            if registry.get_pipecat(client_id) is not websocket:
+                # Standby or replaced worker: nothing it says reaches the meeting
+                if message["type"] == "websocket.disconnect":
+                    break
+                continue
             if "bytes" in message:
                 data = message["bytes"]
                 logger.debug(
@@ -156,6 +196,11 @@ async def pipecat_websocket(websocket: WebSocket, client_id: str):
             f"Error in Pipecat WebSocket handler for client {client_id}: {str(e)}"
         )
     finally:
+        if registry.get_pipecat(client_id) is not websocket:
+            # A migration promoted another worker, which keeps the session
+            registry.discard(client_id, websocket)
+            return
+
         # Mark client as closing before disconnecting
         message_router.mark_closing(client_id)
 
@@ -170,3 +215,13 @@ async def pipecat_websocket(websocket: WebSocket, client_id: str):
         if LOCAL_DEV_MODE:
             release_ngrok_url(client_id)
             log_ngrok_status()
+
+
+@websocket_router.websocket("/control/{client_id}")
+async def control_websocket(websocket: WebSocket, client_id: str):
+    """Handle control connections from bot processes."""
+    standby = (
+        websocket.query_params.get("standby") == "1"
+        and control_hub.is_connected(client_id)
+    )
+    await control_hub.serve(websocket, client_id, standby=standby)
@@ -8,10 +8,12 @@ import time
 from pathlib import Path
 from typing import Optional
 
+import aiohttp
 import requests
 from loguru import logger
 
 from config.persona_utils import persona_manager
+from core.ratelimit import rate_limits
 
 
 class UTFSUploader:
@@ -168,6 +170,72 @@ class UTFSUploader:
             logger.error(f"Error during upload: {str(e)}")
             return None
 
+    async def upload_bytes(
+        self,
+        session: aiohttp.ClientSession,
+        data: bytes,
+        file_name: str,
+        file_type: str = "image/png",
+    ) -> Optional[str]:
+        """
+        Upload an in-memory file using the UploadThing API.
+
+        Unlike upload_file, nothing is read from or written to disk and no
+        persona is updated.
+
+        Args:
+            session: Pooled session to send both requests through
+            data: File contents
+            file_name: Name to store the file under
+            file_type: MIME type of the file
+
+        Returns:
+            str: The public URL of the uploaded file, None on failure
+        """
+        try:
+            # Step 1: Prepare the upload
+            async with (
+                rate_limits.permit("uploadthing"),
+                session.post(
+                    f"{self.base_url}/v6/uploadFiles",
+                    headers={"x-uploadthing-api-key": self.api_key},
+                    json={
+                        "files": [
+                            {"name": file_name, "size": len(data), "type": file_type}
+                        ],
+                        "acl": "public-read",
+                        "contentDisposition": "inline",
+                    },
+                ) as response,
+            ):
+                if response.status != 200:
+                    raise Exception(
+                        f"Failed to get presigned URL: {await response.text()}"
+                    )
+                presigned_data = await response.json()
+
+            if not presigned_data.get("data"):
+                raise Exception("No presigned URL received")
+            file_data = presigned_data["data"][0]
+
+            # Step 2: Upload to presigned URL
+            form = aiohttp.FormData()
+            for key, value in (file_data.get("fields") or {}).items():
+                form.add_field(key, str(value))
+            form.add_field("file", data, filename=file_name, content_type=file_type)
+            async with (
+                rate_limits.permit("uploadthing"),
+                session.post(file_data["url"], data=form) as response,
+            ):
+                if response.status not in (200, 201, 204):
+                    raise Exception(f"Upload failed: {await response.text()}")
+
+            return file_data["fileUrl"]
+
+        except Exception as e:
+            logger.error(f"Error during upload: {str(e)}")
+            return None
+
     def check_api_health(self) -> bool:
         """Check if the API is responding"""
         try:
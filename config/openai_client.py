@@ -0,0 +1,19 @@
+"""Shared async OpenAI client, so calls reuse one connection pool."""
+
+import os
+from typing import Optional
+
+import openai
+
+_client: Optional[openai.AsyncOpenAI] = None
+_client_key: Optional[str] = None
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client for OPENAI_API_KEY."""
+    global _client, _client_key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if _client is None or api_key != _client_key:
+        _client = openai.AsyncOpenAI(api_key=api_key)
+        _client_key = api_key
+    return _client
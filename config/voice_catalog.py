@@ -0,0 +1,306 @@
+"""Cached, indexed catalog of Cartesia voices.
+
+The catalog loads from a JSON cache on disk (seeded from
+``available_voices.md`` on first run) and refreshes in the background with
+conditional requests, so voice lookups never wait on the Cartesia API and
+keep working while it is slow or down.
+"""
+
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from core.executors import cpu_executor
+from core.ratelimit import rate_limits
+
+CARTESIA_VOICES_URL = "https://api.cartesia.ai/voices/"
+# Where the last good catalog is kept between restarts
+VOICE_CATALOG_PATH = os.getenv(
+    "VOICE_CATALOG_PATH",
+    os.path.join(
+        os.getenv(
+            "BOT_STATE_DIR",
+            os.path.join(tempfile.gettempdir(), "speaking-meeting-bot"),
+        ),
+        "cartesia_voices.json",
+    ),
+)
+# How old the catalog may get before it is revalidated
+VOICE_CATALOG_TTL_S = float(os.getenv("VOICE_CATALOG_TTL_S", "3600"))
+# Delay before retrying a failed refresh
+VOICE_CATALOG_RETRY_S = float(os.getenv("VOICE_CATALOG_RETRY_S", "60"))
+
+SNAPSHOT_PATH = Path(__file__).parent / "available_voices.md"
+
+_GENDER_WORDS = {
+    "female": ("woman", "lady", "female", "girl", "feminine"),
+    "male": ("man", "guy", "male", "boy", "gentleman", "masculine"),
+}
+
+
+def normalize_gender(value: Optional[str]) -> Optional[str]:
+    """Map persona and Cartesia gender labels to "male", "female" or "neutral"."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in ("female", "feminine", "woman", "f"):
+        return "female"
+    if value in ("male", "masculine", "man", "m"):
+        return "male"
+    if value in ("non-binary", "nonbinary", "neutral", "gender_neutral"):
+        return "neutral"
+    return None
+
+
+def voice_gender(voice: Dict[str, Any]) -> Optional[str]:
+    """Return a voice's gender, inferred from its name and description if unset."""
+    gender = normalize_gender(voice.get("gender"))
+    if gender:
+        return gender
+    words = set(
+        re.findall(
+            r"[a-z]+",
+            f"{voice.get('name', '')} {voice.get('description', '')}".lower(),
+        )
+    )
+    for gender, markers in _GENDER_WORDS.items():
+        if words.intersection(markers):
+            return gender
+    return None
+
+
+def parse_snapshot(text: str) -> List[Dict[str, Any]]:
+    """Parse the voice list written by ``VoiceUtils.save_voices_to_md``."""
+    voices = []
+    for block in re.split(r"^## ", text, flags=re.MULTILINE)[1:]:
+        lines = block.splitlines()
+        voice: Dict[str, Any] = {"name": lines[0].strip()}
+        for line in lines[1:]:
+            match = re.match(r"- \*\*(\w+)\*\*: (.*)", line.strip())
+            if not match:
+                continue
+            field, value = match.group(1).lower(), match.group(2).strip()
+            if field == "id":
+                voice["id"] = value.strip("`")
+            elif field == "language":
+                voice["language"] = value
+            elif field == "description":
+                voice["description"] = value
+            elif field == "public":
+                voice["is_public"] = value == "Yes"
+        if voice.get("id") and voice.get("language"):
+            voices.append(voice)
+    return voices
+
+
+class VoiceCatalog:
+    """Cartesia voices indexed by language and gender, refreshed in the background."""
+
+    def __init__(
+        self,
+        path: str = VOICE_CATALOG_PATH,
+        ttl: float = VOICE_CATALOG_TTL_S,
+        api_key: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.api_key = api_key or os.getenv("CARTESIA_API_KEY")
+        self.etag: Optional[str] = None
+        # Wall-clock time of the last successful fetch or revalidation
+        self.fetched_at = 0.0
+        self.source = "empty"
+        # Bumped whenever the voice list is replaced
+        self.version = 0
+        self._voices: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_language: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_language_gender: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def stale(self) -> bool:
+        """True once the catalog is older than its TTL."""
+        return time.time() - self.fetched_at >= self.ttl
+
+    def load(self):
+        """Load the disk cache, or the bundled snapshot if there is none."""
+        self._loaded = True
+        try:
+            cached = json.loads(self.path.read_text(encoding="utf-8"))
+            self.etag = cached.get("etag")
+            self.fetched_at = float(cached.get("fetched_at", 0))
+            self._index(cached["voices"], "cache")
+            return
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable voice cache {self.path}: {e}")
+        try:
+            voices = parse_snapshot(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+        except OSError as e:
+            logger.warning(f"No voice snapshot at {SNAPSHOT_PATH}: {e}")
+            return
+        # Leave fetched_at at 0 so the snapshot is replaced on the first refresh
+        self._index(voices, "snapshot")
+
+    def _index(self, voices: List[Dict[str, Any]], source: str):
+        by_id: Dict[str, Dict[str, Any]] = {}
+        by_language: Dict[str, List[Dict[str, Any]]] = {}
+        by_language_gender: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for voice in voices:
+            if not voice.get("id"):
+                continue
+            voice = dict(voice, gender=voice_gender(voice))
+            by_id[voice["id"]] = voice
+            language = voice.get("language") or ""
+            by_language.setdefault(language, []).append(voice)
+            if voice["gender"]:
+                key = (language, voice["gender"])
+                by_language_gender.setdefault(key, []).append(voice)
+        # Swap whole indexes so concurrent readers never see a partial catalog
+        self._voices = list(by_id.values())
+        self._by_id = by_id
+        self._by_language = by_language
+        self._by_language_gender = by_language_gender
+        self.source = source
+        self.version += 1
+        logger.info(f"Voice catalog: {len(by_id)} voices from {source}")
+
+    def voices(
+        self, language: Optional[str] = None, gender: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return voices for a language, optionally of one gender.
+
+        Args:
+            language: Cartesia language code such as "en", None for all voices
+            gender: Persona or voice gender label (e.g. "FEMALE"); unknown
+                labels are ignored
+
+        Returns:
+            The matching voices, which callers must not modify
+        """
+        if not self._loaded:
+            self.load()
+        if language is None:
+            return self._voices
+        gender = normalize_gender(gender)
+        if gender:
+            return self._by_language_gender.get((language, gender), [])
+        return self._by_language.get(language, [])
+
+    def get(self, voice_id: str) -> Optional[Dict[str, Any]]:
+        """Return a voice by ID."""
+        if not self._loaded:
+            self.load()
+        return self._by_id.get(voice_id)
+
+    async def refresh(self) -> bool:
+        """
+        Revalidate the catalog against the Cartesia API.
+
+        Returns:
+            True if the catalog is current (changed or not), False on failure
+        """
+        if not self.api_key:
+            logger.debug("Cannot refresh voice catalog: no Cartesia API key")
+            return False
+        headers = {"X-API-Key": self.api_key, "Cartesia-Version": "2024-06-10"}
+        if self.etag and self.source == "cache":
+            headers["If-None-Match"] = self.etag
+        try:
+            async with aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15)
+            ) as session:
+                async with (
+                    rate_limits.permit("cartesia"),
+                    session.get(CARTESIA_VOICES_URL, headers=headers) as response,
+                ):
+                    if response.status == 304:
+                        self.fetched_at = time.time()
+                        self._save()
+                        return True
+                    if response.status != 200:
+                        logger.warning(
+                            f"Voice catalog refresh failed: {response.status} - "
+                            f"{(await response.text())[:200]}"
+                        )
+                        return False
+                    voices = await response.json()
+                    etag = response.headers.get("ETag")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(
+                f"Voice catalog refresh failed: {str(e) or type(e).__name__}"
+            )
+            return False
+
+        if not isinstance(voices, list) or not voices:
+            logger.warning("Voice catalog refresh returned no voices, keeping cache")
+            return False
+        self.etag = etag
+        self.fetched_at = time.time()
+        await cpu_executor.run(self._index, voices, "cache")
+        self._save()
+        return True
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                "etag": self.etag,
+                "fetched_at": self.fetched_at,
+                "voices": self._voices,
+            }
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write voice cache {self.path}: {e}")
+
+    async def start(self):
+        """Load the cached catalog and keep it fresh in the background."""
+        if not self._loaded:
+            self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            if self.stale:
+                delay = self.ttl if await self.refresh() else VOICE_CATALOG_RETRY_S
+            else:
+                delay = self.ttl - (time.time() - self.fetched_at)
+            await asyncio.sleep(max(1.0, delay))
+
+    def status(self) -> Dict[str, Any]:
+        """Return catalog size and freshness for /health."""
+        return {
+            "voices": len(self._voices),
+            "source": self.source,
+            "age_s": round(time.time() - self.fetched_at, 1)
+            if self.fetched_at
+            else None,
+        }
+
+
+# Create a singleton instance
+voice_catalog = VoiceCatalog()
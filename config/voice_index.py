@@ -0,0 +1,186 @@
+"""Embedding index for matching personas to Cartesia voices.
+
+Voice names and descriptions are embedded once per catalog and kept as a
+normalized NumPy matrix on disk next to the voice cache. A persona is matched
+by embedding its description and taking the cosine similarity against the
+rows of the candidate voices, which costs one small embedding request instead
+of a chat completion listing every voice.
+"""
+
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config.openai_client import get_openai_client
+from config.voice_catalog import VOICE_CATALOG_PATH, voice_catalog
+from core.breakers import breakers
+from core.executors import io_executor
+from core.ratelimit import rate_limits
+
+VOICE_EMBEDDING_MODEL = os.getenv("VOICE_EMBEDDING_MODEL", "text-embedding-3-small")
+VOICE_INDEX_PATH = os.getenv(
+    "VOICE_INDEX_PATH", str(Path(VOICE_CATALOG_PATH).with_suffix(".npz"))
+)
+# Voices embedded per API request when (re)building the index
+_EMBEDDING_BATCH = 256
+# Persona text beyond this is cut before embedding
+_MAX_PERSONA_CHARS = 4000
+
+
+def voice_text(voice: Dict[str, Any]) -> str:
+    """Text embedded for a voice."""
+    return f"{voice.get('name', '')}. {voice.get('description', '')}".strip()
+
+
+def persona_text(persona: Dict[str, Any]) -> str:
+    """Text embedded for a persona."""
+    parts = [
+        persona.get("name"),
+        persona.get("gender"),
+        persona.get("description"),
+        ", ".join(persona.get("characteristics") or []),
+        persona.get("prompt"),
+    ]
+    return ". ".join(str(part) for part in parts if part)[:_MAX_PERSONA_CHARS]
+
+
+def _fingerprint(voices: List[Dict[str, Any]]) -> str:
+    digest = hashlib.sha256(VOICE_EMBEDDING_MODEL.encode())
+    for voice in sorted(voices, key=lambda voice: voice["id"]):
+        digest.update(f"\0{voice['id']}\0{voice_text(voice)}".encode())
+    return digest.hexdigest()
+
+
+class VoiceIndex:
+    """Normalized voice embeddings with vectorized cosine ranking."""
+
+    def __init__(self, path: str = VOICE_INDEX_PATH):
+        self.path = Path(path)
+        self.fingerprint: Optional[str] = None
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._catalog_version = -1
+        self._lock = asyncio.Lock()
+        self._warm_task: Optional[asyncio.Task] = None
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        async with breakers.guard("openai"), rate_limits.permit("openai"):
+            response = await get_openai_client().embeddings.create(
+                model=VOICE_EMBEDDING_MODEL, input=texts
+            )
+        vectors = np.array([item.embedding for item in response.data], np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    async def ensure(self):
+        """Build or load the index for the current voice catalog."""
+        if self._catalog_version == voice_catalog.version:
+            return
+        async with self._lock:
+            version = voice_catalog.version
+            if self._catalog_version == version:
+                return
+            voices = voice_catalog.voices()
+            fingerprint = _fingerprint(voices)
+            if fingerprint != self.fingerprint and not await io_executor.run(
+                self._load, fingerprint
+            ):
+                await self._build(voices, fingerprint)
+            self._catalog_version = version
+
+    def _load(self, fingerprint: str) -> bool:
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    return False
+                self._set(fingerprint, [str(i) for i in data["ids"]], data["matrix"])
+        except (OSError, KeyError, ValueError):
+            return False
+        logger.info(f"Loaded voice index of {len(self.ids)} voices from {self.path}")
+        return True
+
+    async def _build(self, voices: List[Dict[str, Any]], fingerprint: str):
+        # Reuse rows of voices whose text has not changed since the last build
+        known = {voice_id: self.matrix[row] for voice_id, row in self.rows.items()}
+        texts = {voice["id"]: voice_text(voice) for voice in voices}
+        missing = [voice_id for voice_id in texts if voice_id not in known]
+        for start in range(0, len(missing), _EMBEDDING_BATCH):
+            batch = missing[start : start + _EMBEDDING_BATCH]
+            vectors = await self._embed([texts[voice_id] for voice_id in batch])
+            known.update(zip(batch, vectors))
+        ids = list(texts)
+        matrix = (
+            np.stack([known[voice_id] for voice_id in ids])
+            if ids
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        self._set(fingerprint, ids, matrix)
+        await io_executor.run(self._save)
+        logger.info(f"Built voice index: {len(missing)} of {len(ids)} voices embedded")
+
+    def _set(self, fingerprint: str, ids: List[str], matrix: np.ndarray):
+        self.fingerprint = fingerprint
+        self.ids = ids
+        self.rows = {voice_id: row for row, voice_id in enumerate(ids)}
+        self.matrix = matrix.astype(np.float32, copy=False)
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp.npz")
+            np.savez(
+                tmp_path,
+                fingerprint=np.array(self.fingerprint),
+                ids=np.array(self.ids),
+                matrix=self.matrix,
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write voice index {self.path}: {e}")
+
+    async def rank(
+        self, persona: Dict[str, Any], candidates: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank candidate voices by similarity to a persona.
+
+        Args:
+            persona: Persona details (name, gender, description, prompt...)
+            candidates: Voices to rank, already filtered by language/gender
+
+        Returns:
+            (voice, cosine similarity) pairs, best first; candidates missing
+            from the index are left out
+        """
+        await self.ensure()
+        indexed = [voice for voice in candidates if voice["id"] in self.rows]
+        if not indexed:
+            return []
+        query = (await self._embed([persona_text(persona)]))[0]
+        rows = np.fromiter(
+            (self.rows[voice["id"]] for voice in indexed), np.intp, len(indexed)
+        )
+        scores = self.matrix[rows] @ query
+        order = np.argsort(-scores)
+        return [(indexed[i], float(scores[i])) for i in order]
+
+    async def start(self):
+        """Build the index in the background so the first join does not wait."""
+
+        async def _warm():
+            try:
+                await self.ensure()
+            except Exception as e:
+                logger.warning(f"Voice index not built at startup: {e}")
+
+        self._warm_task = asyncio.create_task(_warm())
+
+
+# Create a singleton instance
+voice_index = VoiceIndex()
@@ -7,14 +7,23 @@ from typing import Dict, List, Optional, Any
 import aiohttp
 from dotenv import load_dotenv
 from loguru import logger
-from openai import OpenAI
 
+from config.openai_client import get_openai_client
 from config.persona_utils import PersonaManager
+from config.voice_catalog import voice_catalog
+from config.voice_index import persona_text, voice_index
+from core.breakers import breakers
+from core.ratelimit import rate_limits
+from core.singleflight import SingleFlight
 
 # Load environment variables
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Let an LLM choose among the best embedding matches (slower, one chat call)
+VOICE_LLM_RERANK = os.getenv("VOICE_LLM_RERANK", "false").lower() == "true"
+VOICE_RERANK_TOP_K = int(os.getenv("VOICE_RERANK_TOP_K", "5"))
+VOICE_RERANK_MODEL = os.getenv("VOICE_RERANK_MODEL", "gpt-4")
 SUPPORTED_LANGUAGES = [
     "English (en)",
     "French (fr)",
@@ -33,6 +42,10 @@ SUPPORTED_LANGUAGES = [
     "Turkish (tr)",
 ]
 
+# Identical concurrent voice listings and persona matches share one call
+_voice_listings = SingleFlight("voice_listing")
+_voice_matches = SingleFlight("voice_match")
+
 
 class CartesiaVoiceManager:
     def __init__(self, api_key: Optional[str] = None):
@@ -43,6 +56,11 @@ class CartesiaVoiceManager:
 
     async def list_voices(self) -> List[Dict]:
         """List all available Cartesia voices"""
+        # Concurrent listings share one request
+        voices = await _voice_listings.do(self.api_key, self._fetch_voices)
+        return list(voices)
+
+    async def _fetch_voices(self) -> List[Dict]:
         if not self.api_key:
             logger.warning("Cannot list voices: No API key provided")
             return []
@@ -52,14 +70,18 @@ class CartesiaVoiceManager:
 
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        voices = await response.json()
-                        return voices
-                    else:
-                        error_msg = await response.text()
-                        logger.error(f"Failed to fetch voices: {error_msg}")
-                        return []
+                async with breakers.guard("cartesia"), rate_limits.permit("cartesia"):
+                    async with session.get(url, headers=headers) as response:
+                        if response.status >= 500:
+                            # Raised so the breaker counts it
+                            response.raise_for_status()
+                        if response.status == 200:
+                            voices = await response.json()
+                            return voices
+                        else:
+                            error_msg = await response.text()
+                            logger.error(f"Failed to fetch voices: {error_msg}")
+                            return []
         except Exception as e:
             logger.error(f"Error connecting to Cartesia API: {e}")
             return []
@@ -71,7 +93,7 @@ cartesia_voice_manager = CartesiaVoiceManager()
 
 class VoiceUtils:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.persona_manager = PersonaManager()
 
     async def save_voices_to_md(self) -> Optional[Path]:
@@ -106,7 +128,26 @@ class VoiceUtils:
     async def match_voice_to_persona(
         self, persona_key: Optional[str] = None, language_code: str = "en", persona_details: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
-        """Use GPT-4 to match a persona with an appropriate voice"""
+        """Match a persona with the closest voice by embedding similarity"""
+        # Concurrent matches of the same persona share one embedding lookup
+        key = (
+            persona_key,
+            language_code,
+            persona_text(persona_details) if persona_details else None,
+        )
+        return await _voice_matches.do(
+            key,
+            lambda: self._match_voice_to_persona(
+                persona_key, language_code, persona_details
+            ),
+        )
+
+    async def _match_voice_to_persona(
+        self,
+        persona_key: Optional[str],
+        language_code: str,
+        persona_details: Optional[Dict[str, Any]],
+    ) -> Optional[str]:
         try:
             persona = None
             if persona_details:
@@ -122,25 +163,61 @@ class VoiceUtils:
                 logger.error(f"Persona not found, neither by key '{persona_key}' nor provided details.")
                 return None
 
-            # Get available voices
-            voices = await cartesia_voice_manager.list_voices()
-            voices = [v for v in voices if v.get("language") == language_code]
+            # Get available voices from the cached catalog, preferring the
+            # persona's gender when the catalog knows voices of it
+            voices = voice_catalog.voices(
+                language_code, persona.get("gender")
+            ) or voice_catalog.voices(language_code)
 
             if not voices:
                 logger.error(f"No voices available for language {language_code}")
                 return None
 
-            # Prepare prompt for GPT-4
-            voices_text = "\n".join(
-                [
-                    f"Voice {i+1}: {v['name']} - {v.get('description', 'No description')}"
-                    for i, v in enumerate(voices)
-                ]
+            # Rank the candidates by embedding similarity to the persona
+            try:
+                ranked = await voice_index.rank(persona, voices)
+            except Exception as e:
+                logger.warning(f"Voice embedding match unavailable: {e}")
+                ranked = []
+            if not ranked:
+                logger.warning(
+                    f"Falling back to the first {language_code} voice for "
+                    f"{persona['name']}"
+                )
+                return voices[0]["id"]
+
+            selected_voice, score = ranked[0]
+            if VOICE_LLM_RERANK and len(ranked) > 1:
+                shortlist = ranked[:VOICE_RERANK_TOP_K]
+                selected_voice = await self._rerank(
+                    persona, [voice for voice, _ in shortlist]
+                )
+                score = dict((v["id"], s) for v, s in shortlist)[selected_voice["id"]]
+            logger.info(
+                f"Matched {persona['name']} with voice: {selected_voice['name']} "
+                f"(similarity {score:.3f})"
             )
+            return selected_voice["id"]
+
+        except Exception as e:
+            logger.error(f"Error matching voice to persona: {e}")
+            return None
 
-            prompt = f"""Given this persona:
+    async def _rerank(
+        self, persona: Dict[str, Any], voices: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Let the LLM pick among the best embedding matches (the top one on error)"""
+        # Prepare prompt for the LLM
+        voices_text = "\n".join(
+            [
+                f"Voice {i+1}: {v['name']} - {v.get('description', 'No description')}"
+                for i, v in enumerate(voices)
+            ]
+        )
+
+        prompt = f"""Given this persona:
 Name: {persona['name']}
-Description: {persona['prompt']}
+Description: {persona.get('prompt') or persona.get('description')}
 Gender: {persona.get('gender', 'Unknown')}
 
 And these available voices:
@@ -149,27 +226,20 @@ And these available voices:
 Which voice number (1-{len(voices)}) would be the most appropriate match? 
 Respond with ONLY the number."""
 
-            # Get GPT-4's recommendation
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
-            )
-
-            try:
-                voice_index = int(response.choices[0].message.content.strip()) - 1
-                selected_voice = voices[voice_index]
-                logger.info(
-                    f"Matched {persona['name']} with voice: {selected_voice['name']}"
+        try:
+            async with breakers.guard("openai"), rate_limits.permit("openai"):
+                response = await self.client.chat.completions.create(
+                    model=VOICE_RERANK_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=10,
                 )
-                return selected_voice["id"]
-            except (ValueError, IndexError) as e:
-                logger.error(f"Error parsing GPT response: {e}")
-                return None
-
+            choice = int(response.choices[0].message.content.strip()) - 1
+            if not 0 <= choice < len(voices):
+                raise IndexError(f"voice number {choice + 1} out of range")
+            return voices[choice]
         except Exception as e:
-            logger.error(f"Error matching voice to persona: {e}")
-            return None
+            logger.error(f"Error re-ranking voices with the LLM: {e}")
+            return voices[0]
 
     async def update_persona_voice(self, persona_key: str, voice_id: str) -> bool:
         """Update the voice ID in a persona's README file"""
@@ -0,0 +1,225 @@
+"""Circuit breakers that fail provider calls fast while a provider is down.
+
+Each provider has a breaker counting the outcomes of recent calls. Once enough
+of them fail the breaker opens, and calls are refused at once with
+``CircuitOpenError`` so callers go straight to their fallback (no avatar, the
+first voice of the language, default persona details...) instead of waiting
+out a failing call. After a cool-down the breaker lets a few probe calls
+through (half-open): a successful probe closes it, a failed one reopens it.
+"""
+
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from core.metrics import metrics
+from meetingbaas_pipecat.utils.logger import logger
+
+# Share of failed calls in the window that opens a breaker
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+# Calls the window must hold before its failure rate is trusted
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+# Seconds of call outcomes counted
+BREAKER_WINDOW_S = float(os.getenv("BREAKER_WINDOW_S", "30"))
+# Seconds an open breaker refuses calls before probing the provider
+BREAKER_OPEN_S = float(os.getenv("BREAKER_OPEN_S", "30"))
+# Probe calls let through at once while half-open
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+# Providers guarded by the control plane
+PROVIDERS = ("openai", "cartesia", "replicate", "meetingbaas")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values of each state
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str, retry_in_s: float):
+        super().__init__(
+            f"{provider} circuit open, failing fast (retry in {retry_in_s:.0f}s)"
+        )
+        self.provider = provider
+        self.retry_in_s = retry_in_s
+
+
+class CircuitBreaker:
+    """Failure-rate breaker for the calls to one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        min_calls: int = BREAKER_MIN_CALLS,
+        window_s: float = BREAKER_WINDOW_S,
+        open_s: float = BREAKER_OPEN_S,
+        half_open_probes: int = BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.provider = provider
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_s = window_s
+        self.open_s = open_s
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes = 0
+        # (finished at, succeeded) of the calls in the window
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        metrics.set_gauge(
+            "circuit_breaker_state", _STATE_GAUGE[state], provider=self.provider
+        )
+        metrics.increment(
+            "circuit_breaker_transitions_total", provider=self.provider, state=state
+        )
+        log = logger.info if state == CLOSED else logger.warning
+        log(f"Circuit breaker {self.provider}: {previous} -> {state}")
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_s:
+            self._outcomes.popleft()
+
+    def _failures(self) -> int:
+        return sum(1 for _, ok in self._outcomes if not ok)
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker starts probing."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_s - time.monotonic())
+
+    def acquire(self) -> bool:
+        """
+        Ask to make a call.
+
+        Returns:
+            bool: True if the call may go ahead; its outcome must then be
+            reported with :meth:`release`
+        """
+        if self.state == OPEN and self.retry_in() <= 0:
+            self._set_state(HALF_OPEN)
+            self.probes = 0
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self.probes < self.half_open_probes:
+            self.probes += 1
+            return True
+        metrics.increment("circuit_breaker_rejected_total", provider=self.provider)
+        return False
+
+    def release(self, succeeded: Optional[bool]):
+        """
+        Report the outcome of an acquired call.
+
+        Args:
+            succeeded: Whether the provider answered; None when the call was
+                abandoned before it did, which is not counted
+        """
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self.probes = max(0, self.probes - 1)
+            if succeeded:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            elif succeeded is not None:
+                self._open(now)
+            return
+        if succeeded is None:
+            return
+        self._outcomes.append((now, succeeded))
+        self._trim(now)
+        if (
+            self.state == CLOSED
+            and not succeeded
+            and len(self._outcomes) >= self.min_calls
+            and self._failures() / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open(now)
+
+    def _open(self, now: float):
+        self.opened_at = now
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the breaker state and recent failure rate for /health."""
+        self._trim(time.monotonic())
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": round(self._failures() / calls, 3) if calls else 0.0,
+            "retry_in_s": round(self.retry_in(), 1),
+        }
+
+
+def _always(error: BaseException) -> bool:
+    return True
+
+
+class BreakerRegistry:
+    """Creates and hands out the breaker of each provider."""
+
+    def __init__(self, providers: Tuple[str, ...] = PROVIDERS):
+        # Known providers are listed on /health before their first call
+        self.breakers = {provider: CircuitBreaker(provider) for provider in providers}
+
+    def get(self, provider: str) -> CircuitBreaker:
+        """Return the breaker of a provider, creating it on first use."""
+        breaker = self.breakers.get(provider)
+        if breaker is None:
+            breaker = self.breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+    @asynccontextmanager
+    async def guard(
+        self,
+        provider: str,
+        is_failure: Callable[[BaseException], bool] = _always,
+    ) -> AsyncIterator[None]:
+        """
+        Run one provider call through the provider's breaker.
+
+        An exception leaving the block counts as a failure unless
+        ``is_failure`` says otherwise; cancellation is not counted.
+
+        Args:
+            provider: Provider name, as used for rate limits
+            is_failure: Whether an error means the provider is unhealthy, e.g.
+                False for 4xx answers caused by the request
+
+        Raises:
+            CircuitOpenError: If the breaker is open, without making the call
+        """
+        breaker = self.get(provider)
+        if not breaker.acquire():
+            raise CircuitOpenError(provider, breaker.retry_in())
+        succeeded: Optional[bool] = None
+        try:
+            yield
+            succeeded = True
+        except Exception as e:
+            succeeded = not is_failure(e)
+            raise
+        finally:
+            breaker.release(succeeded)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Return the status of every breaker for /health."""
+        return {name: breaker.status() for name, breaker in self.breakers.items()}
+
+
+# Create a singleton instance
+breakers = BreakerRegistry()
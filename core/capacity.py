@@ -0,0 +1,229 @@
+"""Node capacity model and admission control for new bots."""
+
+import asyncio
+import itertools
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+from core.connection import PIPECAT_PROCESSES
+from core.metrics import metrics
+from core.supervisor import supervisor
+from meetingbaas_pipecat.utils.logger import logger
+
+# Fixed number of bots this node accepts (0 calibrates from measurements)
+NODE_BOT_CAPACITY = int(os.getenv("NODE_BOT_CAPACITY", "0"))
+# Share of the node's CPU and memory that bots may use
+NODE_CPU_HEADROOM = float(os.getenv("NODE_CPU_HEADROOM", "0.8"))
+NODE_MEMORY_HEADROOM = float(os.getenv("NODE_MEMORY_HEADROOM", "0.8"))
+# Per-bot cost assumed until enough bots have been measured
+BOT_CPU_ESTIMATE_PERCENT = float(os.getenv("BOT_CPU_ESTIMATE_PERCENT", "15"))
+BOT_RSS_ESTIMATE_MB = float(os.getenv("BOT_RSS_ESTIMATE_MB", "250"))
+# Bots younger than this are still loading models and are not representative
+CALIBRATION_MIN_UPTIME_S = float(os.getenv("CALIBRATION_MIN_UPTIME_S", "30"))
+
+# What to do with a join once the node is full: shed, queue or redirect
+ADMISSION_MODE = os.getenv("ADMISSION_MODE", "shed").lower()
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", "20"))
+ADMISSION_RETRY_AFTER_S = int(os.getenv("ADMISSION_RETRY_AFTER_S", "30"))
+# Comma-separated base URLs of nodes that joins are redirected to
+PEER_NODES = [
+    url.strip().rstrip("/")
+    for url in os.getenv("PEER_NODES", "").split(",")
+    if url.strip()
+]
+
+
+def _memory_total_bytes() -> Optional[int]:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class AdmissionRejected(Exception):
+    """Raised when a join cannot be admitted on this node."""
+
+    def __init__(
+        self, message: str, retry_after: int, redirect_to: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.redirect_to = redirect_to
+
+
+class CapacityModel:
+    """Estimates how many bots fit on this node from configured or measured cost."""
+
+    def __init__(self, fixed_capacity: int = NODE_BOT_CAPACITY):
+        self.fixed_capacity = fixed_capacity
+        self.cores = (
+            len(os.sched_getaffinity(0))
+            if hasattr(os, "sched_getaffinity")
+            else (os.cpu_count() or 1)
+        )
+        self.memory_bytes = _memory_total_bytes()
+
+    def per_bot_cost(self) -> Dict[str, float]:
+        """Return the average CPU percent and RSS of settled bots, or the estimates."""
+        settled = [
+            bot
+            for bot in supervisor.bots.values()
+            if bot.last_sample_at is not None
+            and time.monotonic() - bot.started_at >= CALIBRATION_MIN_UPTIME_S
+        ]
+        if not settled:
+            return {
+                "cpu_percent": BOT_CPU_ESTIMATE_PERCENT,
+                "rss_mb": BOT_RSS_ESTIMATE_MB,
+                "calibrated": False,
+            }
+        cpu = sum(bot.cpu_percent for bot in settled) / len(settled)
+        rss = sum(bot.rss_bytes for bot in settled) / len(settled) / (1024 * 1024)
+        return {
+            # Never trust a measurement below a tenth of the estimate
+            "cpu_percent": max(cpu, BOT_CPU_ESTIMATE_PERCENT / 10),
+            "rss_mb": max(rss, BOT_RSS_ESTIMATE_MB / 10),
+            "calibrated": True,
+        }
+
+    def capacity(self) -> int:
+        """Return how many bots this node can run concurrently."""
+        if self.fixed_capacity > 0:
+            return self.fixed_capacity
+
+        cost = self.per_bot_cost()
+        by_cpu = int(self.cores * 100 * NODE_CPU_HEADROOM / cost["cpu_percent"])
+        if self.memory_bytes:
+            usable_mb = self.memory_bytes * NODE_MEMORY_HEADROOM / (1024 * 1024)
+            by_memory = int(usable_mb / cost["rss_mb"])
+            return max(0, min(by_cpu, by_memory))
+        return max(0, by_cpu)
+
+
+class AdmissionController:
+    """Admits, queues, sheds or redirects joins based on the capacity model."""
+
+    def __init__(self, model: CapacityModel, mode: str = ADMISSION_MODE, logger=logger):
+        self.model = model
+        self.mode = mode
+        self.logger = logger
+        self.reserved = 0  # Joins admitted but not spawned yet
+        self.closed_reasons: Set[str] = set()  # Why joins are refused, if they are
+        self._peers = itertools.cycle(PEER_NODES) if PEER_NODES else None
+
+    def active(self) -> int:
+        """Return the number of bot processes running on this node."""
+        return sum(
+            1 for process in PIPECAT_PROCESSES.values() if process.poll() is None
+        )
+
+    def free_slots(self) -> int:
+        """Return how many more bots this node can admit right now."""
+        if self.closed_reasons:
+            return 0
+        return max(0, self.model.capacity() - self.active() - self.reserved)
+
+    @property
+    def closed_reason(self) -> Optional[str]:
+        """Return why joins are refused, or None if they are accepted."""
+        return ", ".join(sorted(self.closed_reasons)) or None
+
+    def close(self, reason: str):
+        """Refuse every new join, e.g. while the node drains."""
+        if reason not in self.closed_reasons:
+            self.logger.warning(f"Admission closed: {reason}")
+        self.closed_reasons.add(reason)
+
+    def open(self, reason: str):
+        """Withdraw a reason given to :meth:`close`; joins resume once none is left."""
+        if reason in self.closed_reasons:
+            self.closed_reasons.discard(reason)
+            self.logger.info(f"Admission no longer closed for: {reason}")
+
+    async def acquire(self):
+        """
+        Reserve a bot slot for a join.
+
+        Raises:
+            AdmissionRejected: If the node is full and the join is shed or
+                redirected, if it waited in the queue for too long, or if
+                admission is closed
+        """
+        if self.free_slots() > 0:
+            self._reserve("admitted")
+            return
+
+        if self.closed_reasons:
+            # Waiting in the queue is pointless, send the join elsewhere
+            self._reject_closed()
+
+        if self.mode == "redirect" and self._peers:
+            metrics.increment("admissions_total", outcome="redirected")
+            peer = next(self._peers)
+            raise AdmissionRejected(
+                "Node is at capacity",
+                ADMISSION_RETRY_AFTER_S,
+                redirect_to=f"{peer}/bots",
+            )
+
+        if self.mode == "queue":
+            started = time.monotonic()
+            deadline = started + ADMISSION_QUEUE_TIMEOUT_S
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.5)
+                if self.free_slots() > 0:
+                    metrics.observe(
+                        "admission_queue_wait_seconds", time.monotonic() - started
+                    )
+                    self._reserve("queued")
+                    return
+
+        metrics.increment("admissions_total", outcome="shed")
+        self.logger.warning("Rejecting join: node is at capacity")
+        raise AdmissionRejected("Node is at capacity", ADMISSION_RETRY_AFTER_S)
+
+    def _reject_closed(self):
+        if self._peers:
+            metrics.increment("admissions_total", outcome="redirected")
+            raise AdmissionRejected(
+                f"Node is not accepting bots: {self.closed_reason}",
+                ADMISSION_RETRY_AFTER_S,
+                redirect_to=f"{next(self._peers)}/bots",
+            )
+        metrics.increment("admissions_total", outcome="closed")
+        raise AdmissionRejected(
+            f"Node is not accepting bots: {self.closed_reason}",
+            ADMISSION_RETRY_AFTER_S,
+        )
+
+    def release(self):
+        """Release a reservation once the join spawned its bot or failed."""
+        self.reserved = max(0, self.reserved - 1)
+
+    def _reserve(self, outcome: str):
+        self.reserved += 1
+        metrics.increment("admissions_total", outcome=outcome)
+
+    def status(self) -> Dict[str, Any]:
+        """Return capacity information for /health."""
+        capacity = self.model.capacity()
+        active = self.active()
+        return {
+            "capacity": capacity,
+            "active_bots": active,
+            "reserved": self.reserved,
+            "free_slots": self.free_slots(),
+            "per_bot_cost": self.model.per_bot_cost(),
+            "mode": self.mode,
+            "closed_reason": self.closed_reason,
+        }
+
+
+# Create singleton instances
+capacity_model = CapacityModel()
+admission = AdmissionController(capacity_model)
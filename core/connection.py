@@ -22,20 +22,50 @@ class ConnectionRegistry:
     def __init__(self, logger=logger):
         self.active_connections: Dict[str, WebSocket] = {}
         self.pipecat_connections: Dict[str, WebSocket] = {}
+        # Replacement workers of migrating sessions, not routed to yet
+        self.standby_connections: Dict[str, WebSocket] = {}
         self.logger = logger
 
     async def connect(
-        self, websocket: WebSocket, client_id: str, is_pipecat: bool = False
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        is_pipecat: bool = False,
+        standby: bool = False,
     ):
         """Register a new connection."""
         await websocket.accept()
-        if is_pipecat:
+        if is_pipecat and standby:
+            self.standby_connections[client_id] = websocket
+            self.logger.info(f"Standby Pipecat client {client_id} connected")
+        elif is_pipecat:
             self.pipecat_connections[client_id] = websocket
             self.logger.info(f"Pipecat client {client_id} connected")
         else:
             self.active_connections[client_id] = websocket
             self.logger.info(f"Client {client_id} connected")
 
+    def promote(self, client_id: str) -> Optional[WebSocket]:
+        """
+        Route a session to its standby Pipecat connection.
+
+        Args:
+            client_id: Session being migrated
+
+        Returns:
+            The Pipecat connection that was replaced, for the caller to close
+        """
+        websocket = self.standby_connections.pop(client_id)
+        previous = self.pipecat_connections.get(client_id)
+        self.pipecat_connections[client_id] = websocket
+        self.logger.info(f"Promoted standby Pipecat client {client_id}")
+        return previous
+
+    def discard(self, client_id: str, websocket: WebSocket):
+        """Forget a Pipecat connection that is not the routed one any more."""
+        if self.standby_connections.get(client_id) is websocket:
+            self.standby_connections.pop(client_id, None)
+
     async def disconnect(self, client_id: str, is_pipecat: bool = False):
         """Remove a connection and close the websocket."""
         try:
@@ -0,0 +1,140 @@
+"""Control channel between the API server and its bot processes.
+
+Bots connect to ``/control/{client_id}`` next to their audio connection on
+``/pipecat/{client_id}``. Messages are JSON objects with a ``type`` field.
+Requests sent by the server carry an ``id`` that the bot echoes back in a
+``reply`` message.
+"""
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from meetingbaas_pipecat.utils.logger import logger
+
+ControlHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class ControlHub:
+    """Tracks bot control connections and dispatches their messages."""
+
+    def __init__(self, logger=logger):
+        self.logger = logger
+        self.connections: Dict[str, WebSocket] = {}
+        # Control connections of migration replacement workers
+        self.standby: Dict[str, WebSocket] = {}
+        self.handlers: Dict[str, ControlHandler] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def register(self, message_type: str, handler: ControlHandler):
+        """Register the coroutine handling messages of ``message_type``."""
+        self.handlers[message_type] = handler
+
+    def is_connected(self, client_id: str) -> bool:
+        """Return True if the bot of ``client_id`` has a control connection."""
+        return client_id in self.connections
+
+    async def serve(self, websocket: WebSocket, client_id: str, standby: bool = False):
+        """Accept a bot's control connection and dispatch until it closes."""
+        await websocket.accept()
+        connections = self.standby if standby else self.connections
+        connections[client_id] = websocket
+        self.logger.info(
+            f"{'Standby control' if standby else 'Control'} channel connected "
+            f"for client {client_id}"
+        )
+        try:
+            while True:
+                message = await websocket.receive_json()
+                await self._dispatch(client_id, message)
+        except WebSocketDisconnect:
+            self.logger.info(f"Control channel closed for client {client_id}")
+        except Exception as e:
+            self.logger.error(f"Error in control channel for client {client_id}: {e}")
+        finally:
+            # A newer connection for the same bot may already have replaced us
+            for connections in (self.connections, self.standby):
+                if connections.get(client_id) is websocket:
+                    connections.pop(client_id, None)
+
+    def promote(self, client_id: str):
+        """Make a standby worker's control connection the session's one."""
+        websocket = self.standby.pop(client_id, None)
+        if websocket is not None:
+            self.connections[client_id] = websocket
+
+    async def _dispatch(self, client_id: str, message: Dict[str, Any]):
+        message_type = message.get("type")
+        if message_type == "reply":
+            future = self._pending.pop(message.get("id", ""), None)
+            if future and not future.done():
+                future.set_result(message)
+            return
+
+        handler = self.handlers.get(message_type)
+        if handler is None:
+            self.logger.debug(
+                f"Ignoring control message {message_type!r} from client {client_id}"
+            )
+            return
+        try:
+            await handler(client_id, message)
+        except Exception as e:
+            self.logger.error(f"Control handler {message_type!r} failed: {e}")
+
+    async def send(
+        self, client_id: str, message: Dict[str, Any], standby: bool = False
+    ) -> bool:
+        """Send a message to a bot, returning False if it is not connected."""
+        websocket = (self.standby if standby else self.connections).get(client_id)
+        if websocket is None:
+            return False
+        try:
+            await websocket.send_json(message)
+            return True
+        except Exception as e:
+            self.logger.debug(f"Could not send control message to {client_id}: {e}")
+            return False
+
+    async def request(
+        self,
+        client_id: str,
+        message: Dict[str, Any],
+        timeout: float = 5.0,
+        standby: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a request to a bot and wait for its reply.
+
+        Args:
+            client_id: Bot to ask
+            message: Request message; an ``id`` is added to it
+            timeout: Seconds to wait for the reply
+            standby: Ask the session's standby worker instead
+
+        Returns:
+            The reply message, or None if the bot is not connected or did
+            not answer in time
+        """
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            if not await self.send(
+                client_id, {**message, "id": request_id}, standby=standby
+            ):
+                return None
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Control request {message.get('type')!r} to {client_id} timed out"
+            )
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+
+# Create a singleton instance
+control_hub = ControlHub()
@@ -0,0 +1,164 @@
+"""Run dependent async steps concurrently with per-step deadlines and fallbacks."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.metrics import metrics
+from meetingbaas_pipecat.utils.logger import logger
+
+StepFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Step:
+    """One node of a :class:`StepGraph` and how its last run went."""
+
+    name: str
+    run: StepFunction
+    after: Tuple[str, ...] = ()
+    deadline_s: Optional[float] = None
+    fallback: Any = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    outcome: str = "pending"
+
+    @property
+    def duration_s(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class StepGraph:
+    """
+    A small dependency graph of async steps.
+
+    Every step starts as soon as the steps it runs ``after`` have finished,
+    so independent branches overlap. A step that raises or misses its
+    deadline yields its fallback value instead, and the graph carries on.
+    ``on_step`` is called with each step as it finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        logger=logger,
+        on_step: Optional[Callable[[Step], None]] = None,
+    ):
+        self.name = name
+        self.logger = logger
+        self.on_step = on_step
+        self.steps: Dict[str, Step] = {}
+        self.started_at: Optional[float] = None
+
+    def add(
+        self,
+        name: str,
+        run: StepFunction,
+        after: Tuple[str, ...] = (),
+        deadline_s: Optional[float] = None,
+        fallback: Any = None,
+    ):
+        """
+        Declare a step.
+
+        Args:
+            name: Unique step name, also the key of its result
+            run: Coroutine function called with the results of earlier steps
+            after: Steps whose results this one needs
+            deadline_s: Seconds the step may run before its fallback is used
+            fallback: Result used when the step fails or misses its deadline,
+                or a function returning it, called only then
+        """
+        if name in self.steps:
+            raise ValueError(f"Step {name!r} declared twice")
+        missing = [dep for dep in after if dep not in self.steps]
+        if missing:
+            # Requiring dependencies first also rules out cycles
+            raise ValueError(f"Step {name!r} runs after undeclared {missing}")
+        self.steps[name] = Step(name, run, tuple(after), deadline_s, fallback)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run every step and return their results by name.
+
+        Cancelling the run cancels the steps still in flight.
+        """
+        self.started_at = time.monotonic()
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        for step in self.steps.values():
+            deps = [tasks[dep] for dep in step.after]
+            tasks[step.name] = asyncio.create_task(self._run_step(step, deps, results))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return results
+
+    async def _run_step(
+        self, step: Step, deps: List[asyncio.Task], results: Dict[str, Any]
+    ):
+        if deps:
+            await asyncio.gather(*deps)
+        step.started_at = time.monotonic()
+        try:
+            results[step.name] = await asyncio.wait_for(
+                step.run(results), step.deadline_s
+            )
+            step.outcome = "ok"
+        except asyncio.TimeoutError:
+            step.outcome = "timeout"
+            results[step.name] = self._fallback(step)
+            self.logger.warning(
+                f"{self.name}: step {step.name} missed its {step.deadline_s:.1f}s "
+                f"deadline, using fallback"
+            )
+        except Exception as e:
+            step.outcome = "error"
+            results[step.name] = self._fallback(step)
+            self.logger.error(f"{self.name}: step {step.name} failed: {e}")
+        step.finished_at = time.monotonic()
+        metrics.observe(
+            "dag_step_seconds", step.duration_s, graph=self.name, step=step.name
+        )
+        metrics.increment(
+            "dag_steps_total", graph=self.name, step=step.name, outcome=step.outcome
+        )
+        if self.on_step is not None:
+            self.on_step(step)
+
+    @staticmethod
+    def _fallback(step: Step) -> Any:
+        return step.fallback() if callable(step.fallback) else step.fallback
+
+    def critical_path(self) -> List[Step]:
+        """Return the chain of steps that determined the total run time."""
+        finished = [step for step in self.steps.values() if step.finished_at]
+        if not finished:
+            return []
+        step = max(finished, key=lambda step: step.finished_at)
+        path = [step]
+        while step.after:
+            step = max(
+                (self.steps[dep] for dep in step.after),
+                key=lambda dep: dep.finished_at or 0.0,
+            )
+            path.append(step)
+        return path[::-1]
+
+    def describe_critical_path(self) -> str:
+        """Render the critical path, e.g. ``persona 1.20s -> image 8.00s (timeout)``."""
+        parts = []
+        for step in self.critical_path():
+            part = f"{step.name} {step.duration_s:.2f}s"
+            if step.outcome != "ok":
+                part += f" ({step.outcome})"
+            parts.append(part)
+        total = 0.0
+        if self.started_at is not None and parts:
+            total = self.critical_path()[-1].finished_at - self.started_at
+        return f"{' -> '.join(parts) or 'no steps'}; total {total:.2f}s"
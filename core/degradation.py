@@ -0,0 +1,225 @@
+"""Load-shedding controller that steps bots down a degradation ladder.
+
+Pressure is read from the API server's event loop lag and the node's CPU.
+Under pressure the least degraded bots, heaviest first, are stepped one rung
+down the ladder over the control channel; once every bot is at the bottom,
+node-level steps such as refusing joins kick in. When pressure falls the steps
+are undone in reverse order.
+"""
+
+import asyncio
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from core.capacity import admission
+from core.control import control_hub
+from core.metrics import metrics
+from core.placement import read_cpu_times
+from core.supervisor import SupervisedBot, supervisor
+from meetingbaas_pipecat.utils.logger import logger
+
+# Step bots down the ladder under node overload (opt-in)
+DEGRADATION_ENABLED = os.getenv("DEGRADATION_ENABLED", "false").lower() == "true"
+# Rungs in order; "refuse_joins" is node-wide, every other rung is per bot
+DEGRADATION_LADDER = [
+    step.strip()
+    for step in os.getenv(
+        "DEGRADATION_LADDER",
+        "smaller_llm,disable_tools,silence_gating,refuse_joins",
+    ).split(",")
+    if step.strip()
+]
+# Step down above either threshold, step up once both are below the recover ones
+DEGRADE_LOOP_LAG_MS = float(os.getenv("DEGRADE_LOOP_LAG_MS", "100"))
+DEGRADE_CPU_PERCENT = float(os.getenv("DEGRADE_CPU_PERCENT", "85"))
+RECOVER_LOOP_LAG_MS = float(os.getenv("RECOVER_LOOP_LAG_MS", "30"))
+RECOVER_CPU_PERCENT = float(os.getenv("RECOVER_CPU_PERCENT", "60"))
+# Seconds between two steps in either direction
+DEGRADE_INTERVAL_S = float(os.getenv("DEGRADE_INTERVAL_S", "5"))
+# Share of the node's bots moved one rung per step
+DEGRADE_BOTS_PER_STEP = float(os.getenv("DEGRADE_BOTS_PER_STEP", "0.25"))
+
+# Model bots run (scripts/meetingbaas.py) and the one "smaller_llm" moves
+# them to; bots inherit the server's environment
+BOT_LLM_MODEL = os.getenv("BOT_LLM_MODEL", "gpt-4.1-nano")
+DEGRADED_LLM_MODEL = os.getenv("DEGRADED_LLM_MODEL", "gpt-4.1-nano")
+
+NODE_STEPS = ("refuse_joins",)
+
+# How often the event loop lag is sampled
+_LAG_SAMPLE_S = 0.25
+
+
+class DegradationController:
+    """Steps bots down and up the degradation ladder as node pressure changes."""
+
+    def __init__(self, ladder: List[str] = DEGRADATION_LADDER, logger=logger):
+        if "smaller_llm" in ladder and DEGRADED_LLM_MODEL == BOT_LLM_MODEL:
+            # Bots already run that model, so the rung would change nothing
+            ladder = [step for step in ladder if step != "smaller_llm"]
+        self.ladder = ladder
+        self.bot_steps = [step for step in ladder if step not in NODE_STEPS]
+        self.node_steps = [step for step in ladder if step in NODE_STEPS]
+        self.node_level = 0
+        self.logger = logger
+        self.loop_lag_ms = 0.0
+        self.cpu_percent = 0.0
+        self._max_lag_ms = 0.0
+        self._last_cpu: Optional[tuple[int, int]] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start sampling and the control loop."""
+        if DEGRADATION_ENABLED and not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._sample_lag()),
+                asyncio.create_task(self._run()),
+            ]
+            self.logger.info(f"Degradation ladder: {', '.join(self.ladder)}")
+
+    async def stop(self):
+        """Stop the background tasks."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(_LAG_SAMPLE_S)
+            lag_ms = (loop.time() - before - _LAG_SAMPLE_S) * 1000
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+
+    def _sample_cpu(self) -> float:
+        times = read_cpu_times()
+        if not times:
+            return 0.0
+        busy = sum(b for b, _ in times.values())
+        total = sum(t for _, t in times.values())
+        previous, self._last_cpu = self._last_cpu, (busy, total)
+        if previous is None or total <= previous[1]:
+            return self.cpu_percent
+        return 100.0 * (busy - previous[0]) / (total - previous[1])
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(DEGRADE_INTERVAL_S)
+            try:
+                await self.check_once()
+            except Exception as e:
+                self.logger.error(f"Degradation check failed: {e}")
+
+    async def check_once(self):
+        """Sample pressure and take at most one step."""
+        self.loop_lag_ms, self._max_lag_ms = self._max_lag_ms, 0.0
+        self.cpu_percent = self._sample_cpu()
+        metrics.set_gauge("event_loop_lag_ms", round(self.loop_lag_ms, 1))
+        metrics.set_gauge("node_cpu_percent", round(self.cpu_percent, 1))
+
+        if (
+            self.loop_lag_ms > DEGRADE_LOOP_LAG_MS
+            or self.cpu_percent > DEGRADE_CPU_PERCENT
+        ):
+            await self.step_down()
+        elif (
+            self.loop_lag_ms < RECOVER_LOOP_LAG_MS
+            and self.cpu_percent < RECOVER_CPU_PERCENT
+        ):
+            await self.step_up()
+        metrics.set_gauge(
+            "degraded_bots",
+            sum(1 for bot in supervisor.bots.values() if bot.degradation_level),
+        )
+
+    async def step_down(self):
+        """Move bots one rung down, or engage the next node step."""
+        candidates = [
+            bot
+            for bot in supervisor.bots.values()
+            if bot.degradation_level < len(self.bot_steps)
+            and control_hub.is_connected(bot.client_id)
+        ]
+        if candidates:
+            # Least degraded first so the cost is spread, heaviest among those
+            candidates.sort(key=lambda bot: (bot.degradation_level, -bot.cpu_percent))
+            for bot in candidates[: self._batch_size()]:
+                await self._set_level(bot, bot.degradation_level + 1, "down")
+        elif self.node_level < len(self.node_steps):
+            step = self.node_steps[self.node_level]
+            self.node_level += 1
+            self._set_node_step(step, True)
+
+    async def step_up(self):
+        """Undo node steps first, then move the most degraded bots one rung up."""
+        if self.node_level > 0:
+            self.node_level -= 1
+            self._set_node_step(self.node_steps[self.node_level], False)
+            return
+        candidates = [bot for bot in supervisor.bots.values() if bot.degradation_level]
+        candidates.sort(key=lambda bot: -bot.degradation_level)
+        for bot in candidates[: self._batch_size()]:
+            await self._set_level(bot, bot.degradation_level - 1, "up")
+
+    def _batch_size(self) -> int:
+        return max(1, math.ceil(len(supervisor.bots) * DEGRADE_BOTS_PER_STEP))
+
+    async def _set_level(self, bot: SupervisedBot, level: int, direction: str):
+        steps = self.bot_steps[:level]
+        reply = await control_hub.request(
+            bot.client_id, {"type": "degrade", "steps": steps}
+        )
+        if reply is None or "error" in reply:
+            self.logger.warning(
+                f"Bot {bot.client_id} did not apply degradation level {level}"
+            )
+            return
+        step = self.bot_steps[max(level, bot.degradation_level) - 1]
+        bot.degradation_level = level
+        metrics.increment(
+            "degradation_transitions_total", step=step, direction=direction
+        )
+        self.logger.warning(
+            f"Degradation {direction}: bot {bot.client_id} {step} "
+            f"{'on' if direction == 'down' else 'off'} (level {level}, "
+            f"lag {self.loop_lag_ms:.0f}ms, cpu {self.cpu_percent:.0f}%)"
+        )
+
+    def _set_node_step(self, step: str, on: bool):
+        if step == "refuse_joins":
+            if on:
+                admission.close("overloaded")
+            else:
+                admission.open("overloaded")
+        direction = "down" if on else "up"
+        metrics.increment(
+            "degradation_transitions_total", step=step, direction=direction
+        )
+        self.logger.warning(
+            f"Degradation {direction}: node {step} {'on' if on else 'off'} "
+            f"(lag {self.loop_lag_ms:.0f}ms, cpu {self.cpu_percent:.0f}%)"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Return pressure readings and the steps in force for /health."""
+        return {
+            "enabled": DEGRADATION_ENABLED,
+            "loop_lag_ms": round(self.loop_lag_ms, 1),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "node_steps": self.node_steps[: self.node_level],
+            "bots": {
+                client_id: self.bot_steps[: bot.degradation_level]
+                for client_id, bot in supervisor.bots.items()
+                if bot.degradation_level
+            },
+        }
+
+
+# Create a singleton instance
+degradation = DegradationController()
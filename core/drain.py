@@ -0,0 +1,152 @@
+"""Graceful drain of a node before a rolling deploy."""
+
+import asyncio
+import os
+import signal
+import time
+from typing import Any, Dict, Optional
+
+from core.capacity import admission
+from core.connection import MEETING_DETAILS, PIPECAT_PROCESSES
+from core.metrics import metrics
+from core.migration import migrator
+from core.supervisor import supervisor
+from meetingbaas_pipecat.utils.logger import logger
+
+# How long live sessions may keep running once a drain starts
+DRAIN_TIMEOUT_S = float(os.getenv("DRAIN_TIMEOUT_S", "3600"))
+# How often drain progress is checked and logged
+DRAIN_POLL_INTERVAL_S = float(os.getenv("DRAIN_POLL_INTERVAL_S", "5"))
+# Stop the server once the node is empty (disable to keep serving /health)
+DRAIN_EXIT_WHEN_EMPTY = os.getenv("DRAIN_EXIT_WHEN_EMPTY", "true").lower() == "true"
+
+
+def live_sessions() -> int:
+    """
+    Count the sessions this node still serves.
+
+    Sessions migrated to a peer node run no local bot but are still relayed
+    through this node, so they keep the drain going until they end.
+    """
+    return admission.active() + len(migrator.remote_workers)
+
+
+class DrainController:
+    """Stops admitting bots and shuts the server down once they are gone."""
+
+    def __init__(self, logger=logger):
+        self.logger = logger
+        self.started_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self.initial_bots = 0
+        self.finished = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def draining(self) -> bool:
+        """True once a drain has been requested."""
+        return self.started_at is not None
+
+    def start(self, timeout: float = DRAIN_TIMEOUT_S) -> Dict[str, Any]:
+        """
+        Start draining, or move the deadline of a drain in progress.
+
+        Args:
+            timeout: Seconds live sessions may keep running
+
+        Returns:
+            The drain status
+        """
+        now = time.monotonic()
+        self.deadline = now + max(0.0, timeout)
+        if not self.draining:
+            self.started_at = now
+            self.initial_bots = live_sessions()
+            admission.close("draining")
+            metrics.increment("drains_total")
+            self.logger.warning(
+                f"Draining node: {self.initial_bots} live bot(s), "
+                f"deadline in {timeout:.0f}s"
+            )
+            self._task = asyncio.create_task(self._run())
+        else:
+            self.logger.info(f"Drain deadline moved to {timeout:.0f}s from now")
+        return self.status()
+
+    def cancel(self) -> Dict[str, Any]:
+        """Stop a drain that has not finished and accept joins again."""
+        if self.draining and not self.finished:
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            self.started_at = None
+            self.deadline = None
+            admission.open("draining")
+            self.logger.info("Drain cancelled")
+        return self.status()
+
+    def install_signal_handler(self):
+        """Start a drain on SIGUSR1 (SIGTERM stays with the server)."""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.start)
+        except (NotImplementedError, RuntimeError, ValueError) as e:
+            # No signal handlers on Windows loops or outside the main thread
+            self.logger.debug(f"Cannot install drain signal handler: {e}")
+
+    async def _run(self):
+        while True:
+            remaining = live_sessions()
+            if remaining == 0:
+                self.logger.info("Drain complete: no live bots left")
+                break
+            if time.monotonic() >= self.deadline:
+                self.logger.warning(
+                    f"Drain deadline reached with {remaining} live bot(s), "
+                    f"removing them"
+                )
+                await self._remove_remaining()
+                break
+            self.logger.info(
+                f"Draining: {remaining}/{self.initial_bots} bot(s) left, "
+                f"{self.deadline - time.monotonic():.0f}s to deadline"
+            )
+            metrics.set_gauge("drain_bots_remaining", remaining)
+            await asyncio.sleep(DRAIN_POLL_INTERVAL_S)
+
+        metrics.set_gauge("drain_bots_remaining", 0)
+        self.finished = True
+        if DRAIN_EXIT_WHEN_EMPTY:
+            self.logger.info("Shutting down drained node")
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    async def _remove_remaining(self):
+        for client_id in list(PIPECAT_PROCESSES):
+            await supervisor.remove(client_id)
+        for client_id in list(migrator.remote_workers):
+            await migrator.stop_remote(client_id)
+            MEETING_DETAILS.pop(client_id, None)
+
+    def status(self) -> Dict[str, Any]:
+        """Return drain progress for /ready and the admin endpoints."""
+        remaining = live_sessions()
+        status: Dict[str, Any] = {
+            "draining": self.draining,
+            "finished": self.finished,
+            "bots_remaining": remaining,
+        }
+        if self.draining:
+            now = time.monotonic()
+            status.update(
+                {
+                    "initial_bots": self.initial_bots,
+                    "elapsed_s": round(now - self.started_at, 1),
+                    "deadline_in_s": round(max(0.0, self.deadline - now), 1),
+                }
+            )
+        return status
+
+
+# Create a singleton instance
+drain = DrainController()
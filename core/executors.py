@@ -0,0 +1,149 @@
+"""Named, separately sized thread pools for blocking work.
+
+``asyncio.to_thread`` sends every blocking call to the loop's default
+executor, so a handful of slow provider calls (an SDXL generation holds its
+thread for the whole run) can starve quick file writes queued behind them.
+Each workload class gets its own pool here, with a bounded queue and its
+queue depth and wait time exported as metrics.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from core.metrics import metrics
+
+T = TypeVar("T")
+
+# Long blocking calls to third-party APIs (Replicate, peer nodes)
+PROVIDER_EXECUTOR_WORKERS = int(os.getenv("PROVIDER_EXECUTOR_WORKERS", "8"))
+PROVIDER_EXECUTOR_QUEUE = int(os.getenv("PROVIDER_EXECUTOR_QUEUE", "32"))
+# Local file and SQLite reads and writes
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "4"))
+IO_EXECUTOR_QUEUE = int(os.getenv("IO_EXECUTOR_QUEUE", "256"))
+# CPU-bound parsing and indexing
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS") or os.cpu_count() or 2)
+CPU_EXECUTOR_QUEUE = int(os.getenv("CPU_EXECUTOR_QUEUE", "64"))
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a call is submitted to an executor whose queue is full."""
+
+
+class BoundedExecutor:
+    """
+    A named thread pool that rejects work beyond a bounded queue.
+
+    Args:
+        name: Workload class, used as the ``executor`` metric label
+        max_workers: Threads in the pool
+        max_queue: Calls allowed to wait for a thread; 0 means unbounded
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.queued = 0
+        self.active = 0
+        self._pool = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix=f"{name}-executor"
+        )
+        # Counts change on pool threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def _update(self, queued: int = 0, active: int = 0):
+        with self._lock:
+            self.queued += queued
+            self.active += active
+            queue_depth, busy = self.queued, self.active
+        metrics.set_gauge("executor_queue_depth", queue_depth, executor=self.name)
+        metrics.set_gauge("executor_active", busy, executor=self.name)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function on the pool and await its result.
+
+        Like ``asyncio.to_thread``, the caller's context variables are visible
+        to the function. Cancelling the caller before the call has started
+        withdraws it from the queue.
+
+        Raises:
+            ExecutorSaturatedError: If the queue is already full
+        """
+        with self._lock:
+            full = self.max_queue and self.queued >= self.max_queue
+        if full:
+            metrics.increment("executor_rejected_total", executor=self.name)
+            raise ExecutorSaturatedError(
+                f"{self.name} executor is saturated "
+                f"({self.queued} queued, {self.active} running)"
+            )
+
+        submitted = time.monotonic()
+
+        def call() -> T:
+            started = time.monotonic()
+            self._update(queued=-1, active=1)
+            metrics.observe(
+                "executor_wait_seconds", started - submitted, executor=self.name
+            )
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._update(active=-1)
+                metrics.observe(
+                    "executor_run_seconds",
+                    time.monotonic() - started,
+                    executor=self.name,
+                )
+
+        self._update(queued=1)
+        context = contextvars.copy_context()
+        future = self._pool.submit(functools.partial(context.run, call))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                # Never started, so call() will not take it off the queue
+                self._update(queued=-1)
+            raise
+
+    def status(self) -> Dict[str, int]:
+        """Return pool size and load for /health."""
+        return {
+            "workers": self.max_workers,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+        }
+
+    def shutdown(self):
+        """Drop queued calls and stop accepting new ones."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Create the singleton instances
+provider_executor = BoundedExecutor(
+    "provider", PROVIDER_EXECUTOR_WORKERS, PROVIDER_EXECUTOR_QUEUE
+)
+io_executor = BoundedExecutor("io", IO_EXECUTOR_WORKERS, IO_EXECUTOR_QUEUE)
+cpu_executor = BoundedExecutor("cpu", CPU_EXECUTOR_WORKERS, CPU_EXECUTOR_QUEUE)
+
+EXECUTORS = (provider_executor, io_executor, cpu_executor)
+
+
+def executors_status() -> Dict[str, Dict[str, int]]:
+    """Return the load of every executor, keyed by name."""
+    return {executor.name: executor.status() for executor in EXECUTORS}
+
+
+def shutdown_executors():
+    """Shut every executor down."""
+    for executor in EXECUTORS:
+        executor.shutdown()
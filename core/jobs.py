@@ -0,0 +1,256 @@
+"""Bounded background queue for slow requests, with progress events.
+
+A request submitted as a job returns at once; a fixed pool of workers runs
+it, and clients follow it by polling its snapshot or streaming its events.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from core.metrics import metrics
+from meetingbaas_pipecat.utils.logger import logger
+
+# Jobs run at the same time
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+# Jobs allowed to wait for a worker before submissions are refused
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# How long finished jobs stay queryable
+JOB_TTL_S = float(os.getenv("JOB_TTL_S", "3600"))
+# Retry-After sent when the queue is full
+JOB_RETRY_AFTER_S = int(os.getenv("JOB_RETRY_AFTER_S", "5"))
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+    def __init__(self, message: str, retry_after: int = JOB_RETRY_AFTER_S):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobFailed(Exception):
+    """Raised by a job's function to fail it with a status code and details."""
+
+    def __init__(self, message: str, status_code: int = 500, **details: Any):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+def owner_of(api_key: str) -> str:
+    """Hash an API key into the owner recorded on jobs."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+@dataclass
+class Job:
+    """A queued or running request and everything it reported so far."""
+
+    kind: str
+    owner: str
+    run: Callable[["Job"], Awaitable[Any]] = field(repr=False)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: str = "queued"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _updated: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    def emit(self, event: str, **data: Any):
+        """Record a progress event and wake the streams following the job."""
+        self.events.append(
+            {
+                "event": event,
+                "at": round(time.monotonic() - self.queued_at, 3),
+                **data,
+            }
+        )
+        # Swap the event so each wake-up only covers what came before it
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self, heartbeat_s: float) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield the job's events, past ones first, until it finishes.
+
+        Yields None every ``heartbeat_s`` without events, so streams can send
+        keep-alives through proxies.
+        """
+        sent = 0
+        while True:
+            updated = self._updated
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.done:
+                return
+            try:
+                await asyncio.wait_for(updated.wait(), heartbeat_s)
+            except asyncio.TimeoutError:
+                yield None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the job's state, timings and outcome."""
+        now = time.monotonic()
+        wait_end = self.started_at if self.started_at is not None else now
+        run_s = None
+        if self.started_at is not None:
+            run_s = (self.finished_at or now) - self.started_at
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "created_at": self.created_at.isoformat(),
+            "queue_wait_s": round(wait_end - self.queued_at, 3),
+            "run_s": round(run_s, 3) if run_s is not None else None,
+            "result": self.result,
+            "error": self.error,
+            "events": self.events,
+        }
+
+
+class JobQueue:
+    """A bounded queue of jobs run by a fixed number of workers."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_queue: int = JOB_QUEUE_SIZE,
+        ttl: float = JOB_TTL_S,
+        logger=logger,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.logger = logger
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the workers."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.max_queue)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers, cancelling running jobs."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self, kind: str, owner: str, run: Callable[[Job], Awaitable[Any]]
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind: Job type, used as the ``kind`` metric label
+            owner: Who may read the job back, see :func:`owner_of`
+            run: Coroutine function called with the job; its return value
+                becomes the job result
+
+        Raises:
+            JobQueueFull: If the queue is full or the workers are not running
+        """
+        self._prune()
+        if self._queue is None or not self._tasks:
+            raise JobQueueFull("Job workers are not running")
+        job = Job(kind=kind, owner=owner, run=run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            metrics.increment("jobs_total", kind=kind, outcome="rejected")
+            raise JobQueueFull(f"{self._queue.qsize()} jobs already queued") from None
+        self.jobs[job.id] = job
+        job.emit("queued", position=self._queue.qsize())
+        metrics.set_gauge("job_queue_depth", self._queue.qsize())
+        return job
+
+    def get(self, job_id: str, owner: str) -> Optional[Job]:
+        """Return a job if it exists and belongs to ``owner``."""
+        job = self.jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.done and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            metrics.set_gauge("job_queue_depth", self._queue.qsize())
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.started_at = time.monotonic()
+        job.state = "running"
+        metrics.observe(
+            "job_queue_wait_seconds", job.started_at - job.queued_at, kind=job.kind
+        )
+        job.emit("started")
+        try:
+            job.result = await job.run(job)
+            job.state = "succeeded"
+        except JobFailed as e:
+            job.state = "failed"
+            job.error = {"message": str(e), "status_code": e.status_code, **e.details}
+        except asyncio.CancelledError:
+            job.state = "failed"
+            job.error = {"message": "Server shutting down", "status_code": 503}
+            raise
+        except Exception as e:
+            self.logger.exception(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.state = "failed"
+            job.error = {"message": str(e) or type(e).__name__, "status_code": 500}
+        finally:
+            job.finished_at = time.monotonic()
+            metrics.observe(
+                "job_run_seconds", job.finished_at - job.started_at, kind=job.kind
+            )
+            metrics.increment("jobs_total", kind=job.kind, outcome=job.state)
+            job.emit(job.state, result=job.result, error=job.error)
+
+    def status(self) -> Dict[str, Any]:
+        """Return queue depth and job counts for /health."""
+        running = sum(1 for job in self.jobs.values() if job.state == "running")
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": running,
+            "max_queue": self.max_queue,
+        }
+
+
+# Create a singleton instance
+job_queue = JobQueue()
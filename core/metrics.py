@@ -0,0 +1,95 @@
+"""In-process counters and latency samples exported by the API."""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# How many recent samples to keep per series for percentile estimates
+MAX_SAMPLES_PER_SERIES = 1024
+
+
+def _series_key(name: str, labels: Dict[str, str]) -> str:
+    """Build a Prometheus-style series key such as ``name{a="1",b="2"}``."""
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{labels[key]}"' for key in sorted(labels))
+    return f"{name}{{{rendered}}}"
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    Args:
+        values: Samples to compute the percentile over
+        fraction: Percentile as a fraction between 0 and 1 (0.9 for p90)
+
+    Returns:
+        The percentile value, or None if there are no samples
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class MetricsRegistry:
+    """Stores monotonically increasing counters and bounded sample windows."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES_PER_SERIES):
+        self.max_samples = max_samples
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.samples: Dict[str, Deque[float]] = {}
+        # Counters are bumped from supervisor threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """Increase a counter by ``value``."""
+        key = _series_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        """Set a gauge to the current ``value``."""
+        key = _series_key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record a sample (typically a latency in seconds)."""
+        key = _series_key(name, labels)
+        with self._lock:
+            series = self.samples.get(key)
+            if series is None:
+                series = self.samples[key] = deque(maxlen=self.max_samples)
+            series.append(value)
+
+    def summarize(self, key: str) -> Dict[str, Optional[float]]:
+        """Summarize the sample window of a series."""
+        with self._lock:
+            values = list(self.samples.get(key, ()))
+        return {
+            "count": len(values),
+            "p50": percentile(values, 0.5),
+            "p90": percentile(values, 0.9),
+            "p99": percentile(values, 0.99),
+            "max": max(values) if values else None,
+        }
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return a JSON-serializable view of every series."""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            sample_keys = list(self.samples)
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "summaries": {key: self.summarize(key) for key in sample_keys},
+        }
+
+
+# Create a singleton instance
+metrics = MetricsRegistry()
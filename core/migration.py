@@ -0,0 +1,284 @@
+"""Live migration of bot sessions between worker processes and nodes.
+
+A migration checkpoints the running worker's LLM context over the control
+channel, starts a replacement worker with it, and lets the replacement
+connect to the relay as a standby. Once it is up, the context is topped up
+with anything said in the meantime and the relay switches to it at a quiet
+point, so the meeting only loses the audio in flight during the swap.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from core.connection import PIPECAT_PROCESSES, registry
+from core.control import control_hub
+from core.executors import ExecutorSaturatedError, provider_executor
+from core.metrics import metrics
+from core.placement import placer
+from core.process import start_pipecat_process, terminate_process_gracefully
+from core.router import router as message_router
+from core.sessions import session_store
+from core.supervisor import supervisor
+from meetingbaas_pipecat.utils.logger import logger
+
+# How long a replacement worker may take to load and connect as a standby
+MIGRATION_READY_TIMEOUT_S = float(os.getenv("MIGRATION_READY_TIMEOUT_S", "30"))
+# How long to wait for the old worker to stop speaking before switching anyway
+MIGRATION_QUIET_TIMEOUT_S = float(os.getenv("MIGRATION_QUIET_TIMEOUT_S", "5"))
+# Bot silence that counts as a quiet point for the switch
+MIGRATION_QUIET_S = float(os.getenv("MIGRATION_QUIET_S", "0.3"))
+# Base URL other nodes reach this node's relay on, for cross-node migration
+NODE_PUBLIC_URL = os.getenv("NODE_PUBLIC_URL", "").rstrip("/")
+# Shared admin token sent to peer nodes
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+class MigrationError(Exception):
+    """Raised when a session cannot be migrated; the old worker keeps it."""
+
+
+def standby_url(websocket_url: str) -> str:
+    """Return the relay URL a replacement worker connects to as a standby."""
+    separator = "&" if "?" in websocket_url else "?"
+    return f"{websocket_url}{separator}standby=1"
+
+
+class RemoteWorker:
+    """A worker running on a peer node for a session this node still relays."""
+
+    def __init__(self, node_url: str, client_id: str):
+        self.node_url = node_url
+        self.client_id = client_id
+        self.pid = None
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    async def stop(self):
+        """Ask the peer node to stop the worker."""
+        if self.returncode is not None:
+            return
+        self.returncode = 0
+        try:
+            response = await provider_executor.run(
+                requests.delete,
+                f"{self.node_url}/admin/workers/{self.client_id}",
+                headers={"x-admin-token": ADMIN_TOKEN},
+                timeout=5,
+            )
+        except (requests.RequestException, ExecutorSaturatedError) as e:
+            logger.error(
+                f"Could not stop remote worker {self.client_id} on {self.node_url}: {e}"
+            )
+            return
+        if response.status_code >= 300 and response.status_code != 404:
+            logger.error(
+                f"Peer {self.node_url} did not stop worker {self.client_id} "
+                f"({response.status_code}): {response.text[:200]}"
+            )
+
+
+class Migrator:
+    """Moves live sessions to a new local process or to a peer node."""
+
+    def __init__(self, logger=logger):
+        self.logger = logger
+        self.in_progress: Dict[str, float] = {}
+        # Sessions relayed by this node whose worker runs on a peer node
+        self.remote_workers: Dict[str, RemoteWorker] = {}
+
+    async def migrate(
+        self, client_id: str, target_node: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Move a live session to a new worker.
+
+        Args:
+            client_id: Session to move
+            target_node: Base URL of a peer node to run the new worker on,
+                None to start it on this node (on the least loaded cores)
+
+        Returns:
+            Timings of the migration
+
+        Raises:
+            MigrationError: If the session cannot be moved; it then stays on
+                its current worker
+        """
+        bot = supervisor.bots.get(client_id)
+        old_process = PIPECAT_PROCESSES.get(client_id)
+        if bot is None or old_process is None or old_process.poll() is not None:
+            raise MigrationError(f"No local worker running for client {client_id}")
+        if registry.get_pipecat(client_id) is None:
+            raise MigrationError(f"Worker for client {client_id} is not connected")
+        if client_id in self.in_progress:
+            raise MigrationError(f"Client {client_id} is already being migrated")
+        if target_node and not NODE_PUBLIC_URL:
+            raise MigrationError("NODE_PUBLIC_URL is required to migrate to a peer")
+
+        started = time.monotonic()
+        self.in_progress[client_id] = started
+        new_process = None
+        try:
+            checkpoint = await control_hub.request(client_id, {"type": "checkpoint"})
+            if not checkpoint or "messages" not in checkpoint:
+                raise MigrationError(
+                    f"Worker for client {client_id} gave no checkpoint"
+                )
+
+            spawn_kwargs = dict(bot.spawn_kwargs, messages=checkpoint["messages"])
+            if target_node:
+                relay_url = NODE_PUBLIC_URL.replace("http", "ws", 1)
+                spawn_kwargs["websocket_url"] = standby_url(
+                    f"{relay_url}/pipecat/{client_id}"
+                )
+                new_process = await self._start_remote(target_node, spawn_kwargs)
+            else:
+                spawn_kwargs["websocket_url"] = standby_url(
+                    bot.spawn_kwargs["websocket_url"]
+                )
+                new_process = start_pipecat_process(**spawn_kwargs)
+
+            await self._wait_for_standby(client_id, new_process)
+            ready_at = time.monotonic()
+
+            # Top up the context with what was said while the new worker loaded
+            await self._wait_for_quiet(client_id)
+            latest = await control_hub.request(client_id, {"type": "checkpoint"})
+            if latest and "messages" in latest:
+                await control_hub.request(
+                    client_id,
+                    {"type": "restore", "messages": latest["messages"]},
+                    standby=True,
+                )
+
+            switch_started = time.monotonic()
+            old_websocket = self._switch(client_id, bot, new_process, target_node)
+            switch_s = time.monotonic() - switch_started
+        except Exception as e:
+            metrics.increment("migrations_total", outcome="failed")
+            if isinstance(new_process, RemoteWorker):
+                await new_process.stop()
+            elif new_process is not None:
+                await asyncio.to_thread(terminate_process_gracefully, new_process, 3.0)
+                if not target_node:
+                    # Spawning re-recorded the session under the new worker
+                    session_store.save(client_id, old_process.pid, bot.spawn_kwargs)
+                    placer.adopt(client_id, old_process.pid)
+            if isinstance(e, MigrationError):
+                raise
+            raise MigrationError(f"Migration of client {client_id} failed: {e}") from e
+        finally:
+            self.in_progress.pop(client_id, None)
+
+        # The old worker no longer reaches the meeting, so stop it at leisure
+        await asyncio.to_thread(terminate_process_gracefully, old_process, 3.0)
+        if old_websocket is not None:
+            try:
+                await old_websocket.close(code=1000, reason="Migrated")
+            except Exception as e:
+                # Usually already closed by the exiting worker
+                self.logger.debug(f"Old relay leg of {client_id} already closed: {e}")
+
+        metrics.increment("migrations_total", outcome="succeeded")
+        metrics.observe("migration_switch_seconds", switch_s)
+        result = {
+            "client_id": client_id,
+            "target": target_node or "local",
+            "ready_s": round(ready_at - started, 3),
+            "total_s": round(time.monotonic() - started, 3),
+            "switch_ms": round(switch_s * 1000, 3),
+        }
+        self.logger.info(f"Migrated session {client_id}: {result}")
+        return result
+
+    async def _start_remote(
+        self, node_url: str, spawn_kwargs: Dict[str, Any]
+    ) -> RemoteWorker:
+        node_url = node_url.rstrip("/")
+        try:
+            response = await provider_executor.run(
+                requests.post,
+                f"{node_url}/admin/workers",
+                json=spawn_kwargs,
+                headers={"x-admin-token": ADMIN_TOKEN},
+                timeout=10,
+            )
+        except (requests.RequestException, ExecutorSaturatedError) as e:
+            raise MigrationError(f"Peer {node_url} unreachable: {e}") from e
+        if response.status_code >= 300:
+            raise MigrationError(
+                f"Peer {node_url} refused the worker ({response.status_code}): "
+                f"{response.text[:200]}"
+            )
+        return RemoteWorker(node_url, spawn_kwargs["client_id"])
+
+    async def _wait_for_standby(self, client_id: str, new_process):
+        deadline = time.monotonic() + MIGRATION_READY_TIMEOUT_S
+        while client_id not in registry.standby_connections:
+            if new_process.poll() is not None:
+                raise MigrationError(f"Replacement worker for {client_id} exited")
+            if time.monotonic() >= deadline:
+                raise MigrationError(
+                    f"Replacement worker for {client_id} not ready after "
+                    f"{MIGRATION_READY_TIMEOUT_S:.0f}s"
+                )
+            await asyncio.sleep(0.05)
+
+    async def _wait_for_quiet(self, client_id: str):
+        deadline = time.monotonic() + MIGRATION_QUIET_TIMEOUT_S
+        while time.monotonic() < deadline:
+            last_output = message_router.last_output_at.get(client_id, 0.0)
+            if time.monotonic() - last_output >= MIGRATION_QUIET_S:
+                return
+            await asyncio.sleep(0.02)
+
+    def _switch(self, client_id: str, bot, new_process, target_node: Optional[str]):
+        # No awaits in here: audio keeps flowing to one worker or the other
+        old_websocket = registry.promote(client_id)
+        control_hub.promote(client_id)
+        if target_node:
+            # The peer node supervises its worker from now on; this node only
+            # relays, so the session no longer counts as a local bot
+            PIPECAT_PROCESSES.pop(client_id, None)
+            self.remote_workers[client_id] = new_process
+            supervisor.unregister(client_id)
+        else:
+            PIPECAT_PROCESSES[client_id] = new_process
+            bot.started_at = time.monotonic()
+            bot.last_cpu_ticks = None
+            bot.last_sample_at = None
+            # Spawning recorded the standby URL; restarts and adoption must
+            # join as the primary worker
+            session_store.save(client_id, new_process.pid, bot.spawn_kwargs)
+        return old_websocket
+
+    async def stop_remote(self, client_id: str) -> bool:
+        """
+        Stop the peer-node worker of a session migrated away from this node.
+
+        Returns:
+            bool: Whether the session had a remote worker
+        """
+        worker = self.remote_workers.pop(client_id, None)
+        if worker is None:
+            return False
+        await worker.stop()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Return the sessions being migrated and for how long."""
+        now = time.monotonic()
+        return {
+            client_id: round(now - started, 1)
+            for client_id, started in self.in_progress.items()
+        }
+
+
+# Create a singleton instance
+migrator = Migrator()
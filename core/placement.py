@@ -0,0 +1,164 @@
+"""CPU core placement for bot processes."""
+
+import os
+import threading
+from typing import Dict, List, Optional, Set
+
+from meetingbaas_pipecat.utils.logger import logger
+
+# Pin each bot to a core set chosen from current per-core load (opt-in)
+BOT_CPU_PLACEMENT = os.getenv("BOT_CPU_PLACEMENT", "false").lower() == "true"
+# Size of the core set given to each bot
+BOT_CORES_PER_BOT = int(os.getenv("BOT_CORES_PER_BOT", "1"))
+# Keep one core for the API server's relay event loop
+RESERVE_RELAY_CORE = os.getenv("RESERVE_RELAY_CORE", "false").lower() == "true"
+
+
+def affinity_supported() -> bool:
+    """Return True if the platform supports sched_setaffinity."""
+    return hasattr(os, "sched_setaffinity") and hasattr(os, "sched_getaffinity")
+
+
+def read_cpu_times() -> Dict[int, tuple[int, int]]:
+    """
+    Read cumulative busy and total jiffies per core from /proc/stat.
+
+    Returns:
+        Mapping of core index to ``(busy, total)``, empty if unavailable
+    """
+    times = {}
+    try:
+        with open("/proc/stat", "r") as f:
+            for line in f:
+                if not line.startswith("cpu") or line.startswith("cpu "):
+                    continue
+                name, *values = line.split()
+                counters = [int(value) for value in values]
+                # idle and iowait are the 4th and 5th columns
+                idle = counters[3] + (counters[4] if len(counters) > 4 else 0)
+                total = sum(counters[:8])
+                times[int(name[3:])] = (total - idle, total)
+    except (OSError, ValueError, IndexError):
+        return {}
+    return times
+
+
+class CorePlacer:
+    """Assigns bots to the least loaded cores and tracks the assignments."""
+
+    def __init__(
+        self,
+        cores_per_bot: int = BOT_CORES_PER_BOT,
+        reserve_relay_core: bool = RESERVE_RELAY_CORE,
+        enabled: bool = BOT_CPU_PLACEMENT,
+        logger=logger,
+    ):
+        self.logger = logger
+        self.enabled = enabled and affinity_supported()
+        self.cores_per_bot = max(1, cores_per_bot)
+        self.assignments: Dict[str, List[int]] = {}
+        self.relay_cores: Set[int] = set()
+        self._last_times: Dict[int, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+        all_cores = sorted(os.sched_getaffinity(0)) if affinity_supported() else []
+        self.bot_cores = list(all_cores)
+        # Reserving only makes sense if at least one core is left for bots
+        if self.enabled and reserve_relay_core and len(all_cores) > 1:
+            self.relay_cores = {all_cores[0]}
+            self.bot_cores = all_cores[1:]
+
+    def pin_relay(self):
+        """Pin every thread of the API server to the reserved relay core."""
+        if not self.relay_cores:
+            return
+        try:
+            thread_ids = [int(tid) for tid in os.listdir("/proc/self/task")]
+        except OSError:
+            thread_ids = [0]
+        for thread_id in thread_ids:
+            try:
+                os.sched_setaffinity(thread_id, self.relay_cores)
+            except OSError as e:
+                self.logger.debug(f"Could not pin thread {thread_id}: {e}")
+        self.logger.info(f"Reserved core(s) {sorted(self.relay_cores)} for the relay")
+
+    def core_loads(self) -> Dict[int, float]:
+        """Return the busy fraction of each bot core since the last call."""
+        current = read_cpu_times()
+        loads = {}
+        for core in self.bot_cores:
+            busy, total = current.get(core, (0, 0))
+            last_busy, last_total = self._last_times.get(core, (0, 0))
+            elapsed = total - last_total
+            loads[core] = (busy - last_busy) / elapsed if elapsed > 0 else 0.0
+        self._last_times = current
+        return loads
+
+    def place(self, client_id: str) -> Optional[List[int]]:
+        """
+        Choose a core set for a bot.
+
+        Cores are ranked by the number of bots already pinned to them, then
+        by their measured load, so bursts of joins spread evenly even before
+        the new bots show up in /proc/stat.
+
+        Args:
+            client_id: Client ID of the bot being spawned
+
+        Returns:
+            Sorted core indexes, or None if placement is disabled
+        """
+        if not self.enabled or not self.bot_cores:
+            return None
+
+        with self._lock:
+            self.assignments.pop(client_id, None)
+            pinned = {core: 0 for core in self.bot_cores}
+            for cores in self.assignments.values():
+                for core in cores:
+                    if core in pinned:
+                        pinned[core] += 1
+            loads = self.core_loads()
+            ranked = sorted(self.bot_cores, key=lambda c: (pinned[c], loads[c], c))
+            chosen = sorted(ranked[: self.cores_per_bot])
+            self.assignments[client_id] = chosen
+
+        self.logger.info(f"Placed bot {client_id} on core(s) {chosen}")
+        return chosen
+
+    def adopt(self, client_id: str, pid: int):
+        """Record the core set of a bot spawned by an earlier server."""
+        if not self.enabled or not affinity_supported():
+            return
+        try:
+            cores = sorted(os.sched_getaffinity(pid))
+        except OSError:
+            return
+        # A bot spawned with placement disabled runs on every core
+        if len(cores) == self.cores_per_bot and set(cores) <= set(self.bot_cores):
+            with self._lock:
+                self.assignments[client_id] = cores
+
+    def release(self, client_id: str):
+        """Forget the core set of a bot that has stopped."""
+        with self._lock:
+            self.assignments.pop(client_id, None)
+
+    def status(self) -> Dict[str, object]:
+        """Return the current placement for the /processes endpoint."""
+        with self._lock:
+            pinned = {core: 0 for core in self.bot_cores}
+            for cores in self.assignments.values():
+                for core in cores:
+                    if core in pinned:
+                        pinned[core] += 1
+        return {
+            "enabled": self.enabled,
+            "relay_cores": sorted(self.relay_cores),
+            "bots_per_core": pinned,
+        }
+
+
+# Create a singleton instance
+placer = CorePlacer()
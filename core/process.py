@@ -4,17 +4,136 @@ import os
 import subprocess
 import sys
 import time
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
 import json
 import threading
 
+from core.placement import placer
+from core.sessions import session_store
 from meetingbaas_pipecat.utils.logger import logger
 
+try:
+    import resource
+except ImportError:  # Windows has no setrlimit
+    resource = None
+
 PIPECAT_PROCESSES: Dict[str, subprocess.Popen] = {}
 
-def stream_output(pipe, prefix):
-    for line in iter(pipe.readline, ''):
-        print(f"{prefix} {line.strip()}")
+# Per-bot address space cap applied with setrlimit at spawn (0 disables it)
+BOT_MEMORY_LIMIT_MB = int(os.getenv("BOT_MEMORY_LIMIT_MB", "0"))
+
+# Threads each bot may use for torch/ONNX/BLAS pools (0 derives it from
+# the core count and BOT_TARGET_DENSITY, the number of bots we expect per node)
+BOT_THREAD_BUDGET = int(os.getenv("BOT_THREAD_BUDGET", "0"))
+BOT_TARGET_DENSITY = int(os.getenv("BOT_TARGET_DENSITY", "4"))
+
+# Native libraries read their thread pool size from these at import time
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def thread_budget(cpu_cores: Optional[List[int]] = None) -> int:
+    """
+    Compute how many threads a bot's native libraries may use.
+
+    Args:
+        cpu_cores: Core set the bot is pinned to, if any
+
+    Returns:
+        Thread count, at least 1 and never more than the bot's cores
+    """
+    # Cores this server may run on, which a container or cpuset can limit
+    # below the machine's core count
+    cores = (
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else (os.cpu_count() or 1)
+    )
+    available = len(cpu_cores) if cpu_cores else cores
+    if BOT_THREAD_BUDGET > 0:
+        return max(1, min(BOT_THREAD_BUDGET, available))
+    return max(1, min(cores // max(1, BOT_TARGET_DENSITY), available))
+
+
+def thread_budget_env(threads: int) -> Dict[str, str]:
+    """Return the environment variables enforcing a thread budget."""
+    env = {name: str(threads) for name in _THREAD_ENV_VARS}
+    # Read by scripts/meetingbaas.py to size torch's intra/inter-op pools
+    env["BOT_THREAD_BUDGET"] = str(threads)
+    return env
+
+
+def _child_setup(
+    memory_limit_mb: int, cpu_cores: Optional[List[int]] = None
+) -> Optional[Callable[[], None]]:
+    """
+    Build a preexec_fn that caps the child's address space and pins its cores.
+
+    Args:
+        memory_limit_mb: Limit in megabytes, 0 or less to disable
+        cpu_cores: Cores the child may run on, None to inherit ours
+
+    Returns:
+        A callable for ``subprocess.Popen(preexec_fn=...)`` or None
+    """
+    limit_memory = memory_limit_mb > 0 and resource is not None
+    if not limit_memory and not cpu_cores:
+        return None
+
+    limit_bytes = memory_limit_mb * 1024 * 1024
+
+    def apply_limits():
+        # Runs in the forked child before exec, so only the bot is affected
+        # and every thread it later starts inherits the core set
+        if limit_memory:
+            resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+        if cpu_cores:
+            os.sched_setaffinity(0, cpu_cores)
+
+    return apply_limits
+
+def build_session_config(
+    persona_data: Dict[str, Any],
+    prompt: Optional[str],
+    enable_tools: bool,
+    messages: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the config a bot needs to start without loading the persona tree.
+
+    Args:
+        persona_data: Resolved persona, possibly a dynamic one
+        prompt: Final system prompt, None to use the persona's prompt
+        enable_tools: Whether to enable function calling tools
+        messages: LLM context to continue from, for a migrated session
+
+    Returns:
+        A JSON-serializable session config
+    """
+    session_config = {
+        "persona": persona_data,
+        "prompt": prompt or persona_data.get("prompt"),
+        "voice_id": persona_data.get("cartesia_voice_id") or None,
+        "tools": ["get_weather", "get_time"] if enable_tools else [],
+    }
+    if messages:
+        session_config["messages"] = messages
+    return session_config
+
+
+def write_session_config(pipe, session_config: Dict[str, Any]):
+    """Write the session config as compact JSON to the bot's stdin and close it."""
+    try:
+        pipe.write(json.dumps(session_config, separators=(",", ":")))
+        pipe.close()
+    except (BrokenPipeError, OSError, ValueError) as e:
+        logger.error(f"Could not hand session config to bot: {e}")
+
 
 def start_pipecat_process(
     client_id: str,
@@ -25,10 +144,21 @@ def start_pipecat_process(
     enable_tools: bool,
     api_key: str = "",
     meetingbaas_bot_id: str = "",
+    prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, Any]]] = None,
 ) -> subprocess.Popen:
     """
     Start a Pipecat process for a client.
 
+    The resolved session config (persona, system prompt, voice ID and tools)
+    is written once to the bot's stdin, so the bot never re-parses the
+    persona directories and large additional content stays off the command
+    line.
+
+    The bot runs in its own session and logs to a file rather than to pipes
+    read by this process, and is recorded in the session store, so it keeps
+    running and can be re-adopted if the API server restarts.
+
     Args:
         client_id: Unique ID for the client
         websocket_url: WebSocket URL for communication
@@ -38,14 +168,20 @@ def start_pipecat_process(
         enable_tools: Whether to enable function calling tools
         api_key: API key for authentication
         meetingbaas_bot_id: ID of the meetingbaas bot
+        prompt: Final system prompt, defaults to the persona's prompt
+        messages: LLM context checkpointed from the worker this one replaces
 
     Returns:
         The subprocess.Popen object for the started process
     """
     logger.info(f"Starting Pipecat process for client {client_id}")
 
-    # Convert persona_data to JSON string
-    persona_data_json = json.dumps(persona_data)
+    session_config = build_session_config(
+        persona_data=persona_data,
+        prompt=prompt,
+        enable_tools=enable_tools,
+        messages=messages,
+    )
 
     # Construct the command to run the meetingbaas.py script
     script_path = os.path.join(
@@ -65,8 +201,9 @@ def start_pipecat_process(
         websocket_url,
         "--meeting-url",
         meeting_url,
-        "--persona-data-json",
-        persona_data_json,
+        "--persona-name",
+        display_name,
+        "--config-stdin",
         "--streaming-audio-frequency",
         streaming_audio_frequency,
     ]
@@ -81,20 +218,58 @@ def start_pipecat_process(
     if meetingbaas_bot_id:
         command.extend(["--meetingbaas-bot-id", meetingbaas_bot_id])
 
-    # Start the process
-    process = subprocess.Popen(
-        command,
-        env=os.environ.copy(),  # Copy the current environment
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,  # Capture output as text
-    )
+    # Pick the least loaded cores; also keeps bots off a reserved relay core
+    cpu_cores = placer.place(client_id)
 
-    # Start threads to print output
-    threading.Thread(target=stream_output, args=(process.stdout, "[Pipecat STDOUT]"), daemon=True).start()
-    threading.Thread(target=stream_output, args=(process.stderr, "[Pipecat STDERR]"), daemon=True).start()
+    # Size native thread pools for many bots per node instead of one per core
+    env = os.environ.copy()
+    threads = thread_budget(cpu_cores)
+    env.update(thread_budget_env(threads))
+    logger.debug(f"Thread budget for client {client_id}: {threads}")
 
-    logger.info(f"Started Pipecat process with PID {process.pid}")
+    # Start the process detached from our session, so signals aimed at the
+    # server (Ctrl+C, a deploy's SIGTERM) don't reach it
+    session_store.rotate_log(client_id)
+    log_path = session_store.log_path(client_id)
+    with open(log_path, "a") as log_file:
+        process = subprocess.Popen(
+            command,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=True,
+            preexec_fn=_child_setup(BOT_MEMORY_LIMIT_MB, cpu_cores),
+        )
+
+    # Hand over the session config without blocking on a full pipe while
+    # the bot is still importing its dependencies
+    threading.Thread(
+        target=write_session_config,
+        args=(process.stdin, session_config),
+        daemon=True,
+    ).start()
+
+    session_store.save(
+        client_id,
+        process.pid,
+        dict(
+            client_id=client_id,
+            websocket_url=websocket_url,
+            meeting_url=meeting_url,
+            persona_data=persona_data,
+            streaming_audio_frequency=streaming_audio_frequency,
+            enable_tools=enable_tools,
+            api_key=api_key,
+            meetingbaas_bot_id=meetingbaas_bot_id,
+            prompt=prompt,
+        ),
+    )
+
+    logger.info(
+        f"Started Pipecat process with PID {process.pid}, logging to {log_path}"
+    )
     return process
 
 
@@ -0,0 +1,151 @@
+"""Startup phase profiling from POST /bots to the bot's first word."""
+
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from core.control import control_hub
+from core.metrics import MAX_SAMPLES_PER_SERIES, percentile
+from meetingbaas_pipecat.utils.logger import logger
+
+# Identifies the deployment whose startup timings are being aggregated
+DEPLOYMENT_ID = os.getenv("DEPLOYMENT_ID") or os.getenv("FLY_IMAGE_REF") or "local"
+
+# Phases in the order they normally happen; the first two are server-side
+STARTUP_PHASES = (
+    "request_received",
+    "spawned",
+    "interpreter_start",
+    "imports_done",
+    "persona_loaded",
+    "vad_loaded",
+    "transport_connected",
+    "first_stt_result",
+    "first_llm_token",
+    "first_tts_byte",
+)
+
+# Bots whose startup is still being tracked
+MAX_TRACKED_BOTS = 1000
+
+
+class StartupProfiler:
+    """Collects monotonic phase timestamps per bot and aggregates them."""
+
+    def __init__(self, deployment: str = DEPLOYMENT_ID, logger=logger):
+        self.deployment = deployment
+        self.logger = logger
+        # client_id -> (deployment, {phase: monotonic timestamp})
+        self.bots: "OrderedDict[str, Tuple[str, Dict[str, float]]]" = OrderedDict()
+        # (deployment, phase) -> seconds since request_received
+        self.since_request: Dict[Tuple[str, str], Deque[float]] = {}
+        # (deployment, phase) -> seconds since the previous phase
+        self.phase_durations: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def mark(
+        self,
+        client_id: str,
+        phase: str,
+        timestamp: Optional[float] = None,
+        deployment: Optional[str] = None,
+    ):
+        """
+        Record that a bot reached a startup phase.
+
+        Args:
+            client_id: Bot the phase belongs to
+            phase: One of ``STARTUP_PHASES``
+            timestamp: ``time.monotonic()`` value; CLOCK_MONOTONIC is shared
+                by all processes on the host, so bots report their own
+            deployment: Deployment the bot was started by
+        """
+        if phase not in STARTUP_PHASES:
+            self.logger.debug(f"Ignoring unknown startup phase {phase!r}")
+            return
+        if client_id not in self.bots:
+            self.bots[client_id] = (deployment or self.deployment, {})
+            while len(self.bots) > MAX_TRACKED_BOTS:
+                self.bots.popitem(last=False)
+        bot_deployment, phases = self.bots[client_id]
+        if phase in phases:
+            return
+        phases[phase] = time.monotonic() if timestamp is None else timestamp
+
+        self._aggregate(bot_deployment, phase, phases)
+        if phase == STARTUP_PHASES[-1]:
+            self.logger.info(
+                f"Startup of {client_id}: "
+                + ", ".join(
+                    f"{name}={t:.3f}s" for name, t in self.timeline(client_id).items()
+                )
+            )
+            self.bots.pop(client_id, None)
+
+    def _aggregate(self, deployment: str, phase: str, phases: Dict[str, float]):
+        key = (deployment, phase)
+        start = phases.get("request_received")
+        if start is not None and phase != "request_received":
+            self._window(self.since_request, key).append(phases[phase] - start)
+
+        # The previous phase is the latest one reached before this one
+        earlier = [
+            t for name, t in phases.items() if name != phase and t <= phases[phase]
+        ]
+        if earlier:
+            self._window(self.phase_durations, key).append(phases[phase] - max(earlier))
+
+    @staticmethod
+    def _window(store: Dict[Tuple[str, str], Deque[float]], key) -> Deque[float]:
+        if key not in store:
+            store[key] = deque(maxlen=MAX_SAMPLES_PER_SERIES)
+        return store[key]
+
+    def timeline(self, client_id: str) -> Dict[str, float]:
+        """Return the phases of a tracked bot relative to its first phase."""
+        if client_id not in self.bots:
+            return {}
+        _, phases = self.bots[client_id]
+        start = min(phases.values())
+        return {
+            name: t - start
+            for name, t in sorted(phases.items(), key=lambda item: item[1])
+        }
+
+    async def handle_phase_message(self, client_id: str, message: Dict[str, Any]):
+        """Control channel handler for ``{"type": "phase", ...}`` messages."""
+        self.mark(
+            client_id,
+            message.get("phase", ""),
+            timestamp=message.get("t"),
+            deployment=message.get("deployment"),
+        )
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return phase percentiles per deployment, in phase order."""
+        report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        deployments = {deployment for deployment, _ in self.phase_durations}
+        deployments |= {deployment for deployment, _ in self.since_request}
+        for deployment in sorted(deployments):
+            phases = {}
+            for phase in STARTUP_PHASES:
+                durations = list(self.phase_durations.get((deployment, phase), ()))
+                totals = list(self.since_request.get((deployment, phase), ()))
+                if not durations and not totals:
+                    continue
+                phases[phase] = {
+                    "count": max(len(durations), len(totals)),
+                    "phase_p50": percentile(durations, 0.5),
+                    "phase_p90": percentile(durations, 0.9),
+                    "phase_p99": percentile(durations, 0.99),
+                    "since_request_p50": percentile(totals, 0.5),
+                    "since_request_p90": percentile(totals, 0.9),
+                    "since_request_p99": percentile(totals, 0.99),
+                }
+            report[deployment] = phases
+        return report
+
+
+# Create a singleton instance
+profiler = StartupProfiler()
+control_hub.register("phase", profiler.handle_phase_message)
@@ -0,0 +1,163 @@
+"""Token-bucket rate limits and concurrency caps for outbound provider calls.
+
+Every call to a provider API first awaits a permit from the provider's
+limiter, so a burst of joins queues here instead of tripping the provider's
+own 429s. Limits are set per provider in ``DEFAULT_RATE_LIMITS`` and can be
+overridden with the ``RATE_LIMITS`` environment variable, e.g.::
+
+    RATE_LIMITS='{"openai": {"rate": 20, "burst": 40, "concurrency": 32}}'
+
+``rate`` is in requests per second (0 disables the bucket), ``burst`` is the
+bucket size and ``concurrency`` caps calls in flight (0 for no cap). Limits
+apply per provider and API key: calls made with a caller's key (MeetingBaas)
+get a limiter per key.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from core.metrics import metrics
+from meetingbaas_pipecat.utils.logger import logger
+
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+    "openai": {"rate": 8, "burst": 16, "concurrency": 16},
+    "cartesia": {"rate": 2, "burst": 4, "concurrency": 4},
+    "replicate": {"rate": 8, "burst": 16, "concurrency": 16},
+    # Polls and cancels of running predictions, which Replicate limits apart
+    # from creations
+    "replicate_poll": {"rate": 50, "burst": 100, "concurrency": 0},
+    "meetingbaas": {"rate": 5, "burst": 10, "concurrency": 8},
+    "uploadthing": {"rate": 5, "burst": 10, "concurrency": 8},
+}
+# Limiters kept for per-key providers; the least recently used are dropped
+MAX_KEYED_LIMITERS = 1024
+
+
+def _load_limits() -> Dict[str, Dict[str, float]]:
+    limits = {name: dict(limit) for name, limit in DEFAULT_RATE_LIMITS.items()}
+    raw = os.getenv("RATE_LIMITS")
+    if not raw:
+        return limits
+    try:
+        overrides = json.loads(raw)
+        for name, limit in overrides.items():
+            limits.setdefault(name, {}).update(
+                {key: float(value) for key, value in limit.items()}
+            )
+    except (ValueError, AttributeError, TypeError) as e:
+        logger.error(f"Ignoring invalid RATE_LIMITS ({e}), using the defaults")
+        return {name: dict(limit) for name, limit in DEFAULT_RATE_LIMITS.items()}
+    return limits
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``; waiters queue FIFO."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def take(self):
+        """Wait for a token and take it."""
+        if self.rate <= 0:
+            return
+        # Sleeping with the lock held keeps waiters in arrival order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class Limiter:
+    """Token bucket plus concurrency cap for one provider (and API key)."""
+
+    def __init__(self, provider: str, rate: float, burst: float, concurrency: int):
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst)
+        self._slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def permit(self) -> AsyncIterator[None]:
+        """Hold a permit for the duration of one provider call."""
+        started = time.monotonic()
+        if self._slots is not None:
+            await self._slots.acquire()
+        try:
+            await self.bucket.take()
+            waited = time.monotonic() - started
+            metrics.observe("ratelimit_wait_seconds", waited, provider=self.provider)
+            self.in_flight += 1
+            metrics.set_gauge(
+                "ratelimit_in_flight", self.in_flight, provider=self.provider
+            )
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                metrics.set_gauge(
+                    "ratelimit_in_flight", self.in_flight, provider=self.provider
+                )
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+
+class LimiterRegistry:
+    """Creates and hands out a limiter per provider and API key."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = limits if limits is not None else _load_limits()
+        self._limiters: "OrderedDict[Tuple[str, Optional[str]], Limiter]" = (
+            OrderedDict()
+        )
+
+    def get(self, provider: str, api_key: Optional[str] = None) -> Limiter:
+        """
+        Return the limiter of a provider.
+
+        Args:
+            provider: Provider name, a key of ``DEFAULT_RATE_LIMITS``
+            api_key: Caller's key for providers billed per caller; None for
+                the server's own key
+        """
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+        key = (provider, key_hash)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limit = self.limits.get(provider, {})
+            limiter = self._limiters[key] = Limiter(
+                provider,
+                rate=limit.get("rate", 0),
+                burst=limit.get("burst", 1),
+                concurrency=int(limit.get("concurrency", 0)),
+            )
+            if len(self._limiters) > MAX_KEYED_LIMITERS:
+                self._limiters.popitem(last=False)
+        else:
+            self._limiters.move_to_end(key)
+        return limiter
+
+    def permit(self, provider: str, api_key: Optional[str] = None):
+        """Shorthand for ``get(provider, api_key).permit()``."""
+        return self.get(provider, api_key).permit()
+
+
+# Create a singleton instance
+rate_limits = LimiterRegistry()
@@ -1,5 +1,7 @@
 """Routes messages between clients and Pipecat."""
 
+import time
+
 from core.connection import registry
 from core.converter import converter
 from meetingbaas_pipecat.utils.logger import logger
@@ -13,12 +15,25 @@ class MessageRouter:
         self.converter = converter
         self.logger = logger
         self.closing_clients = set()  # Track clients that are in the process of closing
+        # Monotonic time of the last bot audio relayed to each client
+        self.last_output_at = {}
 
     def mark_closing(self, client_id: str):
         """Mark a client as closing to prevent sending more data to it."""
         self.closing_clients.add(client_id)
         self.logger.debug(f"Marked client {client_id} as closing")
 
+    def clear_closing(self, client_id: str):
+        """Resume routing for a client, e.g. after its bot was restarted."""
+        if client_id in self.closing_clients:
+            self.closing_clients.discard(client_id)
+            self.logger.debug(f"Cleared closing flag for client {client_id}")
+
+    def forget(self, client_id: str):
+        """Drop all routing state kept for a client."""
+        self.closing_clients.discard(client_id)
+        self.last_output_at.pop(client_id, None)
+
     async def send_binary(self, message: bytes, client_id: str):
         """Send binary data to a client."""
         if client_id in self.closing_clients:
@@ -99,6 +114,7 @@ class MessageRouter:
                 audio_data = self.converter.protobuf_to_raw(message)
                 if audio_data:
                     await client.send_bytes(audio_data)
+                    self.last_output_at[client_id] = time.monotonic()
                     self.logger.debug(
                         f"Forwarded audio ({len(audio_data)} bytes) from Pipecat to client {client_id}"
                     )
@@ -0,0 +1,220 @@
+"""Durable on-disk registry of bot processes, so bots outlive the API server.
+
+Bots are spawned detached in their own session and log to files, so a
+restarted server can re-adopt them from this registry, and a crashed one
+leaves a record of the orphans to clean up.
+"""
+
+import json
+import os
+import shutil
+import signal
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from meetingbaas_pipecat.utils.logger import logger
+
+# Where session records and bot logs are kept; must survive server restarts
+BOT_STATE_DIR = os.getenv(
+    "BOT_STATE_DIR", os.path.join(tempfile.gettempdir(), "speaking-meeting-bot")
+)
+# Re-adopt running bots on startup (false kills them as orphans instead)
+BOT_ADOPTION = os.getenv("BOT_ADOPTION", "true").lower() == "true"
+# Adopted bots that have not reconnected after this long are orphans
+ORPHAN_GRACE_S = float(os.getenv("ORPHAN_GRACE_S", "60"))
+# Bot logs above this size (MB) are rotated, keeping one older file (0 disables)
+BOT_LOG_MAX_MB = float(os.getenv("BOT_LOG_MAX_MB", "50"))
+# Logs of bots that ended are deleted after this long (0 deletes them at once)
+BOT_LOG_RETENTION_S = float(os.getenv("BOT_LOG_RETENTION_S", "86400"))
+
+
+def process_start_time(pid: int) -> Optional[int]:
+    """
+    Read when a process started, in clock ticks since boot.
+
+    Together with the PID this identifies a process, so a recycled PID is
+    never mistaken for one of our bots.
+
+    Args:
+        pid: Process ID to inspect
+
+    Returns:
+        The start time, or None if the process is gone or /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # State is field 3 of stat(5) and starttime field 22, i.e. 0 and 19 here
+    if fields[0] in ("Z", "X"):
+        return None
+    return int(fields[19])
+
+
+class AdoptedProcess:
+    """A bot process started by an earlier server, with the Popen interface we use.
+
+    The exit status of a process that is not our child cannot be read, so an
+    adopted bot that exits is reported as a clean exit and is not restarted.
+    """
+
+    def __init__(self, pid: int, start_time: Optional[int]):
+        self.pid = pid
+        self.start_time = start_time
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and process_start_time(self.pid) != self.start_time:
+            self.returncode = 0
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Process {self.pid} still running")
+            time.sleep(0.1)
+        return self.returncode
+
+    def send_signal(self, sig: int):
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                self.returncode = 0
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class SessionStore:
+    """One JSON record per bot: its PID, start time and spawn arguments."""
+
+    def __init__(self, state_dir: str = BOT_STATE_DIR, logger=logger):
+        self.state_dir = state_dir
+        self.sessions_dir = os.path.join(state_dir, "sessions")
+        self.logs_dir = os.path.join(state_dir, "logs")
+        self.logger = logger
+
+    def _path(self, client_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{client_id}.json")
+
+    def log_path(self, client_id: str) -> str:
+        """Return the file a bot's stdout and stderr go to."""
+        os.makedirs(self.logs_dir, exist_ok=True)
+        return os.path.join(self.logs_dir, f"{client_id}.log")
+
+    def log_oversized(self, client_id: str) -> bool:
+        """Whether a bot's log has outgrown ``BOT_LOG_MAX_MB``."""
+        if not BOT_LOG_MAX_MB:
+            return False
+        try:
+            size = os.path.getsize(self.log_path(client_id))
+        except OSError:
+            return False
+        return size > BOT_LOG_MAX_MB * 1024 * 1024
+
+    def rotate_log(self, client_id: str):
+        """
+        Move an oversized bot log to ``<client_id>.log.1``.
+
+        Copied then truncated rather than renamed, as a running bot keeps
+        appending to the file it was started with.
+        """
+        if not self.log_oversized(client_id):
+            return
+        path = self.log_path(client_id)
+        try:
+            shutil.copyfile(path, path + ".1")
+            with open(path, "r+") as f:
+                f.truncate(0)
+        except OSError as e:
+            self.logger.warning(f"Could not rotate log of client {client_id}: {e}")
+
+    def prune_logs(self):
+        """Delete the logs of ended bots older than ``BOT_LOG_RETENTION_S``."""
+        try:
+            names = os.listdir(self.logs_dir)
+        except FileNotFoundError:
+            return
+        now = time.time()
+        for name in names:
+            client_id = name.split(".log", 1)[0]
+            if os.path.exists(self._path(client_id)):
+                # The bot is still running
+                continue
+            path = os.path.join(self.logs_dir, name)
+            try:
+                if now - os.path.getmtime(path) > BOT_LOG_RETENTION_S:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"Could not delete bot log {name}: {e}")
+
+    def save(self, client_id: str, pid: int, spawn_kwargs: Dict[str, Any]):
+        """Record a spawned bot, replacing the record of a previous process."""
+        record = {
+            "client_id": client_id,
+            "pid": pid,
+            "start_time": process_start_time(pid),
+            "server_pid": os.getpid(),
+            "created_at": time.time(),
+            "spawn_kwargs": spawn_kwargs,
+        }
+        try:
+            os.makedirs(self.sessions_dir, mode=0o700, exist_ok=True)
+            # Write then rename, so a crash never leaves a truncated record;
+            # records hold API keys, hence owner-only permissions
+            tmp_path = self._path(client_id) + ".tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._path(client_id))
+        except OSError as e:
+            self.logger.error(f"Could not record session for client {client_id}: {e}")
+
+    def remove(self, client_id: str):
+        """Forget a bot that was stopped on purpose, and expire old bot logs."""
+        try:
+            os.remove(self._path(client_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.error(f"Could not remove session for client {client_id}: {e}")
+        if BOT_LOG_RETENTION_S > 0:
+            self.prune_logs()
+            return
+        for path in (self.log_path(client_id), self.log_path(client_id) + ".1"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"Could not delete bot log {path}: {e}")
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return every recorded session, skipping unreadable records."""
+        try:
+            names = os.listdir(self.sessions_dir)
+        except FileNotFoundError:
+            return []
+        records = []
+        for name in sorted(names):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.sessions_dir, name), "r") as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Skipping unreadable session record {name}: {e}")
+        return records
+
+
+# Create a singleton instance
+session_store = SessionStore()
@@ -0,0 +1,88 @@
+"""Single-flight coalescing of identical provider calls.
+
+While a call is in flight, callers asking for the same key wait for its
+result instead of making their own, so a burst of joins with the same new
+persona runs one extraction, one voice match and one avatar generation.
+Nothing is kept once the call finishes; the caches behind each call do that.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from core.metrics import metrics
+
+T = TypeVar("T")
+
+# Every group, for /health
+GROUPS: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """In-flight calls of one kind, keyed by their inputs."""
+
+    def __init__(self, name: str, listed: bool = True):
+        self.name = name
+        self.leaders = 0
+        self.shared = 0
+        # key -> (task running the call, callers still waiting for it)
+        self._calls: Dict[Hashable, List[Any]] = {}
+        # Short-lived groups (one per join batch) stay off /health
+        if listed:
+            GROUPS.append(self)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call``, or wait for the identical call already in flight.
+
+        Every caller gets the same result object, or the same error. A caller
+        that is cancelled stops waiting without cancelling the call for the
+        others; the call itself is cancelled once nobody waits for it.
+
+        Args:
+            key: Hashable identity of the call's inputs
+            call: Coroutine function making the call
+        """
+        entry = self._calls.get(key)
+        if entry is None:
+            task = asyncio.create_task(call())
+            entry = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+            self.leaders += 1
+            metrics.increment("singleflight_calls_total", group=self.name, result="led")
+        else:
+            self.shared += 1
+            metrics.increment(
+                "singleflight_calls_total", group=self.name, result="shared"
+            )
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not task.done():
+                # Callers arriving before the task unwinds start a new call
+                del self._calls[key]
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key, [None])[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved here too, for calls whose callers all gave up
+            task.exception()
+
+    def status(self) -> Dict[str, int]:
+        """Return call counts and the calls in flight for /health."""
+        return {
+            "led": self.leaders,
+            "shared": self.shared,
+            "in_flight": len(self._calls),
+        }
+
+
+def singleflight_status() -> Dict[str, Dict[str, int]]:
+    """Return the counts of every single-flight group, keyed by name."""
+    return {group.name: group.status() for group in GROUPS}
@@ -0,0 +1,382 @@
+"""Supervision of Pipecat bot processes: liveness, resource usage and restarts."""
+
+import asyncio
+import os
+import subprocess
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from core.connection import MEETING_DETAILS, PIPECAT_PROCESSES, registry
+from core.metrics import metrics
+from core.placement import placer
+from core.process import start_pipecat_process, terminate_process_gracefully
+from core.router import router as message_router
+from core.sessions import (
+    BOT_ADOPTION,
+    ORPHAN_GRACE_S,
+    AdoptedProcess,
+    process_start_time,
+    session_store,
+)
+from meetingbaas_pipecat.utils.logger import logger
+from scripts.meetingbaas_api import leave_meeting_bot
+
+# How often the supervisor polls its children
+SUPERVISOR_INTERVAL_S = float(os.getenv("BOT_SUPERVISOR_INTERVAL_S", "2.0"))
+# Restart budget: at most BOT_MAX_RESTARTS crashes per BOT_RESTART_WINDOW_S
+BOT_MAX_RESTARTS = int(os.getenv("BOT_MAX_RESTARTS", "3"))
+BOT_RESTART_WINDOW_S = float(os.getenv("BOT_RESTART_WINDOW_S", "300"))
+# Recycling thresholds (0 disables each of them)
+BOT_MAX_RSS_MB = int(os.getenv("BOT_MAX_RSS_MB", "0"))
+BOT_MAX_AGE_S = float(os.getenv("BOT_MAX_AGE_S", "0"))
+# A bot is at a safe point once it has not spoken for this long
+BOT_RECYCLE_IDLE_S = float(os.getenv("BOT_RECYCLE_IDLE_S", "5.0"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_proc_stats(pid: int) -> Optional[tuple[int, int]]:
+    """
+    Read resident memory and consumed CPU time of a process from /proc.
+
+    Args:
+        pid: Process ID to inspect
+
+    Returns:
+        A ``(rss_bytes, cpu_ticks)`` tuple, or None if /proc is unavailable
+        or the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            rss_pages = int(f.read().split()[1])
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # The command name may contain spaces, so split after its ")"
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of stat(5), i.e. 11 and 12 here
+        cpu_ticks = int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return None
+    return rss_pages * _PAGE_SIZE, cpu_ticks
+
+
+@dataclass
+class SupervisedBot:
+    """Book-keeping for one supervised bot process."""
+
+    client_id: str
+    spawn_kwargs: Dict[str, Any]
+    started_at: float = field(default_factory=time.monotonic)
+    crashes: Deque[float] = field(default_factory=deque)
+    restarts: int = 0
+    rss_bytes: int = 0
+    cpu_percent: float = 0.0
+    last_cpu_ticks: Optional[int] = None
+    last_sample_at: Optional[float] = None
+    # Set while an adopted bot has not reconnected to this server yet
+    adopted_at: Optional[float] = None
+    # Rungs of the degradation ladder in force (see core/degradation.py)
+    degradation_level: int = 0
+
+    def to_dict(self, process: Optional[subprocess.Popen]) -> Dict[str, Any]:
+        """Return a JSON-serializable status view."""
+        return {
+            "client_id": self.client_id,
+            "pid": process.pid if process else None,
+            "alive": bool(process and process.poll() is None),
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "restarts": self.restarts,
+            "rss_mb": round(self.rss_bytes / (1024 * 1024), 1),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "awaiting_reconnect": self.adopted_at is not None,
+            "degradation_level": self.degradation_level,
+            "cpu_affinity": placer.assignments.get(self.client_id),
+        }
+
+
+class ProcessSupervisor:
+    """Watches bot processes, restarts crashed ones and recycles old ones."""
+
+    def __init__(
+        self,
+        processes: Dict[str, subprocess.Popen] = PIPECAT_PROCESSES,
+        interval: float = SUPERVISOR_INTERVAL_S,
+        logger=logger,
+    ):
+        self.processes = processes
+        self.interval = interval
+        self.logger = logger
+        self.bots: Dict[str, SupervisedBot] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, client_id: str, spawn_kwargs: Dict[str, Any]) -> SupervisedBot:
+        """Start supervising a bot that was spawned with ``spawn_kwargs``."""
+        bot = SupervisedBot(client_id, dict(spawn_kwargs))
+        self.bots[client_id] = bot
+        metrics.increment("bot_spawns_total")
+        self.logger.debug(f"Supervising bot process for client {client_id}")
+        return bot
+
+    def unregister(self, client_id: str):
+        """Stop supervising a bot that is being removed on purpose."""
+        if self.bots.pop(client_id, None):
+            self.logger.debug(f"Stopped supervising client {client_id}")
+        message_router.last_output_at.pop(client_id, None)
+        placer.release(client_id)
+        session_store.remove(client_id)
+
+    async def remove(self, client_id: str, leave_meeting: bool = True):
+        """
+        Stop a bot outside of a request: make it leave and end its process.
+
+        Args:
+            client_id: Bot to remove
+            leave_meeting: Also ask MeetingBaas to take the bot out of the meeting
+        """
+        bot = self.bots.get(client_id)
+        self.unregister(client_id)
+        if leave_meeting and bot is not None:
+            bot_id = bot.spawn_kwargs.get("meetingbaas_bot_id")
+            api_key = bot.spawn_kwargs.get("api_key")
+            if bot_id and api_key:
+                await leave_meeting_bot(bot_id, api_key)
+        process = self.processes.pop(client_id, None)
+        if process is not None and process.poll() is None:
+            await asyncio.to_thread(terminate_process_gracefully, process, 3.0)
+        MEETING_DETAILS.pop(client_id, None)
+
+    async def adopt_sessions(self):
+        """
+        Take over the bots recorded by an earlier server process.
+
+        Live bots are re-adopted (or killed if adoption is disabled) and the
+        records of bots that are gone are dropped. Bots that do not reconnect
+        within ``ORPHAN_GRACE_S`` are removed by :meth:`check_once`.
+        """
+        adopted = killed = 0
+        for record in session_store.load():
+            client_id = record.get("client_id")
+            pid = record.get("pid")
+            start_time = record.get("start_time")
+            if not client_id or not pid or client_id in self.processes:
+                continue
+
+            server_pid = record.get("server_pid")
+            if server_pid not in (None, os.getpid()) and process_start_time(server_pid):
+                # Owned by another server that is still running
+                continue
+
+            if start_time is None or process_start_time(pid) != start_time:
+                session_store.remove(client_id)
+                continue
+
+            process = AdoptedProcess(pid, start_time)
+            if not BOT_ADOPTION:
+                await asyncio.to_thread(terminate_process_gracefully, process, 3.0)
+                session_store.remove(client_id)
+                metrics.increment(
+                    "bot_orphans_killed_total", reason="adoption_disabled"
+                )
+                killed += 1
+                continue
+
+            spawn_kwargs = record.get("spawn_kwargs") or {}
+            self.processes[client_id] = process
+            MEETING_DETAILS[client_id] = (
+                spawn_kwargs.get("meeting_url"),
+                (spawn_kwargs.get("persona_data") or {}).get("name"),
+                spawn_kwargs.get("meetingbaas_bot_id") or None,
+                spawn_kwargs.get("enable_tools", False),
+                spawn_kwargs.get("streaming_audio_frequency", "16khz"),
+            )
+            bot = SupervisedBot(client_id, dict(spawn_kwargs))
+            bot.adopted_at = time.monotonic()
+            self.bots[client_id] = bot
+            placer.adopt(client_id, pid)
+            metrics.increment("bot_adoptions_total")
+            adopted += 1
+
+        # Logs of bots that ended while no server was running
+        session_store.prune_logs()
+        if adopted or killed:
+            self.logger.info(
+                f"Re-adopted {adopted} bot(s) from an earlier server, "
+                f"killed {killed} orphan(s)"
+            )
+
+    async def start(self):
+        """Start the background polling task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self.logger.info(f"Process supervisor started (interval {self.interval}s)")
+
+    async def stop(self):
+        """Stop the background polling task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check_once()
+            except Exception as e:
+                self.logger.error(f"Process supervisor check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def check_once(self):
+        """Poll every supervised bot once."""
+        for client_id, bot in list(self.bots.items()):
+            process = self.processes.get(client_id)
+            if process is None:
+                # Removed through /bots/{id} or the client WebSocket closing
+                self.unregister(client_id)
+                continue
+
+            exit_code = process.poll()
+            if exit_code is not None:
+                await self._handle_exit(bot, exit_code)
+                continue
+
+            if bot.adopted_at is not None and await self._check_adopted(bot):
+                continue
+
+            self._sample(bot, process.pid)
+            if session_store.log_oversized(client_id):
+                await asyncio.to_thread(session_store.rotate_log, client_id)
+            reason = self._recycle_reason(bot)
+            if reason:
+                await self._recycle(bot, process, reason)
+
+        metrics.set_gauge("bots_supervised", len(self.bots))
+
+    async def _check_adopted(self, bot: SupervisedBot) -> bool:
+        """Clear or reap an adopted bot; returns True if it was removed."""
+        client_id = bot.client_id
+        if (
+            client_id in registry.pipecat_connections
+            and client_id in registry.active_connections
+        ):
+            # Both the bot and MeetingBaas are talking to this server again
+            bot.adopted_at = None
+            self.logger.info(f"Adopted bot for client {client_id} reconnected")
+            return False
+        if time.monotonic() - bot.adopted_at < ORPHAN_GRACE_S:
+            return False
+
+        self.logger.warning(
+            f"Adopted bot for client {client_id} did not reconnect within "
+            f"{ORPHAN_GRACE_S:.0f}s, killing it as an orphan"
+        )
+        metrics.increment("bot_orphans_killed_total", reason="not_reconnected")
+        await self.remove(client_id)
+        return True
+
+    def _sample(self, bot: SupervisedBot, pid: int):
+        stats = read_proc_stats(pid)
+        if stats is None:
+            return
+        rss_bytes, cpu_ticks = stats
+        now = time.monotonic()
+        if bot.last_cpu_ticks is not None and bot.last_sample_at is not None:
+            elapsed = now - bot.last_sample_at
+            if elapsed > 0:
+                used = (cpu_ticks - bot.last_cpu_ticks) / _CLOCK_TICKS
+                bot.cpu_percent = 100.0 * used / elapsed
+        bot.rss_bytes = rss_bytes
+        bot.last_cpu_ticks = cpu_ticks
+        bot.last_sample_at = now
+
+    def _recycle_reason(self, bot: SupervisedBot) -> Optional[str]:
+        if BOT_MAX_RSS_MB and bot.rss_bytes > BOT_MAX_RSS_MB * 1024 * 1024:
+            reason = "rss"
+        elif BOT_MAX_AGE_S and time.monotonic() - bot.started_at > BOT_MAX_AGE_S:
+            reason = "age"
+        else:
+            return None
+
+        # Only recycle while the bot is quiet so nobody hears it cut off
+        last_output = message_router.last_output_at.get(bot.client_id, 0.0)
+        if time.monotonic() - last_output < BOT_RECYCLE_IDLE_S:
+            return None
+        return reason
+
+    async def _handle_exit(self, bot: SupervisedBot, exit_code: int):
+        client_id = bot.client_id
+        if exit_code == 0:
+            self.logger.info(f"Bot process for client {client_id} exited cleanly")
+            self.processes.pop(client_id, None)
+            self.unregister(client_id)
+            return
+
+        metrics.increment("bot_crashes_total")
+        self.logger.warning(
+            f"Bot process for client {client_id} crashed with exit code "
+            f"{exit_code}, see {session_store.log_path(client_id)}"
+        )
+
+        now = time.monotonic()
+        bot.crashes.append(now)
+        while bot.crashes and now - bot.crashes[0] > BOT_RESTART_WINDOW_S:
+            bot.crashes.popleft()
+
+        if len(bot.crashes) > BOT_MAX_RESTARTS:
+            metrics.increment("bot_restart_budget_exhausted_total")
+            self.logger.error(
+                f"Restart budget exhausted for client {client_id} "
+                f"({BOT_MAX_RESTARTS} per {BOT_RESTART_WINDOW_S:.0f}s), giving up"
+            )
+            self.processes.pop(client_id, None)
+            self.unregister(client_id)
+            return
+
+        self._respawn(bot)
+        metrics.increment("bot_restarts_total")
+
+    async def _recycle(
+        self, bot: SupervisedBot, process: subprocess.Popen, reason: str
+    ):
+        self.logger.info(
+            f"Recycling bot process for client {bot.client_id} (reason: {reason})"
+        )
+        # Keep the relay open for the replacement while the old process exits
+        await asyncio.to_thread(terminate_process_gracefully, process, 3.0)
+        if self.bots.get(bot.client_id) is not bot:
+            # The bot was removed while its process was shutting down
+            return
+        self._respawn(bot)
+        metrics.increment("bot_recycles_total", reason=reason)
+
+    def _respawn(self, bot: SupervisedBot):
+        """Start a replacement process into the same relay session."""
+        process = start_pipecat_process(**bot.spawn_kwargs)
+        self.processes[bot.client_id] = process
+        bot.started_at = time.monotonic()
+        bot.restarts += 1
+        bot.last_cpu_ticks = None
+        bot.last_sample_at = None
+        # A fresh process starts undegraded
+        bot.degradation_level = 0
+        self.logger.info(
+            f"Respawned bot process for client {bot.client_id} with PID {process.pid}"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Return per-bot status and core placement for /processes."""
+        return {
+            "bots": {
+                client_id: bot.to_dict(self.processes.get(client_id))
+                for client_id, bot in self.bots.items()
+            },
+            "placement": placer.status(),
+        }
+
+
+# Create a singleton instance
+supervisor = ProcessSupervisor()
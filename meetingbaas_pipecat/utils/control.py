@@ -0,0 +1,113 @@
+"""Bot side of the control channel to the API server (see core/control.py)."""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+from loguru import logger
+
+# Messages kept while the control connection is down
+MAX_QUEUED_MESSAGES = 256
+
+ControlCallback = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def control_url_for(websocket_url: str) -> str:
+    """Derive the control URL from the bot's ``/pipecat/{client_id}`` URL."""
+    return websocket_url.replace("/pipecat/", "/control/", 1)
+
+
+class ControlClient:
+    """Keeps a reconnecting control connection and queues outgoing messages."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.handlers: Dict[str, ControlCallback] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self._task: Optional[asyncio.Task] = None
+        self._deployment = os.getenv("DEPLOYMENT_ID") or os.getenv("FLY_IMAGE_REF")
+
+    def on(self, message_type: str, handler: ControlCallback):
+        """Register a handler; if it returns a dict, that dict is sent as the reply."""
+        self.handlers[message_type] = handler
+
+    def send(self, message: Dict[str, Any]):
+        """Queue a message; the oldest one is dropped if the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    def mark_phase(self, phase: str, timestamp: Optional[float] = None):
+        """Report a startup phase reached at ``timestamp`` (monotonic)."""
+        self.send(
+            {
+                "type": "phase",
+                "phase": phase,
+                "t": time.monotonic() if timestamp is None else timestamp,
+                "deployment": self._deployment,
+            }
+        )
+
+    def start(self):
+        """Start connecting in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        backoff = 0.5
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=20) as ws:
+                        backoff = 0.5
+                        sender = asyncio.create_task(self._send_loop(ws))
+                        try:
+                            await self._receive_loop(ws)
+                        finally:
+                            sender.cancel()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Control channel to {self.url} unavailable: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+    async def _send_loop(self, ws: aiohttp.ClientWebSocketResponse):
+        while True:
+            message = await self._queue.get()
+            try:
+                await ws.send_json(message)
+            except Exception:
+                # Put it back for the next connection
+                self.send(message)
+                raise
+
+    async def _receive_loop(self, ws: aiohttp.ClientWebSocketResponse):
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            message = msg.json()
+            handler = self.handlers.get(message.get("type"))
+            if handler is None:
+                continue
+            try:
+                reply = await handler(message)
+            except Exception as e:
+                logger.error(f"Control handler {message.get('type')!r} failed: {e}")
+                reply = {"error": str(e)}
+            if "id" in message:
+                await ws.send_json(
+                    {**(reply or {}), "type": "reply", "id": message["id"]}
+                )
@@ -0,0 +1,80 @@
+"""Bot side of the degradation ladder driven by the API server (core/degradation.py)."""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+from openai._types import NOT_GIVEN
+from pipecat.adapters.schemas.tools_schema import ToolsSchema
+from pipecat.audio.vad.vad_analyzer import VADParams
+from pipecat.frames.frames import LLMUpdateSettingsFrame, VADParamsUpdateFrame
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+# Model used once the "smaller_llm" step is on
+DEGRADED_LLM_MODEL = os.getenv("DEGRADED_LLM_MODEL", "gpt-4.1-nano")
+# Stricter VAD once "silence_gating" is on, so noise and murmurs never reach STT
+GATED_VAD_PARAMS = VADParams(
+    confidence=float(os.getenv("GATED_VAD_CONFIDENCE", "0.85")),
+    start_secs=0.3,
+    stop_secs=0.8,
+    min_volume=float(os.getenv("GATED_VAD_MIN_VOLUME", "0.75")),
+)
+
+
+class BotDegradation:
+    """Applies and reverts degradation steps on a running pipeline."""
+
+    def __init__(
+        self,
+        task: PipelineTask,
+        context: OpenAILLMContext,
+        llm_model: str,
+        vad_params: VADParams,
+        tools: Optional[ToolsSchema] = None,
+    ):
+        self.task = task
+        self.context = context
+        self.llm_model = llm_model
+        self.vad_params = vad_params
+        self.tools = tools or NOT_GIVEN
+        self.active: List[str] = []
+
+    async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Control channel handler for ``{"type": "degrade", "steps": [...]}``."""
+        await self.apply(message.get("steps") or [])
+        return {"steps": self.active}
+
+    async def apply(self, steps: Iterable[str]):
+        """Turn on exactly ``steps``, reverting any other step that is on."""
+        wanted = list(steps)
+        for step in wanted:
+            if step not in self.active:
+                await self._set(step, True)
+        for step in list(self.active):
+            if step not in wanted:
+                await self._set(step, False)
+
+    async def _set(self, step: str, on: bool):
+        if step == "smaller_llm":
+            if DEGRADED_LLM_MODEL == self.llm_model:
+                # The server skips this rung then; nothing to switch anyway
+                logger.debug(f"Already running {DEGRADED_LLM_MODEL}")
+            else:
+                model = DEGRADED_LLM_MODEL if on else self.llm_model
+                await self.task.queue_frame(
+                    LLMUpdateSettingsFrame(settings={"model": model})
+                )
+        elif step == "disable_tools":
+            self.context.set_tools(NOT_GIVEN if on else self.tools)
+        elif step == "silence_gating":
+            params = GATED_VAD_PARAMS if on else self.vad_params
+            await self.task.queue_frame(VADParamsUpdateFrame(params=params))
+        else:
+            logger.warning(f"Unknown degradation step {step!r}")
+            return
+        logger.info(f"Degradation step {step} {'on' if on else 'off'}")
+        if on:
+            self.active.append(step)
+        else:
+            self.active.remove(step)
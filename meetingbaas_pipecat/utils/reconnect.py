@@ -0,0 +1,55 @@
+"""Reconnect a bot's relay websocket when the API server restarts."""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from loguru import logger
+from pipecat.transports.network.websocket_client import WebsocketClientTransport
+
+
+def keep_connected(
+    transport: WebsocketClientTransport,
+    timeout: float,
+    on_give_up: Callable[[], Awaitable[None]],
+):
+    """
+    Reconnect ``transport`` in place after the server drops the connection.
+
+    The pipeline, and with it the conversation context, keeps running while
+    the server restarts; audio sent in the meantime is dropped.
+
+    Args:
+        transport: Transport connected to the server's ``/pipecat`` endpoint
+        timeout: Seconds to keep retrying before giving up
+        on_give_up: Called once the server has not come back in time
+    """
+    # Pipecat 0.0.69 has no reconnect support, so reset the shared session
+    # that both the input and output transports send through
+    session = transport._session
+    reconnecting = False
+
+    @transport.event_handler("on_disconnected")
+    async def on_disconnected(transport, websocket):
+        nonlocal reconnecting
+        if reconnecting:
+            return
+        reconnecting = True
+        try:
+            deadline = time.monotonic() + timeout
+            backoff = 0.5
+            while time.monotonic() < deadline:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+                session._websocket = None
+                try:
+                    await session.connect()
+                except Exception as e:
+                    logger.debug(f"Relay reconnect failed: {e}")
+                if session._websocket is not None:
+                    logger.info("Reconnected to the relay")
+                    return
+            logger.error(f"Relay did not come back within {timeout:.0f}s")
+            await on_give_up()
+        finally:
+            reconnecting = False
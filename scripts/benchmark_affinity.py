@@ -0,0 +1,120 @@
+"""Benchmark step jitter of many concurrent bots with and without CPU pinning.
+
+Each simulated bot runs a 32 ms audio loop (the Silero VAD window at 16 kHz)
+with a few worker threads doing fixed CPU work per step, similar to the
+torch/ONNX threads of a real bot. The benchmark reports how late steps finish
+relative to their deadline, first with every bot floating across all cores
+and then with bots placed by ``core.placement.CorePlacer``.
+
+Usage:
+    python scripts/benchmark_affinity.py --bots 20 --duration 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.metrics import percentile  # noqa: E402
+from core.placement import CorePlacer, affinity_supported  # noqa: E402
+
+STEP_S = 0.032
+
+
+def _burn(work_s: float):
+    deadline = time.perf_counter() + work_s
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _bot(
+    cores: Optional[List[int]],
+    duration: float,
+    work_ms: float,
+    threads: int,
+    results: multiprocessing.Queue,
+):
+    if cores:
+        os.sched_setaffinity(0, cores)
+
+    lateness = []
+    next_deadline = time.perf_counter() + STEP_S
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        workers = [
+            threading.Thread(target=_burn, args=(work_ms / 1000 / threads,))
+            for _ in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        finished = time.perf_counter()
+        lateness.append(max(0.0, finished - next_deadline))
+        if finished < next_deadline:
+            time.sleep(next_deadline - finished)
+            next_deadline += STEP_S
+        else:
+            # Skip the missed windows instead of piling them up
+            next_deadline = finished + STEP_S
+    results.put(lateness)
+
+
+def run(bots: int, duration: float, work_ms: float, threads: int, pinned: bool):
+    """Run one round and return all step lateness samples in milliseconds."""
+    placer = CorePlacer(enabled=pinned, reserve_relay_core=False)
+    results = multiprocessing.Queue()
+    processes = []
+    for index in range(bots):
+        cores = placer.place(f"bench-{index}") if pinned else None
+        process = multiprocessing.Process(
+            target=_bot, args=(cores, duration, work_ms, threads, results)
+        )
+        process.start()
+        processes.append(process)
+
+    samples = []
+    for _ in processes:
+        samples.extend(value * 1000 for value in results.get())
+    for process in processes:
+        process.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bots", type=int, default=20, help="Concurrent bots")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument(
+        "--work-ms", type=float, default=2.0, help="CPU work per 32 ms step"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=os.cpu_count() or 1, help="Threads per bot"
+    )
+    args = parser.parse_args()
+
+    if not affinity_supported():
+        print("sched_setaffinity is not available on this platform")
+        return
+
+    print(
+        f"{args.bots} bots x {args.threads} threads, {args.work_ms} ms work per "
+        f"{STEP_S * 1000:.0f} ms step, {len(os.sched_getaffinity(0))} cores"
+    )
+    for label, pinned in (("floating", False), ("pinned", True)):
+        samples = run(args.bots, args.duration, args.work_ms, args.threads, pinned)
+        late = sum(1 for value in samples if value > 0)
+        print(
+            f"{label:>9}: steps={len(samples)} late={100 * late / len(samples):.1f}% "
+            f"p50={percentile(samples, 0.5):.2f}ms "
+            f"p99={percentile(samples, 0.99):.2f}ms max={max(samples):.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
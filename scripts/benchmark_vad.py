@@ -0,0 +1,101 @@
+"""Measure Silero VAD step time of many concurrent bots under a thread budget.
+
+Each simulated bot loads ``SileroVADAnalyzer`` like scripts/meetingbaas.py
+does and analyzes one 32 ms window of audio every 32 ms, alongside a small
+BLAS matrix product standing in for the rest of the bot's native work. The
+benchmark runs once with the libraries' default thread pools (one thread per
+core) and once with the per-bot budget that ``core.process`` puts in the
+spawn environment, and reports the VAD step time of each round.
+
+Usage:
+    python scripts/benchmark_vad.py --bots 20 --duration 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+STEP_S = 0.032
+
+
+def _bot(env: Dict[str, str], duration: float, results: multiprocessing.Queue):
+    # Must happen before numpy/onnxruntime are imported in this process
+    os.environ.update(env)
+
+    import numpy as np
+    from pipecat.audio.vad.silero import SileroVADAnalyzer
+
+    vad = SileroVADAnalyzer(sample_rate=16000)
+    # Normally done by the input transport when the pipeline starts
+    vad.set_sample_rate(16000)
+    rng = np.random.default_rng()
+    window = (rng.standard_normal(vad.num_frames_required()) * 3000).astype(np.int16)
+    buffer = window.tobytes()
+    matrix = rng.standard_normal((192, 192))
+
+    step_times = []
+    next_deadline = time.perf_counter() + STEP_S
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        matrix @ matrix
+        started = time.perf_counter()
+        vad.voice_confidence(buffer)
+        step_times.append(time.perf_counter() - started)
+        now = time.perf_counter()
+        if now < next_deadline:
+            time.sleep(next_deadline - now)
+            next_deadline += STEP_S
+        else:
+            next_deadline = now + STEP_S
+    results.put(step_times)
+
+
+def run(bots: int, duration: float, env: Dict[str, str]) -> List[float]:
+    """Run one round and return every VAD step time in milliseconds."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_bot, args=(env, duration, results)) for _ in range(bots)
+    ]
+    for process in processes:
+        process.start()
+    samples = []
+    for _ in processes:
+        samples.extend(value * 1000 for value in results.get())
+    for process in processes:
+        process.join()
+    return samples
+
+
+def main():
+    from core.metrics import percentile
+    from core.process import thread_budget, thread_budget_env
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bots", type=int, default=20, help="Concurrent bots")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    args = parser.parse_args()
+
+    budget = thread_budget()
+    print(f"{args.bots} bots on {os.cpu_count()} cores, budget {budget} thread(s)")
+    rounds = (
+        ("default pools", {}),
+        (f"budget={budget}", thread_budget_env(budget)),
+    )
+    for label, env in rounds:
+        samples = run(args.bots, args.duration, env)
+        print(
+            f"{label:>14}: steps={len(samples)} "
+            f"p50={percentile(samples, 0.5):.2f}ms "
+            f"p90={percentile(samples, 0.9):.2f}ms "
+            f"p99={percentile(samples, 0.99):.2f}ms max={max(samples):.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Local stand-in for the MeetingBaas bots API, for tests and load runs.
+
+Serves ``POST /bots`` and ``DELETE /bots/{bot_id}`` like MeetingBaas does,
+without joining any meeting. Latency, errors and hangs can be injected to
+exercise the client's timeouts and retries.
+
+Usage:
+    python scripts/fake_meetingbaas.py --port 7777 --latency-ms 200 --error-rate 0.1
+    MEETINGBAAS_API_URL=http://localhost:7777 python run.py
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+
+from aiohttp import web
+
+
+class FakeMeetingBaas:
+    """In-memory bots API with injectable latency and failures."""
+
+    def __init__(
+        self, latency_ms: float = 0.0, error_rate: float = 0.0, hang_rate: float = 0.0
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.bots = {}
+        self.requests = 0
+
+    async def _misbehave(self, request: web.Request):
+        self.requests += 1
+        if not request.headers.get("x-meeting-baas-api-key"):
+            raise web.HTTPUnauthorized(text="Missing x-meeting-baas-api-key")
+        if random.random() < self.hang_rate:
+            # Never answer, like an overloaded upstream
+            await asyncio.Event().wait()
+        if self.latency_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency_ms / 1000)
+        if random.random() < self.error_rate:
+            raise web.HTTPServiceUnavailable(text="Injected failure")
+
+    async def create_bot(self, request: web.Request) -> web.Response:
+        await self._misbehave(request)
+        config = await request.json()
+        if "meeting_url" not in config or "bot_name" not in config:
+            raise web.HTTPBadRequest(text="meeting_url and bot_name are required")
+        # MeetingBaas answers a repeated deduplication key with the same bot
+        key = config.get("deduplication_key")
+        for bot_id, bot in self.bots.items():
+            if key and bot.get("deduplication_key") == key:
+                return web.json_response({"bot_id": bot_id})
+        bot_id = str(uuid.uuid4())
+        self.bots[bot_id] = config
+        return web.json_response({"bot_id": bot_id})
+
+    async def leave_bot(self, request: web.Request) -> web.Response:
+        await self._misbehave(request)
+        bot_id = request.match_info["bot_id"]
+        if self.bots.pop(bot_id, None) is None:
+            raise web.HTTPNotFound(text=f"No bot {bot_id}")
+        return web.json_response({"ok": True})
+
+    def app(self) -> web.Application:
+        """Build the aiohttp application serving the fake API."""
+        app = web.Application()
+        app.router.add_post("/bots", self.create_bot)
+        app.router.add_delete("/bots/{bot_id}", self.leave_bot)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=7777, help="Port to listen on")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Mean added response latency"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests given a 503"
+    )
+    parser.add_argument(
+        "--hang-rate", type=float, default=0.0, help="Share of requests never answered"
+    )
+    args = parser.parse_args()
+
+    fake = FakeMeetingBaas(args.latency_ms, args.error_rate, args.hang_rate)
+    web.run_app(fake.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
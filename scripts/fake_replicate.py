@@ -0,0 +1,134 @@
+"""Local stand-in for the Replicate predictions API, for tests and load runs.
+
+Serves ``POST /v1/predictions``, ``GET /v1/predictions/{id}`` and
+``POST /v1/predictions/{id}/cancel`` like Replicate does. Predictions succeed
+after a configurable run time with the URL of a small PNG served by the fake
+itself; failures and never-ending runs can be injected.
+
+Usage:
+    python scripts/fake_replicate.py --port 7778 --run-ms 3000 --fail-rate 0.1
+    REPLICATE_API_URL=http://localhost:7778 python run.py
+"""
+
+import argparse
+import base64
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+# 1x1 transparent PNG returned as every generated image
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA"
+    "60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class FakeReplicate:
+    """In-memory predictions API with injectable run time and failures."""
+
+    def __init__(
+        self, run_ms: float = 1000.0, fail_rate: float = 0.0, stuck_rate: float = 0.0
+    ):
+        self.run_ms = run_ms
+        self.fail_rate = fail_rate
+        self.stuck_rate = stuck_rate
+        self.predictions = {}
+        self.polls = 0
+        self.cancels = 0
+
+    def _check_auth(self, request: web.Request):
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            raise web.HTTPUnauthorized(text="Missing bearer token")
+
+    def _view(self, request: web.Request, prediction: dict) -> dict:
+        # Settle the outcome once the run time has passed
+        if prediction["status"] == "processing" and not prediction["stuck"]:
+            if time.monotonic() >= prediction["done_at"]:
+                if prediction["fail"]:
+                    prediction["status"] = "failed"
+                    prediction["error"] = "Injected failure"
+                else:
+                    prediction["status"] = "succeeded"
+                    prediction["output"] = [f"{request.url.origin()}/images/out.png"]
+        return {
+            key: prediction[key]
+            for key in ("id", "version", "input", "status", "output", "error")
+        }
+
+    async def create_prediction(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        body = await request.json()
+        if "version" not in body or "input" not in body:
+            raise web.HTTPUnprocessableEntity(text="version and input are required")
+        prediction = {
+            "id": uuid.uuid4().hex,
+            "version": body["version"],
+            "input": body["input"],
+            "status": "processing",
+            "output": None,
+            "error": None,
+            "done_at": time.monotonic() + random.uniform(0.5, 1.5) * self.run_ms / 1000,
+            "fail": random.random() < self.fail_rate,
+            "stuck": random.random() < self.stuck_rate,
+        }
+        self.predictions[prediction["id"]] = prediction
+        return web.json_response(self._view(request, prediction), status=201)
+
+    def _prediction(self, request: web.Request) -> dict:
+        self._check_auth(request)
+        prediction = self.predictions.get(request.match_info["prediction_id"])
+        if prediction is None:
+            raise web.HTTPNotFound(text="Prediction not found")
+        return prediction
+
+    async def get_prediction(self, request: web.Request) -> web.Response:
+        self.polls += 1
+        return web.json_response(self._view(request, self._prediction(request)))
+
+    async def cancel_prediction(self, request: web.Request) -> web.Response:
+        prediction = self._prediction(request)
+        self.cancels += 1
+        if self._view(request, prediction)["status"] == "processing":
+            prediction["status"] = "canceled"
+        return web.json_response(self._view(request, prediction))
+
+    async def image(self, request: web.Request) -> web.Response:
+        return web.Response(body=PNG, content_type="image/png")
+
+    def app(self) -> web.Application:
+        """Build the aiohttp application serving the fake API."""
+        app = web.Application()
+        app.router.add_post("/v1/predictions", self.create_prediction)
+        app.router.add_get("/v1/predictions/{prediction_id}", self.get_prediction)
+        app.router.add_post(
+            "/v1/predictions/{prediction_id}/cancel", self.cancel_prediction
+        )
+        app.router.add_get("/images/out.png", self.image)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=7778, help="Port to listen on")
+    parser.add_argument(
+        "--run-ms", type=float, default=1000.0, help="Mean prediction run time"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="Share of predictions that fail"
+    )
+    parser.add_argument(
+        "--stuck-rate",
+        type=float,
+        default=0.0,
+        help="Share of predictions that never finish",
+    )
+    args = parser.parse_args()
+
+    fake = FakeReplicate(args.run_ms, args.fail_rate, args.stuck_rate)
+    web.run_app(fake.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
+import time
+
+# Taken before the heavy imports below for the startup phase profile; the
+# imports after it are exempt from E402 in pyproject.toml
+INTERPRETER_START = time.monotonic()
+
 import argparse
 import asyncio
+import json
 import os
 import os
 from datetime import datetime
+from typing import Any, Dict, Optional
 
 import aiohttp
 import pytz
@@ -10,11 +18,19 @@ from dotenv import load_dotenv
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
 from pipecat.audio.vad.silero import SileroVADAnalyzer, VADParams
-from pipecat.frames.frames import LLMMessagesFrame, TextFrame
+from pipecat.frames.frames import (
+    Frame,
+    LLMMessagesFrame,
+    LLMTextFrame,
+    TextFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+)
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.serializers.protobuf import ProtobufFrameSerializer
 from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
@@ -26,9 +42,11 @@ from pipecat.transports.network.websocket_client import (
     WebsocketClientTransport,
 )
 
-from config.persona_utils import PersonaManager
 from config.prompts import DEFAULT_SYSTEM_PROMPT
+from meetingbaas_pipecat.utils.control import ControlClient, control_url_for
+from meetingbaas_pipecat.utils.degradation import BotDegradation
 from meetingbaas_pipecat.utils.logger import configure_logger
+from meetingbaas_pipecat.utils.reconnect import keep_connected
 import sys
 import logging
 
@@ -39,6 +57,9 @@ from pipecat.pipeline.runner import PipelineRunner as OriginalPipelineRunner
 import signal
 import platform
 
+IMPORTS_DONE = time.monotonic()
+
+
 class WindowsSafePipelineRunner(OriginalPipelineRunner):
     def _setup_sigint(self):
         # Only set up signal handling on non-Windows
@@ -64,6 +85,43 @@ def log_and_flush(level, msg):
     for h in logger.handlers:
         h.flush()
 
+class PhaseMarker(FrameProcessor):
+    """Reports the first frame of a given type as a startup phase."""
+
+    def __init__(self, control: ControlClient, phase: str, frame_type: type):
+        super().__init__()
+        self._control = control
+        self._phase = phase
+        self._frame_type = frame_type
+        self._seen = False
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if not self._seen and isinstance(frame, self._frame_type):
+            self._seen = True
+            self._control.mark_phase(self._phase)
+        await self.push_frame(frame, direction)
+
+
+def apply_thread_budget():
+    """Size torch's thread pools to the budget chosen by the API server.
+
+    OMP/MKL/BLAS pools are already sized through the spawn environment and
+    Silero runs single-threaded ONNX sessions, so only torch needs a call.
+    """
+    budget = int(os.getenv("BOT_THREAD_BUDGET", "0"))
+    torch = sys.modules.get("torch")
+    if budget <= 0 or torch is None:
+        return
+    torch.set_num_threads(budget)
+    try:
+        torch.set_num_interop_threads(budget)
+    except RuntimeError:
+        # Only settable before torch starts any inter-op work
+        pass
+    log_and_flush(logging.INFO, f"[CONFIG] torch thread budget: {budget}")
+
+
 # Function tool implementations
 async def get_weather(params: FunctionCallParams):
     """Get the current weather for a location."""
@@ -114,6 +172,7 @@ async def main(
     streaming_audio_frequency: str = "24khz",
     websocket_url: str = "",
     enable_tools: bool = True,
+    session_config: Optional[Dict[str, Any]] = None,
 ):
     """
     Run the MeetingBaas bot with specified configurations
@@ -126,6 +185,8 @@ async def main(
         streaming_audio_frequency: Audio frequency for streaming (16khz or 24khz)
         websocket_url: Full WebSocket URL to connect to, including any path
         enable_tools: Whether to enable function tools like weather and time
+        session_config: Resolved persona, prompt, voice ID and tools handed
+            over by the API server; without it the persona is loaded by name
     """
     # Set TaskManager event loop FIRST, before any other pipecat operations
     from pipecat.utils.asyncio import TaskManager
@@ -133,11 +194,19 @@ async def main(
     
     log_and_flush(logging.INFO, f"[STARTUP] MeetingBaas bot launching with persona: {persona_name}")
     load_dotenv()
+    apply_thread_budget()
 
     if not websocket_url:
         log_and_flush(logging.ERROR, "[ERROR] WebSocket URL not provided")
         return
     log_and_flush(logging.INFO, f"[CONFIG] Using WebSocket URL: {websocket_url}")
+
+    # Control channel to the API server, used to report startup phases
+    control = ControlClient(control_url_for(websocket_url))
+    control.start()
+    control.mark_phase("interpreter_start", INTERPRETER_START)
+    control.mark_phase("imports_done", IMPORTS_DONE)
+
     # Extract bot_id from the websocket_url if possible
     # Format is usually: ws://localhost:{PORT}/pipecat/{client_id} or the ngrok URL
     parts = websocket_url.split("/")
@@ -160,6 +229,17 @@ async def main(
 
     print("Event loop set for Pipecat:", asyncio.get_running_loop())
 
+    vad_analyzer = SileroVADAnalyzer(
+        sample_rate=16000,
+        params=VADParams(
+            threshold=0.5,
+            min_speech_duration_ms=250,
+            min_silence_duration_ms=100,
+            min_volume=0.6,
+        ),
+    )
+    control.mark_phase("vad_loaded")
+
     transport = WebsocketClientTransport(
         uri=websocket_url,
         params=WebsocketClientParams(
@@ -167,15 +247,7 @@ async def main(
             audio_out_enabled=True,
             add_wav_header=False,
             audio_in_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(
-                sample_rate=16000,
-                params=VADParams(
-                    threshold=0.5,
-                    min_speech_duration_ms=250,
-                    min_silence_duration_ms=100,
-                    min_volume=0.6,
-                ),
-            ),
+            vad_analyzer=vad_analyzer,
             audio_in_passthrough=True,
             serializer=ProtobufFrameSerializer(),
             timeout=300,
@@ -186,6 +258,10 @@ async def main(
     log_and_flush(logging.INFO, f"[TRANSPORT] Audio out enabled: True, sample_rate: {output_sample_rate}")
     log_and_flush(logging.INFO, "[TRANSPORT] Audio in enabled: True, VAD sample_rate: 16000")
 
+    @transport.event_handler("on_connected")
+    async def on_connected(transport, websocket):
+        control.mark_phase("transport_connected")
+
     # Add WebSocket connection event handlers for debugging
     @transport.event_handler("on_client_connected")
     async def on_client_connected(transport, client):
@@ -203,12 +279,20 @@ async def main(
     async def on_connection_error(transport, error):
         log_and_flush(logging.ERROR, f"[WEBSOCKET] Connection error: {error}")
 
-    persona_manager = PersonaManager()
-    persona = persona_manager.get_persona(persona_name)
-    if not persona:
-        log_and_flush(logging.ERROR, f"[ERROR] Persona '{persona_name}' not found")
-        return
-    log_and_flush(logging.INFO, f"[PERSONA] Loaded persona: {persona_name}")
+    if session_config and session_config.get("prompt"):
+        persona = dict(session_config.get("persona") or {})
+        persona["prompt"] = session_config["prompt"]
+        log_and_flush(logging.INFO, f"[PERSONA] Using resolved persona: {persona_name}")
+    else:
+        # Standalone runs look the persona up in config/personas instead
+        from config.persona_utils import PersonaManager
+
+        persona_manager = PersonaManager()
+        persona = persona_manager.get_persona(persona_name)
+        if not persona:
+            log_and_flush(logging.ERROR, f"[ERROR] Persona '{persona_name}' not found")
+            return
+        log_and_flush(logging.INFO, f"[PERSONA] Loaded persona: {persona_name}")
 
     additional_content = persona.get("additional_content", "")
     if additional_content:
@@ -216,7 +300,9 @@ async def main(
     else:
         log_and_flush(logging.INFO, "[PERSONA] No additional content found for persona")
 
-    voice_id = os.getenv("CARTESIA_VOICE_ID")
+    control.mark_phase("persona_loaded")
+
+    voice_id = (session_config or {}).get("voice_id") or os.getenv("CARTESIA_VOICE_ID")
     log_and_flush(logging.INFO, f"[PERSONA] Using voice ID: {voice_id}")
 
     tts = CartesiaTTSService(
@@ -227,12 +313,13 @@ async def main(
     )
     log_and_flush(logging.INFO, f"[TTS] Cartesia TTS initialized with sample_rate={output_sample_rate}, voice_id={voice_id}")
 
+    llm_model = os.getenv("BOT_LLM_MODEL", "gpt-4.1-nano")
     llm = OpenAILLMService(
         api_key=os.getenv("OPENAI_API_KEY"),
-        model="gpt-4.1-nano",
+        model=llm_model,
         run_in_parallel=False,
     )
-    log_and_flush(logging.INFO, f"[LLM] OpenAI LLM initialized with model=gpt-4.1-nano")
+    log_and_flush(logging.INFO, f"[LLM] OpenAI LLM initialized with model={llm_model}")
 
     if enable_tools:
         log_and_flush(logging.INFO, "[TOOLS] Registering function tools")
@@ -314,12 +401,29 @@ async def main(
         },
     ]
 
+    # A migrated session continues from the conversation checkpointed by
+    # the worker it replaces
+    restored_messages = (session_config or {}).get("messages")
+    if restored_messages:
+        messages = restored_messages
+        log_and_flush(logging.INFO, f"[MIGRATION] Restored {len(messages)} context messages")
+
     # Create the context object - with or without tools
     if enable_tools and tools:
         context = OpenAILLMContext(messages, tools)
     else:
         context = OpenAILLMContext(messages)
 
+    async def on_checkpoint(message):
+        return {"messages": context.get_messages()}
+
+    async def on_restore(message):
+        context.set_messages(message["messages"])
+        return {"restored": len(message["messages"])}
+
+    control.on("checkpoint", on_checkpoint)
+    control.on("restore", on_restore)
+
     # Get the context aggregator pair using the LLM's method
     # This handles properly setting up the context aggregators
     aggregator_pair = llm.create_context_aggregator(context)
@@ -338,9 +442,12 @@ async def main(
     pipeline = Pipeline([
         transport.input(),   # Add transport input to receive audio/data
         stt,
+        PhaseMarker(control, "first_stt_result", TranscriptionFrame),
         user_aggregator,
         llm,
+        PhaseMarker(control, "first_llm_token", LLMTextFrame),
         tts,
+        PhaseMarker(control, "first_tts_byte", TTSAudioRawFrame),
         assistant_aggregator,
         transport.output(),  # Add transport output to send audio/data
     ])
@@ -348,6 +455,21 @@ async def main(
     task = PipelineTask(pipeline, params=PipelineParams(allow_interruptions=True, check_dangling_tasks=True))
     runner = WindowsSafePipelineRunner()
 
+    # Let the API server step this bot down its degradation ladder under load
+    degradation = BotDegradation(
+        task,
+        context,
+        llm_model=llm_model,
+        vad_params=vad_analyzer.params,
+        tools=tools if enable_tools else None,
+    )
+    control.on("degrade", degradation.handle_message)
+
+    # Ride out API server restarts: the restarted server re-adopts this
+    # process and accepts the reconnection on /pipecat/{client_id}
+    reconnect_timeout = float(os.getenv("BOT_RECONNECT_TIMEOUT_S", "120"))
+    keep_connected(transport, reconnect_timeout, on_give_up=task.cancel)
+
     # Add a simple test to verify TTS is working
     async def test_tts_output():
         log_and_flush(logging.INFO, "[TEST] Testing TTS output directly")
@@ -361,7 +483,7 @@ async def main(
         except Exception as e:
             log_and_flush(logging.ERROR, f"[TEST] TTS test failed: {e}")
 
-    if entry_message:
+    if entry_message and not restored_messages:
         log_and_flush(logging.INFO, "[BOT] Bot will speak first with an introduction")
         initial_message = {"role": "user", "content": entry_message}
         async def queue_initial_message():
@@ -388,6 +510,8 @@ async def main(
         import traceback
         log_and_flush(logging.ERROR, f"[ERROR] Traceback: {traceback.format_exc()}")
         raise
+    finally:
+        await control.stop()
 
 
 if __name__ == "__main__":
@@ -418,12 +542,23 @@ if __name__ == "__main__":
         help="Enable function tools like weather and time",
     )
     parser.add_argument("--client-id", help="Internal client ID for the bot")
-    parser.add_argument("--persona-data-json", help="Persona data as JSON string")
+    parser.add_argument(
+        "--config-stdin",
+        action="store_true",
+        help="Read the resolved session config as JSON from stdin",
+    )
     parser.add_argument("--api-key", help="API key for authentication")
     parser.add_argument("--meetingbaas-bot-id", help="MeetingBaas bot ID")
 
     args = parser.parse_args()
 
+    session_config = None
+    if args.config_stdin:
+        session_config = json.load(sys.stdin)
+        tools = session_config.get("tools")
+        if tools is not None:
+            args.enable_tools = bool(tools)
+
     # Run the bot
     asyncio.run(
         main(
@@ -434,5 +569,6 @@ if __name__ == "__main__":
             streaming_audio_frequency=args.streaming_audio_frequency,
             websocket_url=args.websocket_url,
             enable_tools=args.enable_tools,
+            session_config=session_config,
         )
     )
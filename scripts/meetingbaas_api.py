@@ -1,13 +1,37 @@
+import asyncio
 import json
 import logging
+import os
+import random
+import time
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
-import requests
+import aiohttp
 from pydantic import BaseModel, Field, HttpUrl
 
+from core.breakers import CircuitOpenError, breakers
+from core.metrics import metrics
+from core.ratelimit import rate_limits
+
 logger = logging.getLogger("meetingbaas-api")
 
+# Base URL of the MeetingBaas API (point it at scripts/fake_meetingbaas.py in tests)
+MEETINGBAAS_API_URL = os.getenv(
+    "MEETINGBAAS_API_URL", "https://api.meetingbaas.com"
+).rstrip("/")
+# Per-attempt timeouts, so a hung MeetingBaas call cannot hold a request forever
+MEETINGBAAS_TIMEOUT_S = float(os.getenv("MEETINGBAAS_TIMEOUT_S", "15"))
+MEETINGBAAS_CONNECT_TIMEOUT_S = float(os.getenv("MEETINGBAAS_CONNECT_TIMEOUT_S", "5"))
+# Extra attempts after a failed one; see MeetingBaasClient for what is retried
+MEETINGBAAS_MAX_RETRIES = int(os.getenv("MEETINGBAAS_MAX_RETRIES", "3"))
+MEETINGBAAS_RETRY_BASE_S = float(os.getenv("MEETINGBAAS_RETRY_BASE_S", "0.5"))
+# Keep-alive connections held open to the API
+MEETINGBAAS_POOL_SIZE = int(os.getenv("MEETINGBAAS_POOL_SIZE", "20"))
+
+# Statuses worth another attempt when the call is idempotent
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
 
 class RecordingMode(str, Enum):
     """Available recording modes for the MeetingBaas API"""
@@ -86,33 +110,31 @@ class MeetingBaasRequest(BaseModel):
     webhook_url: Optional[str] = None
 
 
-def create_meeting_bot(
+def build_bot_config(
     meeting_url: str,
     websocket_url: str,
     bot_id: str,
     persona_name: str,
-    api_key: str,
     bot_image: Optional[str] = None,
     entry_message: Optional[str] = None,
     extra: Optional[Dict[str, Any]] = None,
     streaming_audio_frequency: str = "16khz",
-):
+) -> Dict[str, Any]:
     """
-    Direct API call to MeetingBaas to create a bot
+    Build the JSON payload that asks MeetingBaas to send a bot to a meeting.
 
     Args:
         meeting_url: URL of the meeting to join
         websocket_url: Base WebSocket URL for audio streaming
         bot_id: Unique identifier for the bot
         persona_name: Name to display for the bot
-        api_key: MeetingBaas API key
         bot_image: Optional URL for bot avatar
         entry_message: Optional message to send when joining
         extra: Optional additional metadata for the bot
         streaming_audio_frequency: Audio frequency for streaming (16khz or 24khz)
 
     Returns:
-        str: The bot ID if successful, None otherwise
+        dict: A JSON-serializable request body
     """
     # Ensure all inputs are primitive types to avoid serialization issues
     if bot_image is not None:
@@ -172,43 +194,259 @@ def create_meeting_bot(
         # Ensure all values are serializable
         config = stringify_values(config)
 
-    url = "https://api.meetingbaas.com/bots"
-    headers = {
-        "Content-Type": "application/json",
-        "x-meeting-baas-api-key": api_key,
-    }
-
+    # Try to serialize the payload to catch any JSON serialization issues
     try:
-        logger.info(f"Creating MeetingBaas bot for {meeting_url}")
-        logger.debug(f"Request payload: {config}")
+        json.dumps(config)
+    except TypeError as e:
+        logger.error(f"JSON serialization error: {e}")
+        # Use our stringify_values function to convert all non-serializable values
+        config = stringify_values(config)
+        logger.info("Applied stringify_values to fix JSON serialization issues")
+
+    return config
+
+
+class MeetingBaasError(Exception):
+    """Raised when a MeetingBaas call fails after its retries."""
 
-        # Try to serialize the payload to catch any JSON serialization issues
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_outage(error: BaseException) -> bool:
+    # Answers to a bad request or key say nothing about MeetingBaas' health
+    if isinstance(error, MeetingBaasError) and error.status is not None:
+        return error.status >= 500
+    return True
+
+
+class MeetingBaasClient:
+    """
+    Async MeetingBaas API client on a shared keep-alive connection pool.
+
+    Every attempt is bounded by a timeout. Idempotent calls are retried with
+    jittered exponential backoff on timeouts, connection errors and
+    ``RETRY_STATUSES``; other calls are only retried when the connection
+    could not be opened, so MeetingBaas never sees them twice. While
+    MeetingBaas keeps failing, its circuit breaker refuses calls at once with
+    a 503 ``MeetingBaasError``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = MEETINGBAAS_API_URL,
+        max_retries: int = MEETINGBAAS_MAX_RETRIES,
+    ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Open the connection pool (called from the app lifespan)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MEETINGBAAS_POOL_SIZE, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=MEETINGBAAS_TIMEOUT_S,
+                    sock_connect=MEETINGBAAS_CONNECT_TIMEOUT_S,
+                ),
+            )
+
+    async def close(self):
+        """Close the connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self,
+        call: str,
+        method: str,
+        path: str,
+        api_key: str,
+        idempotent: bool,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         try:
-            json.dumps(config)
-        except TypeError as e:
-            logger.error(f"JSON serialization error: {e}")
-            # Use our stringify_values function to convert all non-serializable values
-            config = stringify_values(config)
-            logger.info("Applied stringify_values to fix JSON serialization issues")
-
-        response = requests.post(url, json=config, headers=headers)
-
-        if response.status_code == 200:
-            data = response.json()
-            bot_id = data.get("bot_id")
-            logger.info(f"Bot created with ID: {bot_id}")
-            return bot_id
-        else:
-            logger.error(
-                f"Failed to create bot: {response.status_code} - {response.text}"
+            async with breakers.guard("meetingbaas", is_failure=_is_outage):
+                return await self._send(
+                    call, method, path, api_key, idempotent, payload
+                )
+        except CircuitOpenError as e:
+            metrics.increment(
+                "meetingbaas_requests_total", call=call, outcome="circuit_open"
             )
-            return None
-    except Exception as e:
-        logger.error(f"Error creating bot: {str(e)}")
+            raise MeetingBaasError(str(e), 503) from None
+
+    async def _send(
+        self,
+        call: str,
+        method: str,
+        path: str,
+        api_key: str,
+        idempotent: bool,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Outside the app (scripts, tests) the pool is opened on first use
+        await self.start()
+        headers = {"x-meeting-baas-api-key": api_key}
+        url = f"{self.base_url}{path}"
+        limiter = rate_limits.get("meetingbaas", api_key)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after: Optional[float] = None
+            # Waits for the caller's key share of MeetingBaas' rate limit
+            async with limiter.permit():
+                started = time.monotonic()
+                try:
+                    async with self._session.request(
+                        method, url, json=payload, headers=headers
+                    ) as response:
+                        text = await response.text()
+                        outcome = str(response.status)
+                        if response.status < 300:
+                            self._record(call, outcome, started)
+                            try:
+                                return json.loads(text) if text else {}
+                            except ValueError as e:
+                                # e.g. an HTML page from a proxy in between
+                                raise MeetingBaasError(
+                                    f"Invalid JSON from MeetingBaas: {e}",
+                                    response.status,
+                                ) from None
+                        error = MeetingBaasError(
+                            f"{response.status} - {text[:500]}", response.status
+                        )
+                        retryable = idempotent and response.status in RETRY_STATUSES
+                        header = response.headers.get("Retry-After", "")
+                        if header.isdigit():
+                            retry_after = float(header)
+                except aiohttp.ClientConnectorError as e:
+                    # Nothing was sent, so even non-idempotent calls can go again
+                    outcome = "connect_error"
+                    error = MeetingBaasError(f"Cannot connect to MeetingBaas: {e}")
+                    retryable = True
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    outcome = (
+                        "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                    )
+                    error = MeetingBaasError(
+                        f"MeetingBaas {outcome}: {str(e) or type(e).__name__}"
+                    )
+                    retryable = idempotent
+
+            self._record(call, outcome, started)
+            if not retryable or attempt == self.max_retries:
+                raise error
+            delay = retry_after or random.uniform(
+                0, MEETINGBAAS_RETRY_BASE_S * 2**attempt
+            )
+            metrics.increment("meetingbaas_retries_total", call=call)
+            logger.warning(
+                f"MeetingBaas {call} attempt {attempt + 1} failed ({error}), "
+                f"retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _record(self, call: str, outcome: str, started: float):
+        metrics.increment("meetingbaas_requests_total", call=call, outcome=outcome)
+        metrics.observe(
+            "meetingbaas_request_seconds", time.monotonic() - started, call=call
+        )
+
+    async def create_bot(self, config: Dict[str, Any], api_key: str) -> Optional[str]:
+        """
+        Ask MeetingBaas to send a bot to a meeting.
+
+        Args:
+            config: Payload from :func:`build_bot_config`
+            api_key: MeetingBaas API key
+
+        Returns:
+            str: The MeetingBaas bot ID
+
+        Raises:
+            MeetingBaasError: If the bot could not be created
+        """
+        data = await self._request(
+            "create_bot", "POST", "/bots", api_key, idempotent=False, payload=config
+        )
+        return data.get("bot_id")
+
+    async def leave_bot(self, bot_id: str, api_key: str):
+        """
+        Ask MeetingBaas to take a bot out of its meeting.
+
+        Args:
+            bot_id: The MeetingBaas bot ID
+            api_key: MeetingBaas API key
+
+        Raises:
+            MeetingBaasError: If the bot could not be removed
+        """
+        await self._request(
+            "leave_bot", "DELETE", f"/bots/{bot_id}", api_key, idempotent=True
+        )
+
+
+# Create a singleton instance
+meetingbaas_client = MeetingBaasClient()
+
+
+async def create_meeting_bot(
+    meeting_url: str,
+    websocket_url: str,
+    bot_id: str,
+    persona_name: str,
+    api_key: str,
+    bot_image: Optional[str] = None,
+    entry_message: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    streaming_audio_frequency: str = "16khz",
+):
+    """
+    Direct API call to MeetingBaas to create a bot
+
+    Args:
+        meeting_url: URL of the meeting to join
+        websocket_url: Base WebSocket URL for audio streaming
+        bot_id: Unique identifier for the bot
+        persona_name: Name to display for the bot
+        api_key: MeetingBaas API key
+        bot_image: Optional URL for bot avatar
+        entry_message: Optional message to send when joining
+        extra: Optional additional metadata for the bot
+        streaming_audio_frequency: Audio frequency for streaming (16khz or 24khz)
+
+    Returns:
+        str: The bot ID if successful, None otherwise
+    """
+    config = build_bot_config(
+        meeting_url=meeting_url,
+        websocket_url=websocket_url,
+        bot_id=bot_id,
+        persona_name=persona_name,
+        bot_image=bot_image,
+        entry_message=entry_message,
+        extra=extra,
+        streaming_audio_frequency=streaming_audio_frequency,
+    )
+
+    try:
+        logger.info(f"Creating MeetingBaas bot for {meeting_url}")
+        logger.debug(f"Request payload: {config}")
+        bot_id = await meetingbaas_client.create_bot(config, api_key)
+        logger.info(f"Bot created with ID: {bot_id}")
+        return bot_id
+    except MeetingBaasError as e:
+        logger.error(f"Failed to create bot: {e}")
         return None
 
 
-def leave_meeting_bot(bot_id: str, api_key: str) -> bool:
+async def leave_meeting_bot(bot_id: str, api_key: str) -> bool:
     """
     Call the MeetingBaas API to make a bot leave a meeting.
 
@@ -219,23 +457,11 @@ def leave_meeting_bot(bot_id: str, api_key: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    url = f"https://api.meetingbaas.com/bots/{bot_id}"
-    headers = {
-        "x-meeting-baas-api-key": api_key,
-    }
-
     try:
         logger.info(f"Removing bot with ID: {bot_id}")
-        response = requests.delete(url, headers=headers)
-
-        if response.status_code == 200:
-            logger.info(f"Bot {bot_id} successfully left the meeting")
-            return True
-        else:
-            logger.error(
-                f"Failed to remove bot: {response.status_code} - {response.text}"
-            )
-            return False
-    except Exception as e:
-        logger.error(f"Error removing bot: {str(e)}")
+        await meetingbaas_client.leave_bot(bot_id, api_key)
+        logger.info(f"Bot {bot_id} successfully left the meeting")
+        return True
+    except MeetingBaasError as e:
+        logger.error(f"Failed to remove bot: {e}")
         return False
@@ -0,0 +1,89 @@
+"""Pre-generate the avatars of personas that have no image.
+
+Generates each missing avatar with the same prompt, style and size a join
+would use, so it lands in the avatar cache (app/services/avatar_cache.py)
+and joins of these personas never wait on Replicate.
+
+Usage:
+    python scripts/prewarm_avatars.py --concurrency 4
+    python scripts/prewarm_avatars.py --personas baas_onboarder --save
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.avatar_cache import avatar_cache  # noqa: E402
+from app.services.bot_resolution import (  # noqa: E402
+    PERSONA_IMAGE_SIZE,
+    PERSONA_IMAGE_STYLE,
+    image_prompt,
+)
+from app.services.image_service import image_service  # noqa: E402
+from config.persona_utils import persona_manager  # noqa: E402
+from meetingbaas_pipecat.utils.logger import logger  # noqa: E402
+
+
+async def prewarm(keys, concurrency: int, dry_run: bool, save: bool) -> int:
+    """Generate the missing avatars of ``keys``; return how many failed."""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def warm(key: str):
+        nonlocal failures
+        persona = persona_manager.get_persona(key)
+        prompt = image_prompt(persona)
+        if persona.get("image") or not prompt:
+            return
+        if dry_run:
+            logger.info(f"Would generate an avatar for {key}")
+            return
+        async with semaphore:
+            try:
+                url = await image_service.generate_persona_image(
+                    name=persona.get("name", key),
+                    prompt=prompt,
+                    style=PERSONA_IMAGE_STYLE,
+                    size=PERSONA_IMAGE_SIZE,
+                )
+            except ValueError as e:
+                failures += 1
+                logger.error(f"Avatar for {key} failed: {e}")
+                return
+        logger.info(f"Avatar for {key}: {url}")
+        if save:
+            persona_manager.update_persona_image(key, url)
+
+    await asyncio.gather(*(warm(key) for key in keys))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--personas", nargs="*", help="Persona keys to warm (default: all)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Generations run at once"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the avatars to generate"
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Also write the URLs into the personas' README metadata",
+    )
+    args = parser.parse_args()
+
+    keys = args.personas or sorted(persona_manager.personas)
+    logger.info(f"Avatar cache: {avatar_cache.path}")
+    failures = asyncio.run(prewarm(keys, args.concurrency, args.dry_run, args.save))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Tests for the join's resolution steps and their fallbacks."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app import routes
+from app.models import BotRequest
+from app.services import bot_resolution
+
+DEFAULT_IMAGE = "https://example.com/default-avatar.png"
+
+
+def test_resolve_image_falls_back_to_default_bot_image(monkeypatch):
+    monkeypatch.setattr(bot_resolution, "DEFAULT_BOT_IMAGE", DEFAULT_IMAGE)
+    request = BotRequest(meeting_url="https://meet.google.com/abc-defg-hij")
+
+    # A persona without an image or any text to generate one from
+    image = asyncio.run(bot_resolution.resolve_image(request, {"name": "Bot"}))
+
+    assert image == DEFAULT_IMAGE
+
+
+def test_join_uses_default_bot_image_when_image_step_times_out(monkeypatch):
+    monkeypatch.setattr(bot_resolution, "DEFAULT_BOT_IMAGE", DEFAULT_IMAGE)
+    monkeypatch.setattr(routes, "JOIN_IMAGE_DEADLINE_S", 0.01)
+    monkeypatch.setattr(routes, "LOCAL_DEV_MODE", False)
+    monkeypatch.setattr(
+        routes, "determine_websocket_url", lambda url, request: ("wss://bots", None)
+    )
+
+    async def resolve_persona(request):
+        return {"name": "Bot"}, "You are Bot."
+
+    async def resolve_image(request, persona):
+        await asyncio.sleep(1)
+        return "https://example.com/late.png"
+
+    async def resolve_voice(persona):
+        return "voice-id"
+
+    created = {}
+
+    async def create_meeting_bot(**kwargs):
+        # No bot ID: MeetingBaas refused the bot, so nothing is spawned
+        created.update(kwargs)
+
+    monkeypatch.setattr(routes, "resolve_persona", resolve_persona)
+    monkeypatch.setattr(routes, "resolve_image", resolve_image)
+    monkeypatch.setattr(routes, "resolve_voice", resolve_voice)
+    monkeypatch.setattr(routes, "create_meeting_bot", create_meeting_bot)
+
+    request = BotRequest(meeting_url="https://meet.google.com/abc-defg-hij")
+    client_request = SimpleNamespace(state=SimpleNamespace(api_key="key"))
+    response = asyncio.run(routes._join_meeting(request, client_request))
+
+    assert created["bot_image"] == DEFAULT_IMAGE
+    # MeetingBaas refused the bot, not the join's own fallback
+    assert response.status_code == 500
@@ -0,0 +1,41 @@
+"""Tests for draining a node before a rolling deploy."""
+
+import asyncio
+import signal
+
+from core import drain as drain_module
+from core.capacity import admission
+from core.drain import DrainController
+from core.migration import RemoteWorker, migrator
+
+
+def test_drain_waits_for_sessions_migrated_to_a_peer(monkeypatch):
+    monkeypatch.setattr(drain_module, "DRAIN_POLL_INTERVAL_S", 0.01)
+    monkeypatch.setattr(drain_module, "DRAIN_EXIT_WHEN_EMPTY", True)
+    signals = []
+    monkeypatch.setattr(
+        drain_module.os, "kill", lambda pid, sig: signals.append((pid, sig))
+    )
+    client_id = "migrated-session"
+    migrator.remote_workers[client_id] = RemoteWorker("https://peer", client_id)
+
+    async def scenario():
+        controller = DrainController()
+        status = controller.start(timeout=60)
+        assert status["bots_remaining"] == 1
+        await asyncio.sleep(0.05)
+        # Still relaying the meeting for the peer node's worker
+        assert not controller.finished
+        assert signals == []
+
+        # The remote worker's relay ends with the meeting
+        migrator.remote_workers.pop(client_id)
+        await asyncio.sleep(0.05)
+        assert controller.finished
+        assert signals == [(drain_module.os.getpid(), signal.SIGTERM)]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        migrator.remote_workers.pop(client_id, None)
+        admission.open("draining")
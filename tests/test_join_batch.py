@@ -0,0 +1,55 @@
+"""Tests for resolution work shared by the joins of a batch."""
+
+import asyncio
+
+from app.services.bot_resolution import JoinBatch
+
+
+def test_joins_of_a_batch_share_a_step():
+    calls = []
+
+    async def resolve():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"name": "Bot"}
+
+    async def scenario():
+        batch = JoinBatch()
+        key = ("persona", "bot")
+        return await asyncio.gather(
+            batch.share(key, resolve), batch.share(key, resolve)
+        )
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert calls == [1]
+
+
+def test_step_is_cancelled_once_no_join_waits_for_it():
+    async def scenario():
+        batch = JoinBatch()
+        key = ("image", 1, None)
+        stopped = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.set()
+
+        async def fast():
+            return "https://example.com/avatar.png"
+
+        first = asyncio.create_task(batch.share(key, slow))
+        second = asyncio.create_task(batch.share(key, slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        # Another join still waits for the step
+        assert not stopped.is_set()
+        second.cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+        # Joins arriving afterwards resolve the key afresh
+        return await batch.share(key, fast)
+
+    assert asyncio.run(scenario()) == "https://example.com/avatar.png"
@@ -0,0 +1,46 @@
+"""Tests for the MeetingBaas API client."""
+
+import asyncio
+
+from aiohttp import web
+
+from scripts import meetingbaas_api
+from scripts.meetingbaas_api import MeetingBaasClient
+
+HTML_PAGE = "<html><body>502 Bad Gateway</body></html>"
+
+
+async def _serve_html():
+    async def html(request):
+        return web.Response(text=HTML_PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", html)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_non_json_success_body_is_a_meetingbaas_error(monkeypatch):
+    async def scenario():
+        runner, base_url = await _serve_html()
+        client = MeetingBaasClient(base_url=base_url, max_retries=0)
+        monkeypatch.setattr(meetingbaas_api, "meetingbaas_client", client)
+        try:
+            bot_id = await meetingbaas_api.create_meeting_bot(
+                meeting_url="https://meet.google.com/abc-defg-hij",
+                websocket_url="wss://bots",
+                bot_id="client-id",
+                persona_name="Bot",
+                api_key="key",
+            )
+            left = await meetingbaas_api.leave_meeting_bot("bot-id", "key")
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return bot_id, left
+
+    assert asyncio.run(scenario()) == (None, False)